@@ -0,0 +1,333 @@
+import datetime
+import zlib
+
+import numpy as np
+
+from ledger import parse_date
+from records import NO_DATE
+
+# ==========================================
+# INVENTORY AGING / SELL-THROUGH ROLLUPS
+# ==========================================
+# Running totals per scope: 'all', one per source ('s:Goodwill') and one
+# per month ('m:2024-05'). Inventory numbers (items added, cost, sold,
+# days-to-sell, what is still open) go to the month the item was bought;
+# sales numbers go to the month it sold. "Sell from Inventory" moves a
+# row to the history with its Cost and Acquired date, which is the link:
+# that sale counts toward sell-through, ROI and days-to-sell.
+#
+# Like ProfitLedger the totals are one flat dict, so an Add or a Sold
+# touches a handful of keys and only those get journaled:
+#
+#   s:Bins|n  s:Bins|cost  s:Bins|sold  s:Bins|cost_sold  s:Bins|net
+#   s:Bins|sales  s:Bins|profit  s:Bins|days|12  s:Bins|open|738951 -> [items, cost]
+#
+# Open items are kept per purchase day, so stale buckets and capital tied
+# up are computed for any "today" without touching the rows.
+#
+# '#inventory' and '#history' are order-independent digests of the fields
+# the rollup reads from each row (day, source, cost / profit, the link),
+# kept current by every event like ProfitLedger's 'h'. A list edited
+# behind the rollup's back with its length unchanged then still fails
+# matches() and gets rebuilt.
+
+SCALARS = ('n', 'cost', 'sold', 'cost_sold', 'net', 'sales', 'profit')
+STALE_BUCKETS = ((0, 30, "0-30d"), (31, 90, "31-90d"), (91, 180, "91-180d"), (181, None, "180d+"))
+DIGESTS = ('#inventory', '#history')
+DIGEST_MOD = 1 << 64
+
+
+class Scope:
+    __slots__ = SCALARS + ('days', 'open')
+
+    def __init__(self):
+        for f in SCALARS: setattr(self, f, 0)
+        self.days = {}   # days-to-sell -> sales
+        self.open = {}   # purchase day ordinal -> [items, cost]
+
+    def median_days(self):
+        total = sum(self.days.values())
+        if not total: return None
+        seen = 0
+        for d in sorted(self.days):
+            seen += self.days[d]
+            if seen * 2 >= total: return d
+
+    def stale(self, today=None):
+        # bucket label -> (items, cost) still in inventory, by age
+        today = (today or datetime.date.today()).toordinal()
+        out = {label: [0, 0.0] for _, _, label in STALE_BUCKETS}
+        for day, (items, cost) in self.open.items():
+            age = today - day if day != NO_DATE else 0
+            for lo, hi, label in STALE_BUCKETS:
+                if age >= lo and (hi is None or age <= hi):
+                    out[label][0] += items; out[label][1] += cost
+                    break
+        return out
+
+
+class AgingRollup:
+    def __init__(self, totals=None):
+        self.scopes = {}
+        self.digests = {}
+        self.checked = False
+        for key, value in (totals or {}).items(): self._load(key, value)
+
+    def _scope(self, name):
+        s = self.scopes.get(name)
+        if s is None: s = self.scopes[name] = Scope()
+        return s
+
+    def _load(self, key, value):
+        if key in DIGESTS: self.digests[key] = value; return
+        name, _, rest = key.partition('|')
+        field, _, sub = rest.partition('|')
+        s = self._scope(name)
+        if field == 'days': s.days[int(sub)] = value
+        elif field == 'open': s.open[int(sub)] = list(value)
+        elif field in SCALARS: setattr(s, field, value)
+
+    @property
+    def totals(self):
+        # The flat dict saved as aging_totals; empty histogram slots dropped
+        out = {}
+        for name, s in self.scopes.items():
+            for f in SCALARS: out[f"{name}|{f}"] = getattr(s, f)
+            for d, c in s.days.items():
+                if c: out[f"{name}|days|{d}"] = c
+            for d, v in s.open.items():
+                if v[0]: out[f"{name}|open|{d}"] = v
+        out.update(self.digests)
+        return out
+
+    def _digest(self, key, row_hash, sign):
+        self.digests[key] = (self.digests.get(key, 0) + sign * row_hash) % DIGEST_MOD
+        return {key: self.digests[key]}
+
+    # ---------- EVENTS ----------
+    def add(self, row):
+        # An item went into inventory; returns the touched keys to journal
+        day = parse_date(row.get('Date', ''))
+        cost = _money(row.get('Cost'))
+        touched = {}
+        for name in _scopes(row.get('Source'), day):
+            s = self._scope(name)
+            s.n += 1; s.cost += cost
+            touched.update(self._open(name, s, day, 1, cost))
+            touched.update({f"{name}|n": s.n, f"{name}|cost": s.cost})
+        touched.update(self._digest('#inventory', _item_hash(row.get('Date'), row.get('Source'), row.get('Cost')), 1))
+        return touched
+
+    def sale(self, row, sign=1):
+        # Any sale counts toward sales / profit; one sold from inventory
+        # (it carries Acquired) also closes the open item and feeds
+        # sell-through, ROI and days-to-sell
+        day = parse_date(row.get('Date', ''))
+        profit = _money(row.get('Profit')) * sign
+        touched = self._sales(row, day, profit, sign)
+        touched.update(self._digest('#history', _sale_hash(row), sign))
+        if 'Acquired' not in row: return touched
+        # The inventory row it came from: same purchase date, source and cost
+        touched.update(self._digest('#inventory', _item_hash(row.get('Acquired'), row.get('Source'), row.get('Cost')), -sign))
+        bought = parse_date(row.get('Acquired', ''))
+        cost = _money(row.get('Cost')) * sign
+        days = max(0, (day - bought).days) if day and bought else None
+        for name in _scopes(row.get('Source'), bought):
+            s = self._scope(name)
+            s.sold += sign; s.cost_sold += cost; s.net += profit
+            touched.update({f"{name}|sold": s.sold, f"{name}|cost_sold": s.cost_sold, f"{name}|net": s.net})
+            touched.update(self._open(name, s, bought, -sign, -cost))
+            if days is not None:
+                s.days[days] = s.days.get(days, 0) + sign
+                touched[f"{name}|days|{days}"] = s.days[days]
+        return touched
+
+    def _sales(self, row, day, profit, sign=1):
+        touched = {}
+        for name in _scopes(row.get('Source'), day):
+            s = self._scope(name)
+            s.sales += sign; s.profit += profit
+            touched.update({f"{name}|sales": s.sales, f"{name}|profit": s.profit})
+        return touched
+
+    def add_many(self, rows):
+        touched = {}
+        for row in rows: touched.update(self.add(row))
+        return touched
+
+    def sale_many(self, rows):
+        touched = {}
+        for row in rows: touched.update(self.sale(row))
+        return touched
+
+    @staticmethod
+    def _open(name, s, day, items, cost):
+        key = day.toordinal() if day else NO_DATE
+        slot = s.open.setdefault(key, [0, 0.0])
+        slot[0] += items; slot[1] += cost
+        return {f"{name}|open|{key}": list(slot)}
+
+    # ---------- CONSISTENCY ----------
+    def matches(self, inventory, history):
+        # Same rows, not just as many: the counts first, then the digests
+        s = self.scopes.get('all')
+        if s is None: return len(inventory) == 0 and len(history) == 0
+        if s.n - s.sold != len(inventory) or s.sales != len(history): return False
+        if any(k not in self.digests for k in DIGESTS): return False
+        return self.digests == {'#inventory': inventory_digest(inventory), '#history': history_digest(history)}
+
+    def rebuild(self, inventory, history):
+        self.scopes = {}
+        if hasattr(inventory, 'dates'): self._rebuild_open(inventory)
+        else:
+            for row in inventory: self.add(row)
+        if hasattr(history, 'dates'): self._rebuild_sales(history)
+        else:
+            for row in history:
+                self._sales(row, parse_date(row.get('Date', '')), _money(row.get('Profit')))
+                if 'Acquired' in row: self._link(row)
+        # After the events above, which moved them too
+        self.digests = {'#inventory': inventory_digest(inventory), '#history': history_digest(history)}
+        return self.totals
+
+    def _rebuild_open(self, inv):
+        # records.InventoryColumns: group by (source, day) in numpy, then fold
+        # each group into its scopes
+        n = inv.n
+        cost = np.nan_to_num(inv.money['Cost'][:n])
+        for src, day, items, total in _groups(inv.sources[:n], inv.dates[:n], cost):
+            row_day = datetime.date.fromordinal(day) if day != NO_DATE else None
+            for name in _scopes(_source(inv, src), row_day):
+                s = self._scope(name)
+                s.n += items; s.cost += total
+                slot = s.open.setdefault(day, [0, 0.0])
+                slot[0] += items; slot[1] += total
+
+    def _rebuild_sales(self, hist):
+        n = hist.n
+        profit = np.nan_to_num(hist.money['Profit'][:n])
+        for src, day, items, total in _groups(hist.sources[:n], hist.dates[:n], profit):
+            row_day = datetime.date.fromordinal(day) if day != NO_DATE else None
+            for name in _scopes(_source(hist, src), row_day):
+                s = self._scope(name)
+                s.sales += items; s.profit += total
+        # Linked sales carry Acquired in their extra fields; only those are
+        # replayed row by row
+        for p, extra in enumerate(hist.extra[:n]):
+            if not extra or 'Acquired' not in extra: continue
+            self._link(hist._get(p))
+
+    def _link(self, row):
+        # The inventory side of a linked sale: it was added, then it sold
+        bought = parse_date(row.get('Acquired', ''))
+        cost, profit = _money(row.get('Cost')), _money(row.get('Profit'))
+        day = parse_date(row.get('Date', ''))
+        days = max(0, (day - bought).days) if day and bought else None
+        for name in _scopes(row.get('Source'), bought):
+            s = self._scope(name)
+            s.n += 1; s.cost += cost
+            s.sold += 1; s.cost_sold += cost; s.net += profit
+            if days is not None: s.days[days] = s.days.get(days, 0) + 1
+
+    # ---------- REPORTS ----------
+    def summary(self, by='s', today=None):
+        # One dict per source (by='s') or month (by='m'), plus the scope's stale buckets
+        out = []
+        for name, s in sorted(self.scopes.items()):
+            if not name.startswith(by + ':'): continue
+            out.append(report(name[2:], s, today))
+        return out
+
+    def overall(self, today=None):
+        return report('All', self.scopes.get('all') or Scope(), today)
+
+
+def report(label, s, today=None):
+    stale = s.stale(today)
+    open_items = sum(v[0] for v in stale.values())
+    row = {
+        'Scope': label, 'Bought': s.n, 'Sold': s.sold,
+        'Sell-Through %': round(100.0 * s.sold / s.n, 1) if s.n else None,
+        'ROI %': round(100.0 * s.net / s.cost_sold, 1) if s.cost_sold else None,
+        'Median Days': s.median_days(),
+        'Open': open_items, 'Tied Up': round(sum(v[1] for v in stale.values()), 2),
+        'Sales': s.sales, 'Profit': round(s.profit, 2),
+    }
+    for bucket, (items, _) in stale.items(): row[bucket] = items
+    return row
+
+
+def _scopes(source, day):
+    out = ['all']
+    if isinstance(source, str) and source: out.append(f"s:{source}")
+    if day: out.append(f"m:{day:%Y-%m}")
+    return out
+
+
+def _source(columns, sid):
+    return columns.interner.names[sid] if sid >= 0 else None
+
+
+def _groups(sources, dates, values):
+    # (source id, day ordinal, rows, summed value) per distinct pair
+    if not len(sources): return []
+    keys = sources.astype(np.int64) * (1 << 32) + dates.astype(np.int64)
+    uniq, inv, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    sums = np.bincount(inv, weights=values, minlength=len(uniq))
+    src = (uniq >> 32).astype(np.int64)
+    day = (uniq & 0xFFFFFFFF).astype(np.int64)
+    return zip(src.tolist(), day.tolist(), counts.tolist(), sums.tolist())
+
+
+# ---------- DIGESTS ----------
+# hash() of ints / floats is the same in every process (only str is salted),
+# so sources go in as their crc32. Amounts count as the typed columns store
+# them: a number, else 0.
+
+def inventory_digest(inventory):
+    if hasattr(inventory, 'dates'):
+        n = inventory.n
+        crcs = [_crc(name) for name in inventory.interner.names]
+        rows = zip(inventory.dates[:n].tolist(), inventory.sources[:n].tolist(), np.nan_to_num(inventory.money['Cost'][:n]).tolist())
+        return sum(hash((day, crcs[sid] if sid >= 0 else 0, cost + 0.0)) for day, sid, cost in rows) % DIGEST_MOD
+    return sum(_item_hash(r.get('Date'), r.get('Source'), r.get('Cost')) for r in inventory) % DIGEST_MOD
+
+
+def history_digest(history):
+    if hasattr(history, 'dates'):
+        n = history.n
+        crcs = [_crc(name) for name in history.interner.names]
+        rows = zip(history.dates[:n].tolist(), history.sources[:n].tolist(), np.nan_to_num(history.money['Profit'][:n]).tolist(), history.extra[:n])
+        return sum(hash((day, crcs[sid] if sid >= 0 else 0, profit + 0.0, _link_key(extra or {}))) for day, sid, profit, extra in rows) % DIGEST_MOD
+    return sum(_sale_hash(r) for r in history) % DIGEST_MOD
+
+
+def _item_hash(date, source, cost):
+    return hash((_ordinal(date), _crc(source), _number(cost))) % DIGEST_MOD
+
+
+def _sale_hash(row):
+    return hash((_ordinal(row.get('Date')), _crc(row.get('Source')), _number(row.get('Profit')), _link_key(row))) % DIGEST_MOD
+
+
+def _link_key(row):
+    return (_ordinal(row.get('Acquired')), _number(row.get('Cost'))) if 'Acquired' in row else None
+
+
+def _ordinal(value):
+    day = parse_date(value) if value is not None else None
+    return day.toordinal() if day else NO_DATE
+
+
+def _crc(source): return zlib.crc32(source.encode()) if isinstance(source, str) else 0
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value: return 0.0
+    return float(value) + 0.0  # -0.0 -> 0.0
+
+
+def _money(value):
+    try: v = float(value or 0.0)
+    except (TypeError, ValueError): return 0.0
+    return v if v == v else 0.0  # NaN
@@ -0,0 +1,320 @@
+"""Hot-path benchmarks for Thrift Hunter.
+
+Times the code behind titan.py's hot spots in isolation, calling the
+library modules the script delegates to, so Streamlit never loads:
+  records / ledger    history columns, calculate_period_profit (ledger path)
+  journal / sqlite    load_data, save_data, save_row, compaction, profit_between
+  writebehind         save_data / save_row as the UI thread sees them
+  table               the dashboard's filtered page + DataFrame build
+  pricing             inventory revaluation
+  aging               sell-through rollups: rebuild, one Add / Sold, the dashboard report
+  titles              batch titles for listings / the inventory, cold and memoized
+  shards              get_live_data: the sharded database's first sync, a
+                      one-region delta, loading one region vs the whole
+                      database, against a local HTTP stand-in instead of GitHub
+  brands / vault / license   the lookups behind the database, and license
+                      checks against the stand-in instead of Gumroad
+  watchlist           load, add / dedupe, a 50-item batch removal with its
+                      journal write, one filtered page
+  comps               Smart Scan sold comps: one term across three marketplaces
+                      (fixture and HTTP stand-in adapters), a batch, a cache hit
+
+Histories and inventories are synthetic (benchmarks/synth.py) at each
+--sizes value; the database is --blacklist + --vault rows. Results go to
+benchmarks/results/<utc time>.json (or --out); --compare prints the
+ratio against an earlier result file.
+
+    python benchmarks/hotpaths.py
+    python benchmarks/hotpaths.py --sizes 1000 100000 --only journal,ledger
+    python benchmarks/hotpaths.py --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import synth  # noqa: E402
+from stand_in import StandIn  # noqa: E402
+
+SIZES = [1000, 100000, 1000000]
+
+
+class Suite:
+    def __init__(self, only=None, budget=2.0, repeat=5):
+        self.only = only
+        self.budget = budget
+        self.repeat = repeat
+        self.results = []
+
+    def wanted(self, name):
+        return not self.only or name.split('.')[0] in self.only
+
+    def time(self, name, fn, size=None, number=1, setup=None, **info):
+        # Best and median seconds per call over up to `repeat` runs (fewer
+        # when a run eats the budget); setup() runs untimed before each run
+        if not self.wanted(name): return None
+        runs = []
+        while len(runs) < self.repeat:
+            arg = setup() if setup else None
+            gc.collect()
+            t = time.perf_counter()
+            for _ in range(number): fn(arg) if setup else fn()
+            runs.append((time.perf_counter() - t) / number)
+            if sum(runs) * number > self.budget: break
+        res = {'name': name, 'size': size, 'best_s': min(runs), 'median_s': statistics.median(runs),
+               'runs': len(runs), 'number': number, **info}
+        self.results.append(res)
+        print(f"{name:<28} {'' if size is None else size:>9} {res['best_s'] * 1000:>12.3f} ms", flush=True)
+        return res
+
+
+# ---------- HISTORY / INVENTORY SIZE ----------
+def bench_rows(suite, n, work):
+    from ledger import ProfitLedger
+    from records import SalesColumns, InventoryColumns
+    from paging import Filters, TableView
+    from pricing import FeeRules, revalue
+    from storage import JournalStore, SQLiteStore, WriteQueue, WriteBehindStore
+
+    hist, inv = synth.history(n), synth.inventory(n)
+    cols = SalesColumns(hist)
+    inv_cols = InventoryColumns(inv)
+
+    suite.time('records.build_history', lambda: SalesColumns(hist), n)
+    ledger = ProfitLedger()
+    suite.time('ledger.rebuild', lambda: ledger.rebuild(cols), n)
+    suite.time('ledger.period', lambda: ledger.period('Monthly'), n, number=10000)
+    suite.time('ledger.add', lambda: ledger.add(hist[0]), n, number=10000)
+
+    # Dashboard table: filter + sort + one page + the DataFrame st.dataframe gets
+    filters = Filters('2024-01-01', None, 'Bins', 'wool')
+    def render(view): cols.to_frame(view.positions(cols, filters, 'Profit', True, 0, 50)[0])
+    suite.time('table.page_cold', render, n, setup=TableView)
+    warm = TableView(); render(warm)
+    suite.time('table.page_warm', lambda: render(warm), n, number=100)
+
+    suite.time('pricing.revalue', lambda: revalue(inv_cols, 0.0, 'eBay', 'USA 🇺🇸', FeeRules()), n)
+
+    # Aging rollups: the rebuild a stale save pays once, then per-event updates
+    if suite.wanted('aging'):
+        from aging import AgingRollup
+        suite.time('aging.rebuild', lambda: AgingRollup().rebuild(inv_cols, cols), n)
+        rollup = AgingRollup(); rollup.rebuild(inv_cols, cols)
+        sale = {**hist[0], 'Cost': inv[0]['Cost'], 'Acquired': inv[0]['Date']}
+        suite.time('aging.add_sold', lambda: (rollup.add(inv[0]), rollup.sale(sale)), n, number=1000)
+        suite.time('aging.summary', lambda: (rollup.overall(), rollup.summary('s'), rollup.summary('m')), n, number=20)
+        suite.time('aging.load', lambda t: AgingRollup(t), n, setup=lambda: rollup.totals)
+
+    # Batch titles: a fresh engine (cold memos) and a warm one (relisting the same rows)
+    if suite.wanted('titles'):
+        from titles import TitleEngine
+        from engine import TitleSpec
+        keywords = synth.database(0, 0)['keywords']
+        listing_rows = synth.listings(min(n, 100000))
+        suite.time('titles.batch_cold', lambda eng: eng.batch(listing_rows), len(listing_rows), setup=lambda: TitleEngine(keywords))
+        warm_titles = TitleEngine(keywords); warm_titles.batch(listing_rows)
+        suite.time('titles.batch_warm', lambda: warm_titles.batch(listing_rows), len(listing_rows))
+        specs = [TitleSpec("", it or "") for it in inv_cols.items]
+        suite.time('titles.inventory_cold', lambda eng: eng.batch(specs), n, setup=lambda: TitleEngine(keywords))
+
+    # JSON journal store: load_data / save_row / save_data / compaction
+    if suite.wanted('journal'):
+        path = os.path.join(work, f"journal-{n}.json")
+        store = JournalStore(path, compact_every=10 ** 9)
+        store.set('history', hist); store.set('inventory', inv); store.compact()
+        suite.time('journal.load', store.load, n, bytes=os.path.getsize(path))
+        suite.time('journal.save_row', lambda: store.insert('history', 0, hist[0]), n, number=20)
+        suite.time('journal.save_data', lambda: store.merge({'items_scanned': 1, 'theme': 'dark'}), n, number=20)
+        suite.time('journal.compact', store.compact, n)
+        os.remove(path)
+
+    # SQLite store
+    if suite.wanted('sqlite'):
+        path = os.path.join(work, f"store-{n}.db")
+        db = SQLiteStore(path)
+        suite.repeat, repeat = 1, suite.repeat  # the table only fills once
+        suite.time('sqlite.bulk_insert', lambda: (db.extend('history', hist), db.extend('inventory', inv)), n)
+        suite.repeat = repeat
+        suite.time('sqlite.load', db.load, n)
+        suite.time('sqlite.profit_between', lambda: db.profit_between('2024-01-01', '2024-02-01'), n, number=20)
+        suite.time('sqlite.query_page', lambda: db.query('history', filters, 'Profit', True, 50, 0), n, number=5)
+        suite.time('sqlite.save_row', lambda: db.insert('history', 0, hist[0]), n, number=20)
+        db.db.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix): os.remove(path + suffix)
+
+    # Write-behind: what the UI thread pays, and how long until it's on disk
+    if suite.wanted('writebehind'):
+        writer = WriteQueue()
+        path = os.path.join(work, f"wb-{n}.json")
+        wb = WriteBehindStore(JournalStore(path), writer)
+        wb.set('history', hist[:1000]); wb.flush()
+        suite.time('writebehind.save_data', lambda: wb.merge({'items_scanned': 1}), n, number=1000)
+        suite.time('writebehind.flush', lambda: (wb.append('inventory', inv[0]), wb.flush()), n, number=10)
+
+
+# ---------- DATABASE SIZE ----------
+def bench_database(suite, blacklist_n, vault_n, work):
+    from livedata import ShardedDatabase
+    from brands import BrandIndex
+    from vault import VaultIndex
+    from licensing import LicenseChecker, GumroadVerifier
+
+    db = synth.database(blacklist_n, vault_n)
+    raw = json.dumps(db).encode()
+    size = blacklist_n + vault_n
+    server = StandIn(raw).start()
+    try:
+        if suite.wanted('shards'):
+            import copy
+            manifest = server.publish(db)
+            murl = server.url("/db/manifest.json")
+            def sharded(cache=None, ttl=0): return ShardedDatabase(murl, cache_dir=cache or tempfile.mkdtemp(dir=work), bundled=os.devnull, ttl=ttl)
+            def synced():
+                live = sharded(); live.regions(); live.wanted.update(manifest['shards']); return live
+            suite.time('shards.sync_full', lambda live: live.refresh(), size, setup=synced,
+                       bytes=sum(e['bytes'] for e in manifest['shards'].values()))
+            live = synced(); live.refresh()
+            suite.time('shards.revalidate_304', live.refresh, size, number=5)
+            # One region edited: only its shard moves
+            changed = copy.deepcopy(db); changed['vault'][synth.REGIONS[0]] = changed['vault'][synth.REGIONS[0]][1:]
+            def delta():
+                server.publish(db); fresh = synced(); fresh.refresh(); server.publish(changed); return fresh
+            suite.time('shards.sync_one_region', lambda fresh: fresh.refresh(), size, setup=delta,
+                       bytes=server.publish(changed)['shards'][f"vault/{synth.REGIONS[0]}"]['bytes'])
+            server.publish(db)
+            cache = live.cache_dir
+            suite.time('shards.load_region', lambda: sharded(cache, 3600).vault(synth.REGIONS[1]), vault_n // len(synth.REGIONS))
+            suite.time('shards.load_all', lambda: sharded(cache, 3600).get(), size)
+
+        if suite.wanted('brands'):
+            suite.time('brands.build', lambda: BrandIndex(db['blacklist'], db['vault']), size)
+            index = BrandIndex(db['blacklist'], db['vault'])
+            terms = iter(f"vintage {w} sweater {i}" for i in range(10 ** 7) for w in synth.WORDS)
+            suite.time('brands.lookup', lambda: index.lookup(next(terms)), size, number=200)
+
+        if suite.wanted('vault'):
+            suite.time('vault.build', lambda: VaultIndex(db['vault']), vault_n)
+            vi = VaultIndex(db['vault'])
+            suite.time('vault.search', lambda: vi.search("vintage de", ["USA 🇺🇸"], None, 20.0, 'Margin'), vault_n, number=20)
+
+        if suite.wanted('license'):
+            verify = server.url("/v2/licenses/verify")
+            def checker(): return LicenseChecker(GumroadVerifier(verify), ["entml", "klwkxa"])
+            suite.time('license.check_cold', lambda c: c.check("VALID-KEY"), setup=checker)
+            suite.time('license.check_invalid', lambda c: c.check("NOPE"), setup=checker)
+            cached = checker(); cached.check("VALID-KEY")
+            suite.time('license.check_cached', lambda: cached.check("VALID-KEY"), number=1000)
+    finally:
+        server.stop()
+
+
+# ---------- WATCHLIST ----------
+def bench_watchlist(suite, work, n=1000):
+    if not suite.wanted('watchlist'): return
+    from storage import JournalStore
+    from watchlist import Watchlist
+    seed = Watchlist()
+    for i in range(n): seed.add(f"{synth.WORDS[i % len(synth.WORDS)]} camera {i}", f"https://www.ebay.com/itm/{i}", ["film"] if i % 3 else ["digital"])
+    rows = seed.rows()
+    suite.time('watchlist.load', lambda: Watchlist(rows), n)
+    wl = Watchlist(rows)
+    names = iter(range(10 ** 7))
+    suite.time('watchlist.add', lambda: wl.add(f"lens {next(names)}"), n, number=1000)
+    suite.time('watchlist.add_duplicate', lambda: wl.add("whatever", "http://ebay.com/itm/7/"), n, number=1000)
+    store = JournalStore(os.path.join(work, "watch.json"))
+    def fresh(): w = Watchlist(rows); store.set('watchlist', w.rows()); return w
+    def batch(w): store.remove_many('watchlist', w.remove_many([r['id'] for r in w.rows()[::n // 50]]))
+    suite.time('watchlist.remove_batch', batch, n, setup=fresh)
+    suite.time('watchlist.page', lambda: wl.page("camera", "film", 3, 25), n, number=100)
+
+
+# ---------- SOLD COMPS ----------
+def bench_comps(suite, latency=0.05):
+    # Three marketplaces answering in `latency` each: concurrent, a scan costs ~one
+    if not suite.wanted('comps'): return
+    from comps import CompsFetcher, FixtureAdapter, JSONAdapter
+    markets = ("ebay", "poshmark", "mercari")
+    terms = iter(f"{w} jacket {i}" for i in range(10 ** 7) for w in synth.WORDS)
+
+    def fixture(): return CompsFetcher([FixtureAdapter(m, latency=latency) for m in markets])
+    suite.time('comps.fixture_scan', lambda f: f.fetch("USA 🇺🇸", next(terms)), setup=fixture, latency=latency)
+    hot = fixture(); hot.fetch("USA 🇺🇸", "levis 501")
+    suite.time('comps.cached', lambda: hot.fetch("USA 🇺🇸", "levis 501"), number=10000)
+    server = StandIn(latency=latency).start()
+    http = CompsFetcher([JSONAdapter(m, server.url(f"/comps/{m}?q={{term}}&region={{region}}&sold={{sold}}")) for m in markets])
+    try:
+        http.fetch("USA 🇺🇸", "warm up")   # opens the pooled connections
+        suite.time('comps.http_scan', lambda: http.fetch("USA 🇺🇸", next(terms)), latency=latency)
+        suite.time('comps.http_batch', lambda: http.fetch_many("USA 🇺🇸", [next(terms) for _ in range(50)]), 50, latency=latency)
+    finally:
+        http.close(); hot.close()
+        server.stop()
+
+
+def environment():
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(HERE),
+                                 capture_output=True, text=True).stdout.strip() or None
+    except OSError: commit = None
+    import numpy, pandas
+    return {'time': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'), 'commit': commit,
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'numpy': numpy.__version__, 'pandas': pandas.__version__}
+
+
+def compare(results, old_path):
+    with open(old_path) as f: old = {(r['name'], r['size']): r for r in json.load(f)['results']}
+    print(f"\n{'vs ' + os.path.basename(old_path):<38} {'before':>12} {'after':>12} {'ratio':>7}")
+    for r in results:
+        prev = old.get((r['name'], r['size']))
+        if not prev: continue
+        ratio = r['best_s'] / prev['best_s'] if prev['best_s'] else float('inf')
+        flag = "  slower" if ratio > 1.25 else ("  faster" if ratio < 0.8 else "")
+        print(f"{r['name']:<28} {'' if r['size'] is None else r['size']:>9} {prev['best_s'] * 1000:>10.3f}ms "
+              f"{r['best_s'] * 1000:>10.3f}ms {ratio:>6.2f}x{flag}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="history / inventory rows")
+    ap.add_argument('--blacklist', type=int, default=20000, help="blacklist entries in the synthetic database")
+    ap.add_argument('--vault', type=int, default=50000, help="vault rows in the synthetic database")
+    ap.add_argument('--only', help="comma-separated groups, e.g. journal,ledger,shards")
+    ap.add_argument('--budget', type=float, default=2.0, help="seconds per case before it stops repeating")
+    ap.add_argument('--out', help="result file (default benchmarks/results/<utc time>.json)")
+    ap.add_argument('--compare', help="earlier result file to compare against")
+    args = ap.parse_args(argv)
+
+    suite = Suite(set(args.only.split(',')) if args.only else None, args.budget)
+    work = tempfile.mkdtemp(prefix="titan-bench-")
+    os.environ['TITAN_CACHE_DIR'] = os.path.join(work, "cache")
+    try:
+        for n in args.sizes: bench_rows(suite, n, work)
+        bench_database(suite, args.blacklist, args.vault, work)
+        bench_watchlist(suite, work)
+        bench_comps(suite)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    out = args.out or os.path.join(HERE, "results", datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump({'env': environment(), 'args': vars(args), 'results': suite.results}, f, indent=1)
+    print(f"\nwrote {out}")
+    if args.compare: compare(suite.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Local HTTP stand-in for the network calls the app makes: the raw
+database.json download, the sharded database (manifest.json + shards/,
+see livedata.write_shards), both with ETag / Last-Modified revalidation,
+the Gumroad license verify endpoint (keys starting with VALID- are
+accepted) and a sold-comps marketplace for comps.JSONAdapter: GET
+/comps/<market>?q=<term>&region=<region>&sold=1 returns {"prices": [...]},
+the same prices for the same query.
+
+    server = StandIn(database_bytes).start()
+    server.publish(database_dict)        # or set_file(path, bytes)
+    ShardedDatabase(server.url("/db/manifest.json"), ...)
+    GumroadVerifier(server.url("/v2/licenses/verify"))
+    JSONAdapter("eBay", server.url("/comps/ebay?q={term}&region={region}&sold={sold}"))
+    server.stop()
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StandIn:
+    def __init__(self, database=b"{}", latency=0.0):
+        self.latency = latency
+        self.hits = {}
+        self.files = {}   # path -> (bytes, etag, last-modified)
+        self.set_database(database)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = None
+
+    def set_database(self, raw):
+        self.set_file("/database.json", raw)
+
+    def set_file(self, path, raw):
+        self.files[path] = (raw, '"%s"' % hashlib.sha1(raw).hexdigest(), formatdate(time.time(), usegmt=True))
+
+    def publish(self, data, prefix="/db"):
+        # The sharded layout livedata.write_shards produces, served from memory
+        from livedata import build_shards
+        manifest, files = build_shards(data)
+        for name, raw in files.items(): self.set_file(f"{prefix}/{name}", raw)
+        self.set_file(f"{prefix}/manifest.json", json.dumps(manifest).encode())
+        return manifest
+
+    @staticmethod
+    def comps(path, n=12):
+        # Deterministic sold prices per (market, query)
+        rng = random.Random(hashlib.sha1(path.encode()).digest())
+        base = 8 + rng.random() * 110
+        return {"prices": [round(base * rng.lognormvariate(0, 0.35), 2) for _ in range(n)]}
+
+    def url(self, path):
+        return "http://127.0.0.1:%d%s" % (self.server.server_address[1], path)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stand-in", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, so pooled clients reuse connections
+
+            def log_message(self, *args): pass
+
+            def _send(self, code, body=b"", headers=()):
+                self.send_response(code)
+                for k, v in headers: self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                stand_in.hits[self.path] = stand_in.hits.get(self.path, 0) + 1
+                if stand_in.latency: time.sleep(stand_in.latency)
+                if urlsplit(self.path).path.startswith("/comps/"):
+                    return self._send(200, json.dumps(stand_in.comps(self.path)).encode(), [("Content-Type", "application/json")])
+                if self.path not in stand_in.files: return self._send(404)
+                raw, etag, modified = stand_in.files[self.path]
+                if self.headers.get("If-None-Match") == etag: return self._send(304)
+                self._send(200, raw, [("ETag", etag), ("Last-Modified", modified), ("Content-Type", "application/json")])
+
+            def do_POST(self):
+                stand_in.hits[self.path] = stand_in.hits.get(self.path, 0) + 1
+                if stand_in.latency: time.sleep(stand_in.latency)
+                form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+                key = form.get("license_key", [""])[0]
+                body = {"success": key.startswith("VALID-"), "purchase": {"refunded": False}}
+                self._send(200, json.dumps(body).encode(), [("Content-Type", "application/json")])
+
+        return Handler
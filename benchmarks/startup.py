@@ -0,0 +1,55 @@
+"""Time-to-first-paint per view for a cold titan.py session.
+
+Each view runs in a fresh interpreter (so nothing is already imported),
+opened straight into that view through ?view=. Reports the first script
+run, a second session in the same process, and which heavy modules the
+first run pulled in. Prints one JSON object per view.
+
+    python benchmarks/startup.py [view ...]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIEWS = ['dashboard', 'tools', 'vault', 'settings', 'help', 'supplies']
+HEAVY = ['pandas', 'numpy', 'requests', 'pyarrow']
+
+CHILD = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+view, script, heavy = sys.argv[1], sys.argv[2], sys.argv[3].split(",")
+def session():
+    at = AppTest.from_file(script, default_timeout=120)
+    at.query_params["view"] = view
+    t = time.perf_counter()
+    at.run()
+    return time.perf_counter() - t, at
+cold, at = session()
+loaded = [m for m in heavy if m in sys.modules]
+warm, _ = session()
+print(json.dumps({"view": view, "rendered": at.session_state["view"], "cold_s": round(cold, 4),
+                  "warm_s": round(warm, 4), "imported": loaded, "errors": [str(e.value) for e in at.exception]}))
+"""
+
+
+def measure(view, workdir):
+    # A Pro save file, so the Vault view is reachable
+    save = os.path.join(workdir, "titan.json")
+    with open(save, "w") as f: json.dump({"is_pro": True}, f)
+    env = dict(os.environ, TITAN_SAVE_FILE=save, TITAN_CACHE_DIR=os.path.join(workdir, "cache"))
+    out = subprocess.run([sys.executable, "-c", CHILD, view, os.path.join(ROOT, "titan.py"), ",".join(HEAVY)],
+                         cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(views):
+    with tempfile.TemporaryDirectory() as workdir:
+        for view in views: print(json.dumps(measure(view, workdir)), flush=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or VIEWS)
@@ -0,0 +1,93 @@
+"""Synthetic reseller data for the benchmarks: histories, inventories and
+databases with large blacklist / vault sections. Seeded, so two runs of
+the suite measure the same rows."""
+import datetime
+import json
+import os
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SOURCES = ["Goodwill", "Value Village", "Bins", "FB Marketplace", "Estate Sale", "Garage Sale", "Other"]
+WORDS = ["vintage", "wool", "denim", "leather", "jacket", "sweater", "boots", "flannel", "fleece", "hoodie",
+         "carhartt", "patagonia", "levis", "nike", "coach", "pendleton", "barbour", "pyrex", "corningware", "tee"]
+REGIONS = ["Canada 🇨🇦", "USA 🇺🇸", "UK 🇬🇧", "Europe 🇪🇺", "Australia 🇦🇺"]
+VELOCITY = ["⚡ Instant", "🔥 Fast", "🐢 Slow/High", "❄️ Winter", "💎 Rare", "📈 Steady"]
+START = datetime.date(2023, 1, 1)
+
+
+def _dates(rng, n, days=3 * 365):
+    offsets = rng.integers(0, days, n)
+    base = START.toordinal()
+    return [datetime.date.fromordinal(base + int(o)).isoformat() for o in offsets]
+
+
+def _items(rng, n):
+    picks = rng.integers(0, len(WORDS), (n, 3))
+    return [" ".join(WORDS[i] for i in row) for row in picks]
+
+
+def history(n, seed=1):
+    # Newest first, like st.session_state.history
+    rng = np.random.default_rng(seed)
+    dates = sorted(_dates(rng, n), reverse=True)
+    profit = np.round(rng.gamma(2.0, 15.0, n) - 5, 2)
+    src = rng.integers(0, len(SOURCES), n)
+    items = _items(rng, n)
+    return [{"Date": d, "Item": it, "Profit": float(p), "Source": SOURCES[s]}
+            for d, it, p, s in zip(dates, items, profit, src)]
+
+
+def inventory(n, seed=2):
+    rng = np.random.default_rng(seed)
+    dates = sorted(_dates(rng, n))
+    cost = np.round(rng.gamma(2.0, 4.0, n), 2)
+    expected = np.round(cost * rng.uniform(1.5, 6.0, n), 2)
+    src = rng.integers(0, len(SOURCES), n)
+    items = _items(rng, n)
+    return [{"Date": d, "Item": it, "Cost": float(c), "Expected": float(e), "Source": SOURCES[s]}
+            for d, it, c, e, s in zip(dates, items, cost, expected, src)]
+
+
+GENDERS = ["Men's", "Women's", "Unisex"]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL", "8", "9", "10", "28", "32"]
+COLORS = ["Black", "Forest Green", "Navy Blue", "Heather Grey", "Red", "Cream"]
+ERAS = ["Modern", "Vintage 90s", "Y2K", "Streetwear", "Gorpcore"]
+FEATURES = ["Rare", "Logo", "Zip Up", "Spellout", "Distressed", "Made in USA", "Single Stitch", "Embroidered"]
+
+
+def listings(n, seed=4):
+    # Title Builder / cli.py titles rows; roughly a third overflow 80 chars
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        words = rng.integers(0, len(WORDS), int(rng.integers(2, 6)))
+        feats = rng.choice(len(FEATURES), int(rng.integers(0, 5)), replace=False)
+        out.append({"Brand": WORDS[int(words[0])].title(), "Item": " ".join(WORDS[j] for j in words[1:]).title() + f" {i % 500}",
+                    "Gender": GENDERS[i % 3], "Size": SIZES[i % len(SIZES)], "Color": COLORS[i % len(COLORS)],
+                    "Era": ERAS[i % len(ERAS)], "Material": WORDS[int(rng.integers(1, 4))].title(),
+                    "Features": "; ".join(FEATURES[j] for j in feats)})
+    return out
+
+
+def _brand(rng, i):
+    word = "".join(chr(97 + c) for c in rng.integers(0, 26, int(rng.integers(4, 10))))
+    return f"{word.title()} {i}"
+
+
+def database(blacklist_n, vault_n, seed=3):
+    # A database.json-shaped dict; vault_n rows spread over the regions.
+    # The fee rules and keyword table are copied from the bundled database.
+    rng = np.random.default_rng(seed)
+    blacklist = [{"Brand": _brand(rng, i), "Risk": ["Extreme", "High", "Medium"][i % 3], "Reason": "Synthetic entry."}
+                 for i in range(blacklist_n)]
+    vault = {r: [] for r in REGIONS}
+    for i in range(vault_n):
+        lo = int(rng.integers(5, 200))
+        vault[REGIONS[i % len(REGIONS)]].append({
+            "Brand": _brand(rng, i), "Model": " ".join(WORDS[j] for j in rng.integers(0, len(WORDS), 2)).title(),
+            "Buy": f"${lo}", "Sell": f"${lo * 3}-${lo * 5}" if i % 4 else f"${lo * 4}+", "Vel": VELOCITY[i % len(VELOCITY)],
+        })
+    with open(os.path.join(ROOT, "database.json")) as f: bundled = json.load(f)
+    return {"blacklist": blacklist, "vault": vault, "fees": bundled.get("fees"), "keywords": bundled.get("keywords")}
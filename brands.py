@@ -0,0 +1,147 @@
+import math
+import re
+import threading
+from collections import OrderedDict
+
+# ==========================================
+# BRAND MATCHING
+# ==========================================
+# Finds blacklist and vault brands inside whatever the user typed into
+# Smart Scan ("vintage h&m sweater", "shien top", "Dr Martens 1460").
+# Brand names are split into aliases ("SHEIN / ROMWE"), qualifiers are
+# peeled off ("H&M (Basic)" -> "h&m" + "Basic") and everything is reduced to
+# lower-case letters and digits, so "H&M", "h & m" and "HM" all meet at
+# "hm". Exact hits come from a dict, one-letter typos from a deletion
+# index, and only when neither finds anything does the trigram index look
+# for looser spellings.
+# Build one index per database version and reuse it across reruns.
+
+WORD = re.compile(r"[a-z0-9]+")
+QUALIFIER = re.compile(r"\(([^)]*)\)")
+MAX_WORDS = 4
+
+
+class BrandEntry:
+    __slots__ = ('brand', 'kind', 'record', 'qualifier', 'region')
+
+    def __init__(self, brand, kind, record, qualifier, region=None):
+        self.brand, self.kind, self.record, self.qualifier, self.region = brand, kind, record, qualifier, region
+
+
+class Match:
+    __slots__ = ('entry', 'alias', 'score')
+
+    def __init__(self, entry, alias, score):
+        self.entry, self.alias, self.score = entry, alias, score
+
+
+def split_brand(name):
+    # "SHEIN / ROMWE" -> (["shein", "romwe"], ""); "H&M (Basic)" -> (["hm"], "Basic")
+    qualifier = ", ".join(q.strip() for q in QUALIFIER.findall(name))
+    bare = QUALIFIER.sub(" ", name)
+    aliases = [key(part) for part in bare.split("/")]
+    return [a for a in aliases if a], qualifier
+
+
+def words(text): return WORD.findall(text.lower().replace("&", " "))
+
+
+def key(text): return "".join(words(text))
+
+
+def trigrams(k):
+    k = f"${k}$"
+    return {k[i:i + 3] for i in range(len(k) - 2)}
+
+
+class BrandIndex:
+    def __init__(self, blacklist=(), vault=None):
+        self.entries = []
+        self.exact = {}      # alias key -> entry ids
+        self.aliases = []    # alias id -> (alias key, entry id, trigram set)
+        self.grams = {}      # trigram -> alias ids
+        self.deletes = {}    # alias key minus one letter -> alias ids (typos)
+        self.recent = OrderedDict()
+        self.lock = threading.Lock()  # one index serves every session
+        for rec in blacklist: self._add(BrandEntry(rec.get('Brand', ''), 'blacklist', rec, ''))
+        for region, rows in (vault or {}).items():
+            for rec in rows: self._add(BrandEntry(rec.get('Brand', ''), 'vault', rec, '', region))
+
+    def _add(self, entry):
+        aliases, entry.qualifier = split_brand(entry.brand)
+        eid = len(self.entries)
+        self.entries.append(entry)
+        for alias in aliases:
+            self.exact.setdefault(alias, []).append(eid)
+            aid = len(self.aliases)
+            grams = frozenset(trigrams(alias))
+            self.aliases.append((alias, eid, grams))
+            for g in grams: self.grams.setdefault(g, []).append(aid)
+            if len(alias) >= 4:
+                for d in deletions(alias): self.deletes.setdefault(d, []).append(aid)
+
+    def lookup(self, term, region=None, threshold=0.7, limit=5):
+        # Best match per brand entry, blacklist first, then by score. The
+        # script reruns with the same term on every click, so answers are
+        # kept in a small LRU.
+        ck = (term, region, threshold, limit)
+        with self.lock:
+            if ck in self.recent:
+                self.recent.move_to_end(ck)
+                return self.recent[ck]
+        spans = ["".join(toks[i:i + n]) for toks in [words(term)]
+                 for i in range(len(toks)) for n in range(1, MAX_WORDS + 1) if i + n <= len(toks)]
+        best = {}
+        for k in spans:
+            for eid in self.exact.get(k, ()): self._keep(best, eid, k, 1.0, region)
+            if len(k) >= 4: self._typos(best, k, region)
+        if not best:
+            for k in spans:
+                if len(k) >= 4: self._trigrams(best, k, threshold, region)
+        hits = sorted(best.values(), key=lambda m: (m.entry.kind != 'blacklist', -m.score))[:limit]
+        with self.lock:
+            self.recent[ck] = hits
+            if len(self.recent) > 256: self.recent.popitem(last=False)
+        return hits
+
+    def brand_in(self, text):
+        # Display name of a brand named word for word in free text ("" if
+        # none), longest name first: the brand field of a Batch Titles row
+        toks = words(text)
+        for n in range(min(MAX_WORDS, len(toks)), 0, -1):
+            for i in range(len(toks) - n + 1):
+                k = "".join(toks[i:i + n])
+                for eid in self.exact.get(k, ()):
+                    for part in QUALIFIER.sub(" ", self.entries[eid].brand).split("/"):
+                        if key(part) == k: return part.strip()
+        return ""
+
+    def _typos(self, best, k, region):
+        # One-letter typos and swaps ("shien"): shared single-letter deletions
+        for d in deletions(k) | {k}:
+            for aid in self.deletes.get(d, ()):
+                alias, eid, _ = self.aliases[aid]
+                if alias != k: self._keep(best, eid, alias, 0.9, region)
+
+    def _trigrams(self, best, k, threshold, region):
+        # Looser spellings: trigram Dice >= threshold. Any such alias must
+        # share one of the query's rarest grams, so only those are scanned.
+        grams = trigrams(k)
+        need = math.ceil(threshold * len(grams) / (2 - threshold))
+        rare = sorted(grams, key=lambda g: len(self.grams.get(g, ())))[:len(grams) - need + 1]
+        seen = set()
+        for g in rare:
+            for aid in self.grams.get(g, ()):
+                if aid in seen: continue
+                seen.add(aid)
+                alias, eid, alias_grams = self.aliases[aid]
+                score = 2.0 * len(grams & alias_grams) / (len(grams) + len(alias_grams))
+                if score >= threshold: self._keep(best, eid, alias, score, region)
+
+    def _keep(self, best, eid, alias, score, region):
+        entry = self.entries[eid]
+        if entry.kind == 'vault' and region and entry.region != region: return
+        if eid not in best or best[eid].score < score: best[eid] = Match(entry, alias, score)
+
+
+def deletions(k): return {k[:i] + k[i + 1:] for i in range(len(k))}
@@ -0,0 +1,156 @@
+import io
+from collections import Counter
+
+import pandas as pd
+
+from ledger import parse_date
+
+# ==========================================
+# BULK IMPORT / EXPORT
+# ==========================================
+# Spreadsheet and other-tool exports come in as CSV or Parquet, are read in
+# chunks (so 100k rows never sit in memory as one frame), normalized to the
+# history / inventory row shape, checked and de-duplicated, and handed back
+# one batch at a time so the caller can do one save per batch.
+#
+# Amounts take currency signs, thousands separators, accounting negatives
+# "(12.50)" and decimal commas "€12,50" / "1.234,56"; a money cell that is
+# still not a number rejects the row (counted in `invalid`) rather than
+# importing a wrong figure. Only rows already saved count as duplicates:
+# two identical sales in one file are two sales.
+
+CHUNK_ROWS = 20000
+
+FIELDS = {
+    'history': ['Date', 'Item', 'Profit', 'Source'],
+    'inventory': ['Date', 'Item', 'Cost', 'Expected', 'Source'],
+}
+REQUIRED_MONEY = {'history': 'Profit', 'inventory': 'Cost'}
+MONEY = ('Profit', 'Cost', 'Expected')
+
+# Lower-cased header -> field, for the usual spreadsheet names
+ALIASES = {
+    'date': 'Date', 'sold date': 'Date', 'sale date': 'Date', 'purchase date': 'Date', 'date sold': 'Date',
+    'item': 'Item', 'title': 'Item', 'name': 'Item', 'item name': 'Item', 'description': 'Item',
+    'profit': 'Profit', 'net': 'Profit', 'net profit': 'Profit',
+    'cost': 'Cost', 'buy': 'Cost', 'buy cost': 'Cost', 'purchase price': 'Cost', 'cogs': 'Cost',
+    'expected': 'Expected', 'price': 'Expected', 'list price': 'Expected', 'sell': 'Expected', 'expected sale': 'Expected',
+    'source': 'Source', 'store': 'Source', 'location': 'Source', 'sourced from': 'Source',
+}
+
+MONEY_JUNK = r"[^\d.,\-]"                 # currency signs, spaces, codes
+DECIMAL_COMMA = r"-?[\d.]*,\d{1,2}"        # "12,50", "1.234,56"
+NUMBER = r"-?(\d+(\.\d*)?|\.\d+)"
+
+
+class ImportStats:
+    def __init__(self):
+        self.added = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.batches = 0
+
+
+def read_chunks(fileobj, fmt, chunk_rows=CHUNK_ROWS):
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq  # optional: only needed for Parquet
+        for batch in pq.ParquetFile(fileobj).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(fileobj, chunksize=chunk_rows, dtype=str, keep_default_na=False)
+
+
+def normalize(df, kind, default_source="Import"):
+    # Frame of whatever columns came in -> frame of FIELDS[kind]; bad rows dropped
+    df = df.rename(columns={c: ALIASES.get(str(c).strip().lower(), c) for c in df.columns})
+    out = pd.DataFrame(index=df.index)
+    bad = pd.Series(False, index=df.index)
+    for field in FIELDS[kind]:
+        col = df[field] if field in df.columns else pd.Series(None, index=df.index, dtype=object)
+        if field == 'Date': out[field] = col.map(_iso)
+        elif field in ('Item', 'Source'): out[field] = col.fillna("").astype(str).str.strip()
+        else: out[field], unreadable = parse_money(col); bad = bad | unreadable
+    out['Source'] = out['Source'].where(out['Source'] != "", default_source)
+    out['Item'] = out['Item'].where(out['Item'] != "", "Item")
+    if 'Expected' in out: out['Expected'] = out['Expected'].fillna(0.0)
+    valid = out['Date'].notna() & out[REQUIRED_MONEY[kind]].notna() & ~bad
+    return out[valid], int((~valid).sum())
+
+
+def parse_money(col):
+    # (amounts, unreadable): "$1,234.50", "€12,50", "(12.50)", "-3" -> floats;
+    # `unreadable` marks non-empty cells that are still not a number
+    if pd.api.types.is_numeric_dtype(col): return pd.to_numeric(col, errors='coerce'), pd.Series(False, index=col.index)
+    text = col.fillna("").astype(str).str.strip()
+    negative = text.str.contains(r"\(.*\d.*\)")
+    clean = text.str.replace(MONEY_JUNK, "", regex=True)
+    comma = clean.str.fullmatch(DECIMAL_COMMA)
+    clean = clean.where(~comma, clean.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    clean = clean.where(comma, clean.str.replace(",", "", regex=False))
+    number = clean.str.fullmatch(NUMBER)
+    amounts = pd.to_numeric(clean.where(number), errors='coerce')
+    amounts = amounts.where(~negative, -amounts.abs())
+    return amounts, (text != "") & ~number
+
+
+def _iso(value):
+    day = parse_date(value) if value is not None and value == value else None
+    return day.isoformat() if day else None
+
+
+def row_key(row, kind):
+    return tuple(round(v, 2) if isinstance(v, float) else v for v in (row.get(f) for f in FIELDS[kind]))
+
+
+def import_batches(fileobj, fmt, kind, existing=(), stats=None):
+    # Yields lists of new, normalized rows. Each `existing` row absorbs one
+    # equal row of the file, so re-importing a file adds nothing while
+    # repeated sales within it are all kept
+    stats = stats or ImportStats()
+    saved = Counter(row_key(r, kind) for r in existing)
+    for chunk in read_chunks(fileobj, fmt):
+        frame, bad = normalize(chunk, kind)
+        stats.invalid += bad
+        batch = []
+        for row in frame.to_dict('records'):
+            key = row_key(row, kind)
+            if saved[key] > 0: saved[key] -= 1; stats.duplicates += 1; continue
+            batch.append(row)
+        if batch:
+            stats.added += len(batch)
+            stats.batches += 1
+            yield batch
+
+
+def export_bytes(rows, kind, fmt, chunk_rows=CHUNK_ROWS):
+    # Writes in chunks so exporting a big history never builds one huge frame
+    buf = io.BytesIO()
+    writer = None
+    chunk = []
+
+    def flush(first):
+        nonlocal writer
+        df = pd.DataFrame(chunk)
+        for f in FIELDS[kind]:
+            if f not in df.columns: df[f] = None
+        if fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # The schema is fixed per kind, not inferred from the first chunk:
+            # a column that is all None there would be typed null
+            schema = pa.schema([(f, pa.float64() if f in MONEY else pa.string()) for f in FIELDS[kind]])
+            cols = pd.DataFrame({f: pd.to_numeric(df[f], errors='coerce') if f in MONEY else df[f].astype('string')
+                                 for f in FIELDS[kind]})
+            if writer is None: writer = pq.ParquetWriter(buf, schema)
+            writer.write_table(pa.Table.from_pandas(cols, schema=schema, preserve_index=False))
+        else:
+            buf.write(df[FIELDS[kind]].to_csv(index=False, header=first).encode())
+
+    first = True
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            flush(first); first = False; chunk = []
+    if chunk or first: flush(first)
+    if writer is not None: writer.close()
+    return buf.getvalue()
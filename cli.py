@@ -0,0 +1,150 @@
+"""Batch jobs over Thrift Hunter save files, no Streamlit needed.
+
+    python cli.py periods data/                      # every user's period profits
+    python cli.py periods data/ab/<id>/titan.json --format json
+    python cli.py revalue data/ --marketplace Poshmark --region "USA 🇺🇸"
+    python cli.py revalue titan.json --out rows.csv  # per-item detail
+    python cli.py titles listings.csv --out titled.csv   # ranked, packed to 80 chars
+    python cli.py shard database.json --out db --prune   # publish the sharded database
+
+A PATH may be a save file (titan.json / titan.db) or a directory, which is
+searched for save files (the per-user layout under TITAN_DATA_DIR).
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+
+import engine
+from storage import open_store
+
+SAVE_NAMES = {"titan.json", "titan.db"}
+BUNDLED_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.json")
+
+
+def save_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                # A JSON save that was never compacted is only a journal so far
+                names = {n[:-len(".journal")] if n.endswith(".journal") else n for n in files}
+                for name in sorted(names & SAVE_NAMES): yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def emit(rows, fmt, out=sys.stdout):
+    rows = list(rows)
+    if fmt == 'json':
+        for r in rows: out.write(json.dumps(r) + "\n")
+        return
+    if not rows: return
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def cmd_periods(args):
+    today = datetime.date.fromisoformat(args.today) if args.today else None
+
+    def run():
+        for path in save_files(args.paths):
+            p = engine.period_profits(open_store(path), today=today)
+            yield {'file': path, 'weekly': round(p.weekly, 2), 'monthly': round(p.monthly, 2),
+                   'yearly': round(p.yearly, 2), 'lifetime': round(p.lifetime, 2), 'sales': p.sales}
+    emit(run(), args.format)
+
+
+def database_section(path, name):
+    with open(path) as f: return json.load(f).get(name)
+
+
+def fee_rules(path):
+    from pricing import FeeRules
+    return FeeRules(database_section(path, 'fees'))
+
+
+def cmd_revalue(args):
+    fees = fee_rules(args.database)
+    files = list(save_files(args.paths))
+    if args.out and len(files) != 1: sys.exit("--out needs exactly one save file")
+
+    def run():
+        for path in files:
+            store = open_store(path)
+            inventory = store.rows('inventory') if store.indexed else store.load().get('inventory', [])
+            r = engine.revalue_inventory(inventory, args.ship, args.marketplace, args.region, fees)
+            if args.out:
+                frame = r.frame.copy()
+                frame.insert(0, 'Item', [row.get('Item') for row in inventory])
+                frame.to_csv(args.out, index=False, float_format="%.2f")
+            yield {'file': path, 'items': r.items, 'cost': round(r.cost, 2), 'expected_net': round(r.expected_net, 2),
+                   'underwater': r.underwater}
+    emit(run(), args.format)
+
+
+def cmd_titles(args):
+    with open(args.csv, newline='', encoding='utf-8-sig') as f: rows = list(csv.DictReader(f))
+    out = open(args.out, 'w', newline='', encoding='utf-8') if args.out else sys.stdout
+    try:
+        if args.raw: titles = [engine.build_title(engine.spec_from_row(row)) for row in rows]
+        else:
+            from titles import TitleEngine
+            titles = TitleEngine(database_section(args.database, 'keywords')).batch(rows)
+        emit(({**row, 'Title': t, 'Chars': len(t), 'TooLong': len(t) > engine.EBAY_TITLE_LIMIT}
+              for row, t in zip(rows, titles)), 'csv', out)
+    finally:
+        if out is not sys.stdout: out.close()
+
+
+def cmd_shard(args):
+    from livedata import write_shards
+    with open(args.database, encoding='utf-8') as f: data = json.load(f)
+    manifest = write_shards(data, args.out, prune=args.prune)
+    emit(({'shard': name, 'file': e['file'], 'bytes': e['bytes']} for name, e in manifest['shards'].items()), args.format)
+    print(f"version {manifest['version']}", file=sys.stderr)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Thrift Hunter batch jobs")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+
+    p = sub.add_parser('periods', help="weekly / monthly / yearly / lifetime profit per save file")
+    p.add_argument('paths', nargs='+')
+    p.add_argument('--today', help="YYYY-MM-DD to compute the periods for (default: today)")
+    p.add_argument('--format', choices=['csv', 'json'], default='csv')
+    p.set_defaults(func=cmd_periods)
+
+    p = sub.add_parser('revalue', help="net profit of the inventory at current fees")
+    p.add_argument('paths', nargs='+')
+    p.add_argument('--marketplace', default='eBay')
+    p.add_argument('--region', default=None)
+    p.add_argument('--ship', type=float, default=0.0, help="shipping you pay per item")
+    p.add_argument('--database', default=BUNDLED_DB, help="database.json with the fee rules")
+    p.add_argument('--out', help="write per-item rows to this CSV (one save file only)")
+    p.add_argument('--format', choices=['csv', 'json'], default='csv')
+    p.set_defaults(func=cmd_revalue)
+
+    p = sub.add_parser('titles', help="build eBay titles for every row of a CSV")
+    p.add_argument('csv')
+    p.add_argument('--out')
+    p.add_argument('--database', default=BUNDLED_DB, help="database.json with the keyword table")
+    p.add_argument('--raw', action='store_true', help="join every field as-is instead of ranking / packing to 80 chars")
+    p.set_defaults(func=cmd_titles)
+
+    p = sub.add_parser('shard', help="split database.json into a manifest + content-hashed shards")
+    p.add_argument('database', nargs='?', default=BUNDLED_DB)
+    p.add_argument('--out', default=os.path.join(os.path.dirname(BUNDLED_DB), "db"))
+    p.add_argument('--prune', action='store_true', help="delete shards the new manifest no longer lists")
+    p.add_argument('--format', choices=['csv', 'json'], default='csv')
+    p.set_defaults(func=cmd_shard)
+
+    args = ap.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
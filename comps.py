@@ -0,0 +1,276 @@
+import abc
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import random
+import re
+import statistics
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote_plus
+
+# ==========================================
+# SOLD COMPS FETCH
+# ==========================================
+# Smart Scan asks every configured marketplace adapter for sold prices of
+# the scanned term at once and pre-fills the Profit Engine's "Sell" with
+# the median, so a scan is one parallel round-trip instead of a tab per
+# marketplace. Pieces:
+#   Adapter        one marketplace: async sold(pool, region, term, sold) -> prices
+#   FixtureAdapter offline stand-in: prices from a {term: [prices]} table, or
+#                  deterministic synthetic ones, after an optional fake latency
+#   JSONAdapter    any HTTP endpoint returning a JSON list of prices
+#   Pool           a thread pool driven from the event loop's executor, each
+#                  thread with its own keep-alive requests.Session; no async
+#                  HTTP client in requirements
+#   CompsCache     (region, term, sold) -> Comps, TTL + LRU
+#   CompsFetcher   owns an event loop thread, the pool and the cache; fetch()
+#                  is the blocking call the script makes
+# Two sessions scanning the same term while it is in flight share one fetch.
+# A fetch where every adapter failed is returned but not cached.
+#
+# TITAN_COMPS lists the adapters, whitespace-separated:
+#   fixture                      synthetic prices
+#   fixture:comps.json           prices from a file
+#   ebay=https://host/sold?q={term}&region={region}&sold={sold}
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def norm_term(term):
+    return " ".join(TOKEN.findall(str(term).lower().replace("'", "")))
+
+
+class Comps:
+    __slots__ = ('region', 'term', 'prices', 'sources', 'errors', 'elapsed', 'fetched_at')
+
+    def __init__(self, region, term, sources, errors, elapsed):
+        self.region, self.term = region, term
+        self.sources = sources   # adapter name -> prices
+        self.errors = errors     # adapter name -> message
+        self.prices = sorted(p for ps in sources.values() for p in ps)
+        self.elapsed = elapsed
+        self.fetched_at = time.time()
+
+    @property
+    def n(self): return len(self.prices)
+
+    @property
+    def median(self): return statistics.median(self.prices) if self.prices else None
+
+    @property
+    def spread(self):
+        # (25th, 75th) percentile, or None below two samples
+        if len(self.prices) < 2: return None
+        q = statistics.quantiles(self.prices, n=4)
+        return q[0], q[2]
+
+    @property
+    def ok(self): return bool(self.sources)
+
+
+# ---------- ADAPTERS ----------
+class Adapter(abc.ABC):
+    name = "adapter"
+
+    @abc.abstractmethod
+    async def sold(self, pool, region, term, sold=True):
+        # Prices of the term's sold (sold=False: active) listings in the region
+        ...
+
+
+class FixtureAdapter(Adapter):
+    def __init__(self, name="Fixture", samples=None, latency=0.0, n=12, fail=0.0):
+        self.name = name
+        self.samples = {norm_term(k): [float(p) for p in v] for k, v in (samples or {}).items()}
+        self.latency, self.n, self.fail = latency, n, fail
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path, **kw):
+        with open(path, encoding='utf-8') as f: return cls(samples=json.load(f), **kw)
+
+    async def sold(self, pool, region, term, sold=True):
+        self.calls += 1
+        if self.latency: await asyncio.sleep(self.latency)
+        key = norm_term(term)
+        rng = random.Random(hashlib.sha1(f"{self.name}|{region}|{key}|{sold}".encode()).digest())
+        if self.fail and rng.random() < self.fail: raise ConnectionError(f"{self.name} unavailable")
+        if self.samples: return list(self.samples.get(key, []))
+        # Same term -> same prices: log-normal around a per-term base
+        base = 8 + rng.random() * 110
+        return [round(base * rng.lognormvariate(0, 0.35), 2) for _ in range(self.n)]
+
+
+class JSONAdapter(Adapter):
+    # url: template with {term} {region} {sold}; the response is a list of
+    # prices, {"prices": [...]} or {"items": [{"price": ...}, ...]}
+    def __init__(self, name, url):
+        self.name, self.url = name, url
+
+    async def sold(self, pool, region, term, sold=True):
+        url = self.url.format(term=quote_plus(term), region=quote_plus(region), sold=int(bool(sold)))
+        return _prices(await pool.get_json(url))
+
+
+def _prices(body):
+    if isinstance(body, dict): body = body.get('prices', body.get('items', []))
+    out = []
+    for v in body or []:
+        if isinstance(v, dict): v = v.get('price')
+        try: p = float(v)
+        except (TypeError, ValueError): continue
+        if p > 0: out.append(p)
+    return out
+
+
+def adapters_from_spec(spec):
+    out = []
+    for part in (spec or "").split():
+        if part == "fixture": out.append(FixtureAdapter())
+        elif part.startswith("fixture:"): out.append(FixtureAdapter.from_file(part[len("fixture:"):]))
+        elif "=" in part:
+            name, _, url = part.partition("=")
+            out.append(JSONAdapter(name, url))
+    return out
+
+
+# ---------- HTTP POOL ----------
+class Pool:
+    def __init__(self, size=8, timeout=4.0):
+        self.size, self.timeout = size, timeout
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=size, thread_name_prefix="comps-http")
+        self.local = threading.local()  # one Session per executor thread: Session isn't thread-safe
+        self.sessions = []
+        self.lock = threading.Lock()
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            import requests  # first use is on an executor thread, not at app start
+            session = self.local.session = requests.Session()
+            with self.lock: self.sessions.append(session)
+        return session
+
+    def _get(self, url):
+        r = self._session().get(url, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    async def get_json(self, url):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._get, url)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        with self.lock:
+            for session in self.sessions: session.close()
+            self.sessions = []
+
+
+# ---------- CACHE ----------
+class CompsCache:
+    def __init__(self, ttl=900, max_entries=512):
+        self.ttl, self.max_entries = ttl, max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()   # key -> Comps, least recently used first
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+
+    def get(self, key):
+        with self.lock:
+            c = self.entries.get(key)
+            if c is None: self.stats['misses'] += 1; return None
+            if time.time() - c.fetched_at > self.ttl:
+                del self.entries[key]
+                self.stats['expired'] += 1; self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return c
+
+    def put(self, key, comps):
+        with self.lock:
+            self.entries[key] = comps
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evicted'] += 1
+
+    def __len__(self): return len(self.entries)
+
+
+# ---------- FETCHER ----------
+class CompsFetcher:
+    def __init__(self, adapters, ttl=900, max_entries=512, timeout=4.0, pool_size=8):
+        self.adapters = list(adapters)
+        self.timeout = timeout
+        self.cache = CompsCache(ttl, max_entries)
+        self.pool = Pool(pool_size, timeout)
+        self.lock = threading.Lock()
+        self.pending = {}   # key -> concurrent Future of the fetch in flight
+        self.loop = None
+        self.stats = {'fetches': 0, 'shared': 0, 'adapter_calls': 0, 'adapter_errors': 0}
+
+    def __bool__(self): return bool(self.adapters)
+
+    def _loop(self):
+        # One event loop per fetcher, on a daemon thread; started on first fetch
+        if self.loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="comps-loop", daemon=True).start()
+            self.loop = loop
+        return self.loop
+
+    @staticmethod
+    def key(region, term, sold=True): return (region, norm_term(term), bool(sold))
+
+    # ---------- READ ----------
+    def fetch(self, region, term, sold=True):
+        # Blocking: the cached Comps, or one concurrent round-trip to every adapter
+        return self.fetch_many(region, [term], sold)[0]
+
+    def fetch_many(self, region, terms, sold=True):
+        keys = [self.key(region, t, sold) for t in terms]
+        todo = {}
+        for key, term in zip(keys, terms): todo.setdefault(key, term)
+        out, wait = {}, {}
+        with self.lock:
+            for key, term in todo.items():
+                comps = self.cache.get(key)
+                if comps is not None: out[key] = comps; continue
+                fut = self.pending.get(key)
+                if fut is None:
+                    fut = self.pending[key] = asyncio.run_coroutine_threadsafe(self._fetch(key, region, term, sold), self._loop())
+                else: self.stats['shared'] += 1
+                wait[key] = fut
+        for key, fut in wait.items(): out[key] = fut.result(self.timeout + 5)
+        return [out[k] for k in keys]
+
+    async def _fetch(self, key, region, term, sold):
+        t = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(asyncio.wait_for(a.sold(self.pool, region, term, sold), self.timeout)
+                                             for a in self.adapters), return_exceptions=True)
+            sources, errors = {}, {}
+            for a, r in zip(self.adapters, results):
+                if isinstance(r, BaseException): errors[a.name] = _describe(r)
+                else: sources[a.name] = r
+            comps = Comps(region, term, sources, errors, time.perf_counter() - t)
+            with self.lock:
+                self.stats['fetches'] += 1
+                self.stats['adapter_calls'] += len(self.adapters)
+                self.stats['adapter_errors'] += len(errors)
+            if comps.ok: self.cache.put(key, comps)
+            return comps
+        finally:
+            with self.lock: self.pending.pop(key, None)
+
+    def close(self):
+        if self.loop is not None: self.loop.call_soon_threadsafe(self.loop.stop)
+        self.pool.close()
+
+
+def _describe(exc):
+    if isinstance(exc, asyncio.TimeoutError): return "timed out"
+    return str(exc) or type(exc).__name__
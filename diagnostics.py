@@ -0,0 +1,178 @@
+import json
+import threading
+import time
+from collections import deque
+
+# ==========================================
+# RERUN PROFILER
+# ==========================================
+# Streamlit reruns titan.py top to bottom on every click. The script marks
+# where each numbered section starts (lap), wraps its I/O calls (timer) and
+# counts cache hits / misses (count); the profiler keeps running totals
+# per section / I/O op plus the last `keep` reruns, so slow ones can be
+# picked out. One profiler serves every session; each session's script
+# runs on its own thread, so the current rerun is thread-local.
+# Size tracking (DataFrames by memory, everything else by JSON length) is
+# off by default: it costs more than it measures.
+
+
+class Stat:
+    __slots__ = ('calls', 'total', 'worst', 'last')
+
+    def __init__(self):
+        self.calls, self.total, self.worst, self.last = 0, 0.0, 0.0, 0.0
+
+    def add(self, seconds):
+        self.calls += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.worst: self.worst = seconds
+
+    def as_dict(self):
+        return {'calls': self.calls, 'total_s': self.total, 'mean_s': self.total / self.calls if self.calls else 0.0,
+                'worst_s': self.worst, 'last_s': self.last}
+
+
+class Rerun:
+    __slots__ = ('view', 'started', 'at', 'lap_name', 'lap_start', 'sections', 'io', 'seconds')
+
+    def __init__(self, view):
+        self.view = view
+        self.started = time.perf_counter()
+        self.at = time.time()
+        self.lap_name, self.lap_start = None, self.started
+        self.sections = {}   # section -> seconds in this rerun
+        self.io = {}         # op -> seconds in this rerun
+        self.seconds = None
+
+
+class Profiler:
+    def __init__(self, keep=200, track_sizes=False):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.sections = {}
+        self.io = {}
+        self.counts = {}
+        self.sizes = {}        # name -> (bytes, key it was measured for)
+        self.reruns = Stat()
+        self.recent = deque(maxlen=keep)
+        self.track_sizes = track_sizes
+
+    # ---------- PER RERUN ----------
+    def start(self, view=None):
+        # A run still open here was cut short by st.rerun() / st.stop()
+        if getattr(self.local, 'run', None) is not None: self.count('rerun.aborted')
+        self.local.run = Rerun(view)
+
+    def lap(self, section):
+        # Ends the running section and starts `section`
+        run = getattr(self.local, 'run', None)
+        if run is None: return
+        now = time.perf_counter()
+        if run.lap_name is not None: self._record(run, run.lap_name, now - run.lap_start)
+        run.lap_name, run.lap_start = section, now
+
+    def finish(self, view=None):
+        run = getattr(self.local, 'run', None)
+        if run is None: return
+        self.lap(None)
+        run.seconds = time.perf_counter() - run.started
+        run.view = view or run.view
+        self.local.run = None
+        with self.lock:
+            self.reruns.add(run.seconds)
+            self.recent.append(run)
+
+    def _record(self, run, section, seconds):
+        run.sections[section] = run.sections.get(section, 0.0) + seconds
+        with self.lock: self.sections.setdefault(section, Stat()).add(seconds)
+
+    # ---------- I/O, COUNTERS, SIZES ----------
+    def timer(self, op):
+        return _Timer(self, op)
+
+    def _io(self, op, seconds):
+        run = getattr(self.local, 'run', None)
+        if run is not None: run.io[op] = run.io.get(op, 0.0) + seconds
+        with self.lock: self.io.setdefault(op, Stat()).add(seconds)
+
+    def count(self, event, n=1):
+        with self.lock: self.counts[event] = self.counts.get(event, 0) + n
+
+    def size(self, name, obj, key=None):
+        # Re-measured only when `key` changes (e.g. a database version)
+        if not self.track_sizes: return
+        if key is not None and self.sizes.get(name, (None, None))[1] == key: return
+        nbytes = measure(obj)
+        with self.lock: self.sizes[name] = (nbytes, key)
+
+    def reset(self):
+        with self.lock:
+            self.sections, self.io, self.counts, self.sizes = {}, {}, {}, {}
+            self.reruns = Stat()
+            self.recent.clear()
+
+    # ---------- EXPORT ----------
+    def snapshot(self):
+        with self.lock:
+            return {
+                'reruns': self.reruns.as_dict(),
+                'sections': {k: v.as_dict() for k, v in self.sections.items()},
+                'io': {k: v.as_dict() for k, v in self.io.items()},
+                'counts': dict(self.counts),
+                'sizes': {k: v[0] for k, v in self.sizes.items()},
+                'recent': [{'view': r.view, 'at': r.at, 'seconds': r.seconds, 'sections': dict(r.sections), 'io': dict(r.io)}
+                           for r in self.recent],
+            }
+
+    def to_json(self): return json.dumps(self.snapshot(), indent=1)
+
+    def to_prometheus(self, prefix="titan"):
+        snap = self.snapshot()
+        out = []
+
+        def family(name, kind, help_text, samples):
+            out.append(f"# HELP {prefix}_{name} {help_text}")
+            out.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                lab = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                out.append(f"{prefix}_{name}{{{lab}}} {value!r}" if lab else f"{prefix}_{name} {value!r}")
+
+        family("reruns_total", "counter", "Script reruns finished.", [({}, snap['reruns']['calls'])])
+        family("rerun_seconds_total", "counter", "Time spent in script reruns.", [({}, snap['reruns']['total_s'])])
+        family("rerun_seconds_max", "gauge", "Slowest script rerun.", [({}, snap['reruns']['worst_s'])])
+        for kind, label in (('sections', 'section'), ('io', 'op')):
+            stats = snap[kind].items()
+            family(f"{kind}_calls_total", "counter", f"Calls per {label}.", [({label: k}, v['calls']) for k, v in stats])
+            family(f"{kind}_seconds_total", "counter", f"Seconds per {label}.", [({label: k}, v['total_s']) for k, v in stats])
+            family(f"{kind}_seconds_max", "gauge", f"Slowest call per {label}.", [({label: k}, v['worst_s']) for k, v in stats])
+        family("events_total", "counter", "Cache hits / misses and other events.", [({'event': k}, v) for k, v in snap['counts'].items()])
+        if snap['sizes']:
+            family("size_bytes", "gauge", "Tracked object sizes.", [({'name': k}, v) for k, v in snap['sizes'].items()])
+        return "\n".join(out) + "\n"
+
+
+class _Timer:
+    __slots__ = ('prof', 'op', 't')
+
+    def __init__(self, prof, op):
+        self.prof, self.op = prof, op
+
+    def __enter__(self):
+        self.t = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof._io(self.op, time.perf_counter() - self.t)
+
+
+def measure(obj):
+    # Bytes held by a DataFrame / column store, else the JSON length
+    if hasattr(obj, 'memory_usage'): return int(obj.memory_usage(index=True, deep=True).sum())
+    if hasattr(obj, 'nbytes'): return int(obj.nbytes)
+    try: return len(json.dumps(obj, default=str))
+    except (TypeError, ValueError): return 0
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
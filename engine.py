@@ -0,0 +1,150 @@
+import datetime
+from dataclasses import dataclass, field
+
+from ledger import ProfitLedger
+from shared import freeze
+
+# ==========================================
+# HEADLESS ENGINE
+# ==========================================
+# Everything titan.py computes that isn't drawing widgets: period profits,
+# title building, size tables, license checks, inventory revaluation. Pure
+# functions over plain data (or a store from storage.open_store), so the
+# same code serves the Streamlit UI, the batch CLI (cli.py) and scripts.
+# numpy / pandas only load on the calls that need them.
+
+PERIODS = ['Weekly', 'Monthly', 'Yearly', 'Lifetime']
+EBAY_TITLE_LIMIT = 80
+
+# Static tables are frozen: one copy per process, shared by every session
+REGIONS = freeze({
+    "Canada 🇨🇦": {"sym": "$", "ebay": "ebay.ca", "posh": "poshmark.ca", "trends": ["Roots", "Arc'teryx", "Lululemon"]},
+    "USA 🇺🇸": {"sym": "$", "ebay": "ebay.com", "posh": "poshmark.com", "trends": ["Carhartt", "Patagonia", "Nike"]},
+    "UK 🇬🇧": {"sym": "£", "ebay": "ebay.co.uk", "posh": "poshmark.co.uk", "trends": ["Barbour", "Dr. Martens", "Stone Island"]},
+    "Europe 🇪🇺": {"sym": "€", "ebay": "ebay.de", "posh": "vinted.com", "trends": ["Adidas", "Puma", "Le Creuset"]},
+    "Australia 🇦🇺": {"sym": "$", "ebay": "ebay.com.au", "posh": "poshmark.com.au", "trends": ["R.M. Williams", "Spell & Gypsy", "AFL Gear"]},
+})
+DEFAULT_REGION = "Canada 🇨🇦"
+
+# US size -> other systems
+SIZE_TABLES = freeze({
+    "Men's Shoes": {
+        "7": {"UK": "6", "EU": "40", "CM": "25"},
+        "8": {"UK": "7", "EU": "41", "CM": "26"},
+        "9": {"UK": "8", "EU": "42.5", "CM": "27"},
+        "10": {"UK": "9", "EU": "44", "CM": "28"},
+        "11": {"UK": "10", "EU": "45", "CM": "29"},
+        "12": {"UK": "11", "EU": "46", "CM": "30"},
+    },
+    "Women's Shoes": {
+        "6": {"UK": "3.5", "EU": "36.5", "CM": "23"},
+        "7": {"UK": "4.5", "EU": "37.5", "CM": "24"},
+        "8": {"UK": "5.5", "EU": "38.5", "CM": "25"},
+        "9": {"UK": "6.5", "EU": "40", "CM": "26"},
+        "10": {"UK": "7.5", "EU": "41", "CM": "27"},
+    },
+    "Men's Tops": {
+        "S": {"UK/AU": "36", "EU": "46"},
+        "M": {"UK/AU": "38", "EU": "48"},
+        "L": {"UK/AU": "40", "EU": "50"},
+        "XL": {"UK/AU": "42", "EU": "52"},
+        "XXL": {"UK/AU": "44", "EU": "54"},
+    },
+})
+SIZE_DEFAULTS = freeze({"Men's Shoes": "9", "Women's Shoes": "7", "Men's Tops": "M"})
+
+
+# ---------- PERIOD PROFITS ----------
+@dataclass
+class PeriodProfits:
+    weekly: float = 0.0
+    monthly: float = 0.0
+    yearly: float = 0.0
+    lifetime: float = 0.0
+    sales: int = 0
+
+    def get(self, period): return getattr(self, period.lower(), 0.0)
+
+
+def period_bounds(period, today=None):
+    # (start, end) ISO dates for a goal period; end is exclusive
+    today = today or datetime.date.today()
+    if period == 'Weekly':
+        monday = today - datetime.timedelta(days=today.weekday())
+        return str(monday), str(monday + datetime.timedelta(days=7))
+    if period == 'Monthly':
+        nxt = datetime.date(today.year + today.month // 12, today.month % 12 + 1, 1)
+        return str(today.replace(day=1)), str(nxt)
+    if period == 'Yearly': return str(datetime.date(today.year, 1, 1)), str(datetime.date(today.year + 1, 1, 1))
+    return None, None
+
+
+def period_profit(period, store=None, ledger=None, today=None):
+    # The SQLite store sums sales itself; otherwise the running ledger answers
+    if store is not None and store.indexed: return store.profit_between(*period_bounds(period, today))
+    return ledger.period(period, today)
+
+
+def ledger_for(state):
+    # Ledger from a loaded save; rebuilt when it doesn't cover the history
+    history = state.get('history', [])
+    ledger = ProfitLedger(state.get('profit_totals'))
+    if not ledger.matches(history): ledger.rebuild(history)
+    return ledger
+
+
+def period_profits(store, state=None, today=None):
+    state = state if state is not None else store.load()
+    ledger = None if store.indexed else ledger_for(state)
+    out = PeriodProfits(**{p.lower(): period_profit(p, store, ledger, today) for p in PERIODS})
+    out.sales = store.count('history') if store.indexed else int(ledger.totals.get('n', len(state.get('history', []))))
+    return out
+
+
+# ---------- TITLES ----------
+@dataclass
+class TitleSpec:
+    brand: str
+    item: str
+    gender: str = ""
+    size: str = ""
+    color: str = ""
+    era: str = ""
+    material: str = ""
+    features: list = field(default_factory=list)
+
+
+def build_title(spec):
+    parts = [spec.brand, spec.item, spec.gender, spec.size, spec.color, spec.era, spec.material, *spec.features]
+    return " ".join(p.strip() for p in parts if p and p.strip())
+
+
+def spec_from_row(row):
+    # CSV / dict row with Brand, Item, Gender, Size, Color, Era, Material, Features ("a; b")
+    get = {str(k).strip().lower(): v for k, v in row.items()}.get
+    features = [f.strip() for f in str(get('features') or "").replace(",", ";").split(";") if f.strip()]
+    return TitleSpec(*(str(get(k) or "") for k in ('brand', 'item', 'gender', 'size', 'color', 'era', 'material')), features)
+
+
+# ---------- LICENSES ----------
+def check_license(key, checker, owner_key=None):
+    # (ok, message); the owner key never leaves the machine
+    clean_key = key.strip().upper()
+    if owner_key and clean_key == owner_key: return True, "Welcome Founder 🦅"
+    return checker.check(clean_key)
+
+
+# ---------- INVENTORY ----------
+@dataclass
+class Revaluation:
+    items: int
+    cost: float
+    expected_net: float
+    underwater: int
+    frame: object = None  # per-row pricing.score() frame
+
+
+def revalue_inventory(inventory, ship=0.0, marketplace='eBay', region=None, fees=None):
+    from pricing import DEFAULT_FEES, revalue
+    frame = revalue(inventory, ship, marketplace, region, fees or DEFAULT_FEES)
+    return Revaluation(len(frame), float(frame['Cost'].sum()), float(frame['Net'].sum()), int((frame['Net'] < 0).sum()), frame)
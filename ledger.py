@@ -0,0 +1,101 @@
+import datetime
+
+# ==========================================
+# RUNNING PROFIT TOTALS
+# ==========================================
+# One flat dict of profit sums per day, ISO week, month and year, plus the
+# lifetime total and the number of sales folded in. A sale touches six keys,
+# so "Mark Sold" updates it in O(1) and the goal / lifetime metrics are
+# plain lookups instead of a DataFrame scan of the whole history.
+#
+#   d:2024-05-17   w:2024-W20   m:2024-05   y:2024   all   n   h
+#
+# 'h' is an order-independent digest of every folded-in sale's (day,
+# profit), kept up to date by add(). A save whose history was
+# edited behind the ledger's back (same count, different rows) no longer
+# matches and gets rebuilt.
+
+DATE_FORMATS = ("%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d", "%b %d, %Y", "%d %b %Y")
+DIGEST_MOD = 1 << 64
+
+
+def parse_date(value):
+    text = str(value).strip()
+    try: return datetime.date.fromisoformat(text[:10])
+    except ValueError: pass
+    for fmt in DATE_FORMATS:
+        try: return datetime.datetime.strptime(text, fmt).date()
+        except ValueError: continue
+    return None
+
+
+def bucket_keys(day):
+    iso = day.isocalendar()
+    return [f"d:{day.isoformat()}", f"w:{iso[0]}-W{iso[1]:02d}", f"m:{day:%Y-%m}", f"y:{day.year}"]
+
+
+def period_key(period, today=None):
+    today = today or datetime.date.today()
+    keys = bucket_keys(today)
+    return {'Daily': keys[0], 'Weekly': keys[1], 'Monthly': keys[2], 'Yearly': keys[3]}.get(period, 'all')
+
+
+class ProfitLedger:
+    def __init__(self, totals=None):
+        self.totals = dict(totals or {})
+
+    def period(self, period, today=None):
+        return self.totals.get(period_key(period, today), 0.0)
+
+    def add(self, row):
+        # Returns the touched buckets so the caller can journal just those
+        profit = _profit(row)
+        day = parse_date(row.get('Date', ''))
+        keys = (bucket_keys(day) if day else []) + ['all']
+        for k in keys: self.totals[k] = self.totals.get(k, 0.0) + profit
+        self.totals['n'] = self.totals.get('n', 0) + 1
+        self.totals['h'] = (self.totals.get('h', 0) + _row_hash(day, profit)) % DIGEST_MOD
+        return {k: self.totals[k] for k in keys + ['n', 'h']}
+
+    def add_many(self, rows):
+        touched = {}
+        for row in rows: touched.update(self.add(row))
+        return touched
+
+    # ---------- CONSISTENCY ----------
+    def matches(self, history):
+        # Same sales, not just as many: the count first, then the digest
+        if self.totals.get('n', 0) != len(history) or 'h' not in self.totals: return False
+        return self.totals['h'] == digest(history)
+
+    def rebuild(self, history):
+        self.totals = {'all': 0.0, 'n': 0, 'h': 0}
+        if hasattr(history, 'day_totals'): return self._rebuild_days(history)
+        for row in history: self.add(row)
+        return self.totals
+
+    def _rebuild_days(self, history):
+        # records.SalesColumns hands over per-day sums; fold those instead
+        days, sums, undated = history.day_totals('Profit')
+        for ordinal, profit in zip(days.tolist(), sums.tolist()):
+            for k in bucket_keys(datetime.date.fromordinal(ordinal)):
+                self.totals[k] = self.totals.get(k, 0.0) + profit
+        self.totals['all'] = float(sums.sum()) + undated
+        self.totals['n'] = len(history)
+        self.totals['h'] = digest(history)
+        return self.totals
+
+
+def digest(history):
+    return sum(_row_hash(parse_date(row.get('Date', '')), _profit(row)) for row in history) % DIGEST_MOD
+
+
+def _row_hash(day, profit):
+    # hash() of ints / floats is the same in every process (only str is salted)
+    return hash((day.toordinal() if day else 0, profit)) % DIGEST_MOD
+
+
+def _profit(row):
+    try: profit = float(row.get('Profit') or 0.0)
+    except (TypeError, ValueError): return 0.0
+    return profit if profit == profit else 0.0  # NaN
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# ==========================================
+# LICENSE CHECKS
+# ==========================================
+# Asks every product permalink at once and answers on the first success,
+# so an invalid key costs one timeout instead of one per permalink.
+# Verified keys are remembered (as hashes, never the key itself) for `ttl`
+# seconds; an invalid key is not re-sent to Gumroad until `retry_after`
+# has passed. Any object with verify(permalink, key) can stand in for
+# Gumroad, e.g. GumroadVerifier pointed at a local stub server.
+
+GUMROAD_VERIFY_URL = "https://api.gumroad.com/v2/licenses/verify"
+
+MSG_OK = "License Verified ✅"
+MSG_INVALID = "Invalid Key or Expired Subscription ❌"
+MSG_UNREACHABLE = "Could not reach the license server. Try again in a minute. ⚠️"
+MSG_SLOW_DOWN = "Too many attempts with this key. Try again shortly. ⏳"
+
+
+class GumroadVerifier:
+    def __init__(self, url=GUMROAD_VERIFY_URL, timeout=10):
+        self.url = url
+        self.timeout = timeout
+        self.local = threading.local()  # one Session per pool thread: Session isn't thread-safe
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            import requests  # imported on the first check, not at app start
+            session = self.local.session = requests.Session()
+        return session
+
+    def verify(self, permalink, key):
+        # True / False from Gumroad; transport errors propagate
+        r = self._session().post(self.url, data={"product_permalink": permalink, "license_key": key}, timeout=self.timeout)
+        data = r.json()
+        return bool(data.get('success')) and not data.get('purchase', {}).get('refunded')
+
+
+class LicenseChecker:
+    def __init__(self, verifier, permalinks, ttl=7 * 86400, retry_after=60, cache_path=None):
+        self.verifier = verifier
+        self.permalinks = list(permalinks)
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        self.verified = self._load()   # key hash -> expires_at
+        self.rejected = {}             # key hash -> retry_at
+        self.pool = ThreadPoolExecutor(max_workers=max(len(self.permalinks), 1), thread_name_prefix="license")
+
+    def check(self, key):
+        h = key_hash(key)
+        now = time.time()
+        with self.lock:
+            if self.verified.get(h, 0) > now: return True, MSG_OK
+            if self.rejected.get(h, 0) > now: return False, MSG_SLOW_DOWN
+            self.rejected.pop(h, None)
+
+        result = self._ask_all(key)
+        with self.lock:
+            if result is True:
+                self.verified[h] = now + self.ttl
+                self._save()
+                return True, MSG_OK
+            if result is False:
+                # Drop every lapsed rejection so keys tried once don't pile up
+                self.rejected = {k: t for k, t in self.rejected.items() if t > now}
+                self.rejected[h] = now + self.retry_after
+                return False, MSG_INVALID
+        return False, MSG_UNREACHABLE
+
+    def _ask_all(self, key):
+        # True on the first success, False if every permalink said no,
+        # None if nobody gave an answer
+        futures = [self.pool.submit(self.verifier.verify, p, key) for p in self.permalinks]
+        answered = False
+        for fut in as_completed(futures):
+            try: ok = fut.result()
+            except Exception: continue
+            if ok:
+                for other in futures: other.cancel()
+                return True
+            answered = True
+        return False if answered else None
+
+    # ---------- CACHE FILE ----------
+    def _load(self):
+        if not self.cache_path: return {}
+        try:
+            with open(self.cache_path, 'r') as f: entries = json.load(f)
+        except (OSError, ValueError): return {}
+        now = time.time()
+        return {h: exp for h, exp in entries.items() if exp > now}
+
+    def _save(self):
+        if not self.cache_path: return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp = self.cache_path + ".tmp"
+            with open(tmp, 'w') as f: json.dump(self.verified, f)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass
+
+
+def key_hash(key):
+    return hashlib.sha256(("thrift-hunter-license:" + key).encode()).hexdigest()
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urljoin
+
+# ==========================================
+# LIVE DATABASE FETCH
+# ==========================================
+# Serves the market database without ever blocking a render on GitHub:
+#   1. the copy already in memory
+#   2. else the last good download kept on disk
+#   3. else the database.json bundled next to this file
+# When the copy is older than `ttl` a background thread revalidates it with
+# If-None-Match / If-Modified-Since. A failed or garbled download never
+# replaces a good copy, so an outage cannot empty the Blacklist or Vault.
+# ShardedDatabase below does all of this per shard.
+
+BUNDLED_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.json")
+CACHE_DIR = os.environ.get("TITAN_CACHE_DIR", ".titan_cache")
+
+
+# ==========================================
+# SHARDED DATABASE
+# ==========================================
+# The same data split for delta sync: a small manifest lists one shard for
+# everything but the vault ('core': blacklist, fees, keywords) and one per
+# vault region ('vault/USA 🇺🇸'). Shards are named by the sha256 of their
+# bytes, so they never change once published:
+#
+#   manifest.json   {"format": 1, "version": "...",
+#                    "shards": {"core": {"file": "shards/<sha>.json", "sha256": "<sha>", "bytes": 812}, ...}}
+#
+# The client revalidates only the manifest (ETag), downloads the shards it
+# has no copy of, checks every hash, and switches to the new manifest once
+# the shards it uses are all on disk. Region shards are read and parsed the
+# first time a view asks for that region; parsed shards are shared by every
+# session in the process. Offline, the bundled database.json is sharded in
+# memory; unchanged shards hash the same, so they are never downloaded.
+
+MANIFEST_FORMAT = 1
+
+
+def shard_bytes(obj):
+    # Deterministic, so the same data always hashes the same
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def build_shards(data):
+    # (manifest, {file: bytes}) for a database dict
+    parts = {'core': {k: v for k, v in data.items() if k != 'vault'}}
+    for region, rows in (data.get('vault') or {}).items(): parts[f"vault/{region}"] = rows
+    shards, files = {}, {}
+    for name, obj in parts.items():
+        raw = shard_bytes(obj)
+        sha = hashlib.sha256(raw).hexdigest()
+        shards[name] = {'file': f"shards/{sha[:32]}.json", 'sha256': sha, 'bytes': len(raw)}
+        files[shards[name]['file']] = raw
+    version = hashlib.sha256("".join(f"{n}={s['sha256']};" for n, s in sorted(shards.items())).encode()).hexdigest()
+    return {'format': MANIFEST_FORMAT, 'version': version, 'shards': shards}, files
+
+
+def write_shards(data, out_dir, prune=False):
+    # Publish: shards first, manifest last, so readers never see a manifest
+    # pointing at a missing shard. prune removes shards no longer listed.
+    manifest, files = build_shards(data)
+    for name, raw in files.items():
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path): _write_atomic(path, raw)
+    _write_atomic(os.path.join(out_dir, "manifest.json"), json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+    if prune:
+        keep = {os.path.basename(f) for f in files}
+        shard_dir = os.path.join(out_dir, "shards")
+        for name in os.listdir(shard_dir):
+            if name not in keep: os.remove(os.path.join(shard_dir, name))
+    return manifest
+
+
+class ShardedDatabase:
+    def __init__(self, url, cache_dir=CACHE_DIR, bundled=BUNDLED_DB, ttl=600, timeout=5):
+        self.url = url
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.meta_path = os.path.join(cache_dir, "manifest.meta.json")
+        self.bundled = bundled
+        self.ttl = ttl
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.manifest = None
+        self.meta = {}                 # etag / last_modified / checked_at
+        self.parsed = {}               # sha256 -> parsed shard, shared by every session
+        self.wanted = {'core'}         # shards this process has used; kept current on refresh
+        self.fallback = None           # (manifest, {sha: bytes}) from the bundled file
+        self.missing = set()           # shards asked for once; later ttl refreshes retry them
+        self.refreshing = None
+        self.stats = {'hits': 0, 'local_loads': 0, 'fetched': 0, 'not_modified': 0, 'failed': 0,
+                      'shards_parsed': 0, 'shards_fetched': 0, 'shard_bytes': 0, 'hash_mismatch': 0}
+
+    @property
+    def version(self):
+        with self.lock:
+            self._ensure_manifest()
+            return self.manifest['version']
+
+    def shard_version(self, name):
+        with self.lock:
+            self._ensure_manifest()
+            entry = self.manifest['shards'].get(name)
+            return entry['sha256'] if entry else None
+
+    def regions(self):
+        with self.lock:
+            self._ensure_manifest()
+            return [n[len("vault/"):] for n in self.manifest['shards'] if n.startswith("vault/")]
+
+    # ---------- READ ----------
+    def core(self): return self.shard('core') or {}
+
+    def vault(self, region): return self.shard(f"vault/{region}") or []
+
+    def shard(self, name):
+        with self.lock:
+            self._ensure_manifest()
+            if self.is_stale(): self._refresh_in_background()
+            self.wanted.add(name)
+            entry = self.manifest['shards'].get(name)
+            if entry is None: return None
+            sha = entry['sha256']
+            if sha in self.parsed: self.stats['hits'] += 1; return self.parsed[sha]
+            raw = self._local_shard(sha)
+            if raw is None:
+                # Not downloaded yet: serve the bundled copy of this shard
+                # (if there is one) and fetch the real one in the background
+                raw = self._bundled_shard(name)
+                if sha not in self.missing: self.missing.add(sha); self._refresh_in_background()
+                return json.loads(raw) if raw is not None else None
+            self.parsed[sha] = json.loads(raw)
+            self.stats['shards_parsed'] += 1
+            return self.parsed[sha]
+
+    def get(self):
+        # The whole database in the single-file shape (CLI / scripts)
+        data = dict(self.core())
+        data['vault'] = {r: self.vault(r) for r in self.regions()}
+        return data
+
+    def is_stale(self):
+        return time.time() - self.meta.get('checked_at', 0) > self.ttl
+
+    def _ensure_manifest(self):
+        if self.manifest is not None: return
+        self.stats['local_loads'] += 1
+        manifest = _parse_manifest(_read(self.manifest_path))
+        if manifest:
+            try: self.meta = json.loads(_read(self.meta_path) or b"{}")
+            except ValueError: self.meta = {}
+            self.manifest = manifest
+        else: self.manifest = self._bundled()[0]
+
+    def _bundled(self):
+        if self.fallback is None:
+            try: data = json.loads(_read(self.bundled) or b"{}")
+            except ValueError: data = {}
+            manifest, files = build_shards(data if isinstance(data, dict) else {})
+            self.fallback = manifest, {e['sha256']: files[e['file']] for e in manifest['shards'].values()}
+        return self.fallback
+
+    def _bundled_shard(self, name):
+        manifest, by_sha = self._bundled()
+        entry = manifest['shards'].get(name)
+        return by_sha.get(entry['sha256']) if entry else None
+
+    def _local_shard(self, sha):
+        raw = _read(self._shard_path(sha))
+        if raw is None or hashlib.sha256(raw).hexdigest() != sha: raw = self._bundled()[1].get(sha)
+        return raw
+
+    def _shard_path(self, sha): return os.path.join(self.cache_dir, "shards", sha + ".json")
+
+    # ---------- REFRESH ----------
+    def _refresh_in_background(self):
+        if self.refreshing and self.refreshing.is_alive(): return
+        self.refreshing = threading.Thread(target=self.refresh, name="live-db-refresh", daemon=True)
+        self.refreshing.start()
+
+    def refresh(self):
+        import requests  # first use is on the refresh thread, not at app start
+        with self.lock:
+            self._ensure_manifest()
+            current, wanted = self.manifest, set(self.wanted)
+        headers = {}
+        if self.meta.get('etag'): headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'): headers['If-Modified-Since'] = self.meta['last_modified']
+        try: r = requests.get(self.url, headers=headers, timeout=self.timeout)
+        except requests.RequestException: r = None
+        manifest, meta = current, dict(self.meta)
+        if r is not None and r.status_code == 200 and _parse_manifest(r.content):
+            manifest = _parse_manifest(r.content)
+            meta = {'etag': r.headers.get('ETag'), 'last_modified': r.headers.get('Last-Modified')}
+            self.stats['fetched'] += 1
+        elif r is not None and r.status_code == 304: self.stats['not_modified'] += 1
+        else: self.stats['failed'] += 1
+        # Shards this process uses that aren't on disk: only the changed ones
+        ok = True
+        for name in sorted(wanted):
+            entry = manifest['shards'].get(name)
+            if entry and not self._have(entry['sha256']): ok = self._fetch_shard(requests, entry) and ok
+        with self.lock:
+            if ok and manifest is not current:
+                _write_atomic(self.manifest_path, json.dumps(manifest, ensure_ascii=False).encode('utf-8'))
+                self.manifest, self.meta = manifest, meta
+                # Drop parsed shards the new manifest no longer lists
+                live = {e['sha256'] for e in manifest['shards'].values()}
+                self.parsed = {k: v for k, v in self.parsed.items() if k in live}
+            self.meta['checked_at'] = time.time()
+            _write_atomic(self.meta_path, json.dumps(self.meta).encode())
+        return self.manifest['version'] if ok else None
+
+    def _have(self, sha):
+        return sha in self.parsed or os.path.exists(self._shard_path(sha)) or sha in self._bundled()[1]
+
+    def _fetch_shard(self, requests, entry):
+        try: r = requests.get(urljoin(self.url, entry['file']), timeout=self.timeout)
+        except requests.RequestException: r = None
+        if r is None or r.status_code != 200: self.stats['failed'] += 1; return False
+        if hashlib.sha256(r.content).hexdigest() != entry['sha256']: self.stats['hash_mismatch'] += 1; return False
+        _write_atomic(self._shard_path(entry['sha256']), r.content)
+        self.stats['shards_fetched'] += 1
+        self.stats['shard_bytes'] += len(r.content)
+        return True
+
+    def wait(self, timeout=None):
+        t = self.refreshing
+        if t: t.join(timeout)
+
+
+def _parse_manifest(raw):
+    if not raw: return None
+    try: manifest = json.loads(raw)
+    except ValueError: return None
+    if not isinstance(manifest, dict) or manifest.get('format') != MANIFEST_FORMAT: return None
+    shards = manifest.get('shards')
+    if not isinstance(shards, dict) or 'core' not in shards: return None
+    if not all(isinstance(e, dict) and {'file', 'sha256'} <= set(e) for e in shards.values()): return None
+    return manifest
+
+
+def _read(path):
+    try:
+        with open(path, 'rb') as f: return f.read()
+    except OSError: return None
+
+
+def _write_atomic(path, raw):
+    # Best effort: a read-only disk just means no warm start next time
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except OSError:
+        pass
@@ -0,0 +1,71 @@
+from storage import iso_date
+
+# ==========================================
+# PAGED HISTORY / INVENTORY TABLES
+# ==========================================
+# The dashboard tables filter and sort on the server and only hand the
+# visible page to st.dataframe. TableView lives in session state and keeps
+# the matching row order between reruns, so typing in the Profit Engine
+# (which reruns the script) costs one page, not the whole list.
+
+PAGE_SIZES = [25, 50, 100]
+
+SORT_COLUMNS = {
+    'history': ['Date', 'Profit', 'Item', 'Source'],
+    'inventory': ['Date', 'Cost', 'Expected', 'Item', 'Source'],
+}
+
+
+class Filters:
+    __slots__ = ('start', 'end', 'source', 'text')
+
+    def __init__(self, start=None, end=None, source=None, text=""):
+        # start / end are inclusive ISO dates, source None means all
+        self.start, self.end, self.source, self.text = start, end, source, (text or "").strip().lower()
+
+    def key(self): return (self.start, self.end, self.source, self.text)
+
+    def match(self, row):
+        if self.start or self.end:
+            day = iso_date(row.get('Date', ''))
+            if self.start and day < self.start: return False
+            if self.end and day > self.end: return False
+        if self.source and row.get('Source') != self.source: return False
+        if self.text and self.text not in str(row.get('Item', '')).lower(): return False
+        return True
+
+
+class TableView:
+    def __init__(self):
+        self.sig = None
+        self.order = []
+
+    def page(self, rows, filters, sort='Date', desc=True, page=0, size=50):
+        positions, total = self.positions(rows, filters, sort, desc, page, size)
+        return [rows[i] for i in positions], total
+
+    def positions(self, rows, filters, sort='Date', desc=True, page=0, size=50):
+        # (list indexes on the page, matching rows); the cached order is only
+        # valid for the same list, length and query
+        sig = (id(rows), len(rows), filters.key(), sort, desc)
+        if sig != self.sig:
+            self.order = filter_sort(rows, filters, sort, desc)
+            self.sig = sig
+        lo = page * size
+        return self.order[lo:lo + size], len(self.order)
+
+
+def filter_sort(rows, filters, sort, desc):
+    # records.RecordColumns does the same in one numpy pass
+    if hasattr(rows, 'select'): return rows.select(filters, sort, desc)
+    order = [i for i, row in enumerate(rows) if filters.match(row)]
+    order.sort(key=lambda i: sort_key(rows[i].get(sort), sort), reverse=desc)
+    return order
+
+
+def sort_key(value, column):
+    # (rank, number, text) so numbers, text and blanks never get compared
+    if column == 'Date': return (0, 0, iso_date(value or '') or '')
+    if isinstance(value, (int, float)) and value == value: return (0, value, '')
+    if value is None or value == '': return (2, 0, '')
+    return (1, 0, str(value).lower())
@@ -0,0 +1,220 @@
+import bisect
+import functools
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# BATCH PROFIT ENGINE
+# ==========================================
+# The same math as the Profit Engine card (sale - cost - ship - fees), but
+# over whole arrays at once: a lot, the full inventory, a price sweep.
+#
+# Fees and shipping come from the `fees` section of database.json:
+#   marketplaces: scope ('*' or a region) -> marketplace -> rule
+#       rule: tiers  [{upto, rate, flat}, ...]  price bands, last has no upto
+#             mode   'marginal' (each rate on its slice, like income tax)
+#                    or 'bracket' (the band the price lands in sets the fee)
+#             cap    most the percentage part may charge on one order
+#             fixed  payment-processing fee per order
+#             categories {name: partial rule}  overrides for one category
+#   shipping: region -> {kg: [...], cost: [...], per_kg_over}
+# Rules merge least to most specific: the '*' marketplace rule, its '*'
+# category, the region's marketplace rule, the region's category. A
+# region's own settings so always beat global category defaults.
+# FeeRules compiles each (region, marketplace, category) into band arrays
+# once per database version; scalar lookups are memoized per price band.
+
+DEFAULT_MARKETPLACE = 'eBay'
+DEFAULT_CATEGORY = 'General'
+DEFAULT_WEIGHT = 1.0  # kg
+
+# Used only when the database carries no `fees` section (older remote copies)
+DEFAULT_RULES = {
+    'marketplaces': {'*': {
+        'eBay': {'tiers': [{'rate': 0.13}]}, 'Poshmark': {'tiers': [{'rate': 0.20}]},
+        'Mercari': {'tiers': [{'rate': 0.10}]}, 'Depop': {'tiers': [{'rate': 0.10}]}, 'Vinted': {'tiers': [{'rate': 0.0}]},
+    }},
+    'shipping': {'*': {'kg': [1.0], 'cost': [10.0]}},
+}
+
+
+class FeeRule:
+    # One compiled (region, marketplace, category): band arrays for the
+    # vector path, a small per-band memo for the scalar path
+    __slots__ = ('uppers', 'offset', 'base', 'rate', 'flat', 'cap', 'fixed', 'bands')
+
+    def __init__(self, spec):
+        tiers = spec.get('tiers') or [{'rate': 0.0}]
+        marginal = spec.get('mode', 'marginal') == 'marginal'
+        self.uppers = [float(t['upto']) for t in tiers[:-1]]
+        lows = [0.0] + self.uppers
+        self.rate = np.array([float(t.get('rate', 0.0)) for t in tiers])
+        self.flat = np.array([float(t.get('flat', 0.0)) for t in tiers])
+        self.offset = np.array(lows) if marginal else np.zeros(len(tiers))
+        base = np.zeros(len(tiers))
+        if marginal: base[1:] = np.cumsum(self.rate[:-1] * np.diff(lows))
+        self.base = base
+        self.cap = float(spec['cap']) if spec.get('cap') is not None else np.inf
+        self.fixed = float(spec.get('fixed', 0.0))
+        self.bands = {}
+
+    def fees(self, prices):
+        i = np.searchsorted(self.uppers, prices, side='left')
+        variable = self.base[i] + self.rate[i] * (prices - self.offset[i]) + self.flat[i]
+        return np.minimum(variable, self.cap) + self.fixed
+
+    def fee(self, price):
+        i = bisect.bisect_left(self.uppers, price)
+        band = self.bands.get(i)
+        if band is None:
+            band = self.bands[i] = (float(self.base[i]), float(self.rate[i]), float(self.offset[i]), float(self.flat[i]))
+        base, rate, offset, flat = band
+        return min(base + rate * (price - offset) + flat, self.cap) + self.fixed
+
+    def break_even(self, need):
+        # Lowest price whose proceeds (price - fees) cover `need`; each band
+        # and the cap give one linear candidate, the valid ones are kept
+        need = np.asarray(need, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cands = [(need + self.base[i] - self.rate[i] * self.offset[i] + self.flat[i] + self.fixed) / (1 - self.rate[i])
+                     for i in range(len(self.rate))]
+        if np.isfinite(self.cap): cands.append(need + self.cap + self.fixed)
+        best = np.full(need.shape, np.nan)
+        for p in cands:
+            p = np.where(np.isfinite(p) & (p >= 0), p, np.nan)
+            ok = np.abs(np.nan_to_num(p) - self.fees(np.nan_to_num(p)) - need) < 1e-6
+            best = np.fmin(best, np.where(ok, p, np.nan))
+        return best
+
+
+class FeeRules:
+    def __init__(self, spec=None):
+        spec = spec or DEFAULT_RULES
+        self.scopes = spec.get('marketplaces') or DEFAULT_RULES['marketplaces']
+        self.shipping_tables = {}
+        for region, t in (spec.get('shipping') or DEFAULT_RULES['shipping']).items():
+            self.shipping_tables[region] = (np.asarray(t['kg'], dtype=float), np.asarray(t['cost'], dtype=float),
+                                            float(t.get('per_kg_over', 0.0)))
+        self.compiled = {}
+        self.lock = threading.Lock()  # one instance serves every session
+
+    def marketplaces(self, region=None):
+        names = list(self.scopes.get('*', {}))
+        return names + [m for m in self.scopes.get(region, {}) if m not in names]
+
+    def categories(self, marketplace, region=None):
+        cats = [DEFAULT_CATEGORY]
+        for scope in ('*', region):
+            cats += [c for c in self.scopes.get(scope, {}).get(marketplace, {}).get('categories', {}) if c not in cats]
+        return cats
+
+    def rule(self, region, marketplace, category=None):
+        ck = (region, marketplace, category)
+        rule = self.compiled.get(ck)
+        if rule is None:
+            spec = {}
+            for scope in ('*', region):
+                market = self.scopes.get(scope, {}).get(marketplace, {})
+                spec.update({k: v for k, v in market.items() if k != 'categories'})
+                spec.update(market.get('categories', {}).get(category, {}))
+            if not spec and marketplace != DEFAULT_MARKETPLACE: return self.rule(region, DEFAULT_MARKETPLACE, category)
+            rule = FeeRule(spec)
+            with self.lock: self.compiled[ck] = rule
+        return rule
+
+    def fee(self, price, region, marketplace=DEFAULT_MARKETPLACE, category=None):
+        return self.rule(region, marketplace, category).fee(price)
+
+    def fees(self, prices, region, marketplaces=DEFAULT_MARKETPLACE, category=None):
+        return self._per_market('fees', prices, region, marketplaces, category)
+
+    def break_even(self, need, region, marketplaces=DEFAULT_MARKETPLACE, category=None):
+        return self._per_market('break_even', need, region, marketplaces, category)
+
+    def _per_market(self, method, values, region, marketplaces, category):
+        # One marketplace name, or one per row (grouped so each rule runs once)
+        values = np.asarray(values, dtype=float)
+        if isinstance(marketplaces, str): return getattr(self.rule(region, marketplaces, category), method)(values)
+        codes, names = pd.factorize(pd.Series(marketplaces, dtype=object).fillna(DEFAULT_MARKETPLACE))
+        out = np.empty(len(values))
+        for c, name in enumerate(names):
+            rows = codes == c
+            out[rows] = getattr(self.rule(region, name, category), method)(values[rows])
+        return out
+
+    def shipping(self, region, weight=DEFAULT_WEIGHT):
+        # Cost of the first weight step that fits; per_kg_over past the table
+        kg, cost, over = self.shipping_tables.get(region) or self.shipping_tables.get('*') or next(iter(self.shipping_tables.values()))
+        weight = np.asarray(weight, dtype=float)
+        i = np.minimum(np.searchsorted(kg, weight, side='left'), len(kg) - 1)
+        out = cost[i] + np.maximum(weight - kg[-1], 0) * over
+        return float(out) if out.ndim == 0 else out
+
+
+DEFAULT_FEES = FeeRules()
+
+
+def score(cost, price, ship=0.0, marketplace=DEFAULT_MARKETPLACE, region=None, fees=DEFAULT_FEES, category=None):
+    # Net profit, margin %, ROI % and break-even sale price for every row
+    cost, price, ship = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (cost, price, ship)))
+    cost, price, ship = np.atleast_1d(cost), np.atleast_1d(price), np.atleast_1d(ship)
+    fee = fees.fees(price, region, marketplace, category)
+    net = price - cost - ship - fee
+    break_even = fees.break_even(cost + ship, region, marketplace, category)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin = np.where(price > 0, net / price * 100, np.nan)
+        roi = np.where(cost > 0, net / cost * 100, np.nan)
+    return pd.DataFrame({'Cost': cost, 'Price': price, 'Ship': ship, 'Fees': fee, 'Net': net,
+                         'Margin': margin, 'ROI': roi, 'BreakEven': break_even}, copy=False)
+
+
+def net_profit(price, cost, ship, marketplace=DEFAULT_MARKETPLACE, region=None, fees=DEFAULT_FEES, category=None):
+    # Scalar shortcut for the single-item calculators
+    fee = fees.fee(price, region, marketplace, category)
+    return price - cost - ship - fee, fee
+
+
+def revalue(inventory, ship=0.0, marketplace=DEFAULT_MARKETPLACE, region=None, fees=DEFAULT_FEES):
+    # Whole inventory in one pass; records.InventoryColumns hands over its
+    # Cost / Expected columns without building row dicts
+    if hasattr(inventory, 'column'):
+        cost, price = inventory.column('Cost'), inventory.column('Expected')
+    else:
+        cost = np.array([r.get('Cost') or 0.0 for r in inventory], dtype=float)
+        price = np.array([r.get('Expected') or 0.0 for r in inventory], dtype=float)
+    return score(np.nan_to_num(cost), np.nan_to_num(price), ship, marketplace, region, fees)
+
+
+def lot_summary(lot_cost, items, avg_sale, ship=0.0, marketplace=DEFAULT_MARKETPLACE, region=None, fees=DEFAULT_FEES):
+    # Bulk Calculator: one lot split evenly over `items`
+    per = score(lot_cost / items, avg_sale, ship, marketplace, region, fees).iloc[0]
+    proceeds = per['Price'] - per['Fees'] - per['Ship']  # cash back per sale
+    return {
+        'cost_per': per['Cost'], 'net': per['Net'] * items, 'roi': per['ROI'],
+        'break_even_items': int(np.ceil(lot_cost / proceeds)) if proceeds > 0 else None,
+    }
+
+
+# ---------- OFFER SWEEPS ----------
+MARGIN_TARGETS = (15, 30, 50)
+
+
+@functools.lru_cache(maxsize=256)
+def offer_sweep(buy_cost, ship, marketplace=DEFAULT_MARKETPLACE, region=None, fees=DEFAULT_FEES, category=None,
+                targets=MARGIN_TARGETS, top=None):
+    # Net and margin at every price on a dense grid, plus the lowest offer
+    # that clears each target margin (None if no price on the grid does).
+    # Memoized per input tuple: slider drags re-render from the cache.
+    # The returned frame is shared, so callers must not modify it.
+    top = top or max(50.0, (buy_cost + ship) * 6)
+    step = max(0.05, round(top / 4000, 2))
+    prices = np.round(np.arange(0.0, top + step, step), 2)
+    curve = score(buy_cost, prices, ship, marketplace, region, fees, category)[['Price', 'Fees', 'Net', 'Margin']]
+    margin = np.nan_to_num(curve['Margin'].to_numpy(), nan=-np.inf)
+    floors = {}
+    for t in targets:
+        ok = np.flatnonzero(margin >= t)
+        floors[t] = float(prices[ok[0]]) if len(ok) else None
+    return curve, floors
@@ -0,0 +1,241 @@
+import datetime
+import math
+import threading
+
+import numpy as np
+
+from ledger import parse_date
+
+# ==========================================
+# TYPED SALES / INVENTORY COLUMNS
+# ==========================================
+# history and inventory used to be lists of loose dicts with string dates.
+# These classes keep the same list-of-dicts surface (len, index, iterate,
+# insert / append / pop) but store each field in a typed column: dates as
+# day ordinals, money as float64, sources interned to ints. Anything
+# that does not fit a column losslessly rides along in a per-row "extra"
+# dict, so to_rows() gives back exactly the JSON shape that was loaded.
+#
+# Rows are stored oldest-first. History is a newest-first list, so its
+# logical index 0 is the physical tail and "Mark Sold" is a plain append.
+
+NO_DATE = 0
+UNIX_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+class Interner:
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.lock = threading.Lock()
+
+    def id(self, name):
+        try: return self.ids[name]
+        except KeyError: pass
+        with self.lock:
+            if name not in self.ids:
+                self.ids[name] = len(self.names)
+                self.names.append(name)
+            return self.ids[name]
+
+
+class RecordColumns:
+    MONEY = ()           # float64 columns
+    NEWEST_FIRST = False
+
+    def __init__(self, rows=()):
+        rows = list(rows)
+        if self.NEWEST_FIRST: rows.reverse()
+        n = len(rows)
+        cap = max(16, n)
+        self.n = n
+        self.dates = np.zeros(cap, dtype=np.int32)
+        # Each column set interns its own sources: a process-wide table would
+        # only grow, across every user and every import
+        self.interner = Interner()
+        self.sources = np.zeros(cap, dtype=np.int32)
+        self.money = {c: np.zeros(cap, dtype=np.float64) for c in self.MONEY}
+        self.items = []
+        self.extra = []
+        for i, row in enumerate(rows): self._put(i, row)
+
+    # ---------- ENCODE / DECODE ----------
+    def _put(self, i, row):
+        extra = {k: v for k, v in row.items() if k not in ('Date', 'Item', 'Source') + self.MONEY}
+        raw = row.get('Date')
+        day = parse_date(raw) if raw is not None else None
+        self.dates[i] = day.toordinal() if day else NO_DATE
+        if day is None or raw != day.isoformat(): extra['Date'] = raw
+        src = row.get('Source')
+        if isinstance(src, str): self.sources[i] = self.interner.id(src)
+        else: self.sources[i] = -1; extra['Source'] = src
+        for c in self.MONEY:
+            v = row.get(c)
+            if isinstance(v, (int, float)) and not isinstance(v, bool): self.money[c][i] = v
+            else: self.money[c][i] = math.nan; extra[c] = v
+        if i == len(self.items): self.items.append(row.get('Item')); self.extra.append(extra or None)
+        else: self.items[i] = row.get('Item'); self.extra[i] = extra or None
+
+    def _get(self, i):
+        row = {}
+        ordinal = int(self.dates[i])
+        row['Date'] = datetime.date.fromordinal(ordinal).isoformat() if ordinal != NO_DATE else None
+        row['Item'] = self.items[i]
+        for c in self.MONEY: row[c] = float(self.money[c][i])
+        sid = int(self.sources[i])
+        row['Source'] = self.interner.names[sid] if sid >= 0 else None
+        if self.extra[i]: row.update(self.extra[i])
+        return row
+
+    def _phys(self, i):
+        if i < 0: i += self.n
+        if not 0 <= i < self.n: raise IndexError("record index out of range")
+        return self.n - 1 - i if self.NEWEST_FIRST else i
+
+    # ---------- LIST SURFACE ----------
+    def __len__(self): return self.n
+
+    def __bool__(self): return self.n > 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [self[j] for j in range(*i.indices(self.n))]
+        return self._get(self._phys(i))
+
+    def __setitem__(self, i, row): self._put(self._phys(i), row)
+
+    def __iter__(self):
+        order = range(self.n - 1, -1, -1) if self.NEWEST_FIRST else range(self.n)
+        for p in order: yield self._get(p)
+
+    def append(self, row):
+        if self.NEWEST_FIRST: self._insert_phys(0, row)
+        else: self._insert_phys(self.n, row)
+
+    def extend(self, rows):
+        # Bulk append in one shift of the columns instead of one per row
+        rows = list(rows)
+        k = len(rows)
+        while self.n + k > len(self.dates): self._grow()
+        if self.NEWEST_FIRST:
+            # The end of a newest-first list is the physical front
+            for col in self._columns(): col[k:self.n + k] = col[:self.n].copy()
+            self.items[:0] = [None] * k; self.extra[:0] = [None] * k
+            self.n += k
+            for p, row in enumerate(reversed(rows)): self._put(p, row)
+        else:
+            self.items.extend([None] * k); self.extra.extend([None] * k)
+            start, self.n = self.n, self.n + k
+            for p, row in enumerate(rows): self._put(start + p, row)
+
+    def insert(self, i, row):
+        i = max(0, min(self.n, i + self.n if i < 0 else i))
+        self._insert_phys(self.n - i if self.NEWEST_FIRST else i, row)
+
+    def pop(self, i=-1):
+        p = self._phys(i)
+        row = self._get(p)
+        for col in self._columns(): col[p:self.n - 1] = col[p + 1:self.n]
+        del self.items[p]; del self.extra[p]
+        self.n -= 1
+        return row
+
+    def __delitem__(self, i): self.pop(i)
+
+    def _insert_phys(self, p, row):
+        if self.n == len(self.dates): self._grow()
+        for col in self._columns(): col[p + 1:self.n + 1] = col[p:self.n].copy()
+        self.items.insert(p, None); self.extra.insert(p, None)
+        self.n += 1
+        self._put(p, row)
+
+    def _grow(self):
+        # New buffers, so views handed out earlier stay valid
+        cap = len(self.dates) * 2
+        self.dates = _resized(self.dates, cap)
+        self.sources = _resized(self.sources, cap)
+        self.money = {c: _resized(a, cap) for c, a in self.money.items()}
+
+    def _columns(self): return [self.dates, self.sources] + list(self.money.values())
+
+    def to_rows(self): return list(self)
+
+    @property
+    def nbytes(self):
+        # Typed columns only; item text and extras live in Python lists
+        return sum(c.nbytes for c in self._columns())
+
+    # ---------- VIEWS ----------
+    def column(self, name):
+        # Zero-copy numpy view in list order (reversed stride for history)
+        col = {'Date': self.dates, 'Source': self.sources}.get(name)
+        col = self.money[name] if col is None else col
+        view = col[:self.n]
+        return view[::-1] if self.NEWEST_FIRST else view
+
+    def to_frame(self, positions=None):
+        # The typed columns as a DataFrame: every row as zero-copy views, or
+        # just the logical `positions` (a table page) plus their extra fields
+        import pandas as pd
+        if positions is None: phys = slice(self.n - 1, None, -1) if self.NEWEST_FIRST and self.n else slice(0, self.n)
+        else: phys = np.fromiter((self._phys(i) for i in positions), dtype=np.intp, count=len(positions))
+        days = self.dates[phys]
+        frame = {'Date': np.where(days == NO_DATE, np.datetime64('NaT'), (days - UNIX_ORDINAL).astype('datetime64[D]')),
+                 'Item': self.items[phys] if positions is None else [self.items[p] for p in phys]}
+        for c in self.MONEY: frame[c] = self.money[c][phys]
+        # Code -1 (non-text source) becomes NaN
+        frame['Source'] = pd.Categorical.from_codes(self.sources[phys], self.interner.names[:])
+        frame = pd.DataFrame(frame, copy=False)
+        if positions is not None:
+            extras = [self.extra[p] or {} for p in phys]
+            for k in dict.fromkeys(k for e in extras for k in e):
+                if k not in frame: frame[k] = [e.get(k) for e in extras]
+        return frame
+
+    def day_totals(self, column):
+        # (day ordinals, summed values) over dated rows + the undated sum
+        days, vals = self.dates[:self.n], np.nan_to_num(self.money[column][:self.n])
+        dated = days != NO_DATE
+        uniq, inv = np.unique(days[dated], return_inverse=True)
+        return uniq, np.bincount(inv, weights=vals[dated], minlength=len(uniq)), float(vals[~dated].sum())
+
+    # ---------- FILTER / SORT ----------
+    def select(self, filters, sort='Date', desc=True):
+        # Logical indexes matching a paging.Filters, sorted, in one numpy pass
+        mask = np.ones(self.n, dtype=bool)
+        days = self.dates[:self.n]
+        if filters.start: mask &= days >= datetime.date.fromisoformat(filters.start).toordinal()
+        if filters.end: mask &= (days <= datetime.date.fromisoformat(filters.end).toordinal()) & (days != NO_DATE)
+        if filters.source: mask &= self.sources[:self.n] == self.interner.ids.get(filters.source, -2)
+        if filters.text:
+            mask &= np.fromiter((filters.text in str(s).lower() for s in self.items), dtype=bool, count=self.n)
+        phys = np.nonzero(mask)[0]
+        if sort == 'Date': keys = days[phys]
+        elif sort in self.money: keys = np.nan_to_num(self.money[sort][phys], nan=-np.inf)
+        elif sort == 'Source': keys = np.array([self.interner.names[s].lower() if s >= 0 else '' for s in self.sources[phys]])
+        else: keys = np.array([str(self.items[p] or '').lower() for p in phys])
+        # Ties keep list order
+        logical = (self.n - 1 - phys) if self.NEWEST_FIRST else phys
+        order = np.lexsort((logical, _descending(keys) if desc else keys))
+        return logical[order].tolist()
+
+
+def _descending(keys):
+    if keys.dtype.kind in 'if': return -keys.astype(np.float64)
+    # Rank strings so they can be negated
+    _, ranks = np.unique(keys, return_inverse=True)
+    return -ranks
+
+
+def _resized(a, cap):
+    b = np.zeros(cap, dtype=a.dtype)
+    b[:len(a)] = a
+    return b
+
+
+class SalesColumns(RecordColumns):
+    MONEY = ('Profit',)
+    NEWEST_FIRST = True
+
+
+class InventoryColumns(RecordColumns):
+    MONEY = ('Cost', 'Expected')
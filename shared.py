@@ -0,0 +1,129 @@
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+# ==========================================
+# SHARED READ-ONLY CACHE
+# ==========================================
+# Streamlit reruns titan.py for every session, so anything built in the
+# script (theme CSS, the blacklist table, size tables) used to be rebuilt
+# and held once per session. SharedCache keeps one copy per process:
+# entries are built on first use, handed to every session, and never
+# mutated. An entry built from the live database carries that database
+# version; invalidate(version) drops the ones built for any other version.
+#
+# Every get() also notes which session asked, so the diagnostics view can
+# show how much memory the sharing saves: an entry used by N sessions
+# would otherwise exist N times. Sessions end without telling anyone, so
+# only those seen in the last ACTIVE_WINDOW seconds count.
+#
+# Plain data is frozen (dicts -> read-only mappings, lists -> tuples);
+# DataFrames are shared as-is, so callers copy before changing one.
+
+
+ACTIVE_WINDOW = 1800
+
+
+def freeze(obj):
+    if isinstance(obj, (dict, MappingProxyType)): return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)): return tuple(freeze(v) for v in obj)
+    if isinstance(obj, set): return frozenset(obj)
+    return obj
+
+
+class Entry:
+    __slots__ = ('value', 'version', 'nbytes', 'builds', 'hits', 'sessions')
+
+    def __init__(self, value, version):
+        self.value, self.version = value, version
+        self.nbytes = deep_size(value)
+        self.builds, self.hits = 1, 0
+        self.sessions = {}   # session -> last seen
+
+    def seen(self, session, now):
+        if session is None: return
+        self.sessions[session] = now
+        if len(self.sessions) % 256 == 0: self.prune(now)
+
+    def prune(self, now):
+        cutoff = now - ACTIVE_WINDOW
+        self.sessions = {k: t for k, t in self.sessions.items() if t >= cutoff}
+
+
+class SharedCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.evicted = 0
+        self.version = None   # live-database version the entries were last synced to
+
+    def get(self, key, build, version=None, session=None):
+        # build() runs once per (key, version); a new version replaces the entry
+        with self.lock:
+            e = self.entries.get(key)
+            if e is not None and e.version == version:
+                e.hits += 1
+                e.seen(session, time.time())
+                return e.value
+        value = build()
+        with self.lock:
+            e = self.entries.get(key)
+            if e is not None and e.version == version: e.hits += 1  # another session won the race
+            else:
+                builds = e.builds + 1 if e is not None else 1
+                e = self.entries[key] = Entry(value, version)
+                e.builds = builds
+            e.seen(session, time.time())
+            return e.value
+
+    def invalidate(self, version=None):
+        # Drop entries tied to a database version other than `version`
+        # (everything versioned when None); unversioned entries stay
+        with self.lock: return self._invalidate(version)
+
+    def sync(self, version):
+        # Called with the current database version on every read of it; the
+        # first call after the version moves drops the entries built for the old one
+        with self.lock:
+            if version == self.version: return 0
+            self.version = version
+            return self._invalidate(version)
+
+    def _invalidate(self, version):
+        stale = [k for k, e in self.entries.items() if e.version is not None and e.version != version]
+        for k in stale: del self.entries[k]
+        self.evicted += len(stale)
+        return len(stale)
+
+    # ---------- METRICS ----------
+    def stats(self):
+        now = time.time()
+        with self.lock:
+            for e in self.entries.values(): e.prune(now)
+            rows = [{'key': _label(k), 'version': (str(e.version)[:12] if e.version is not None else ''), 'bytes': e.nbytes,
+                     'builds': e.builds, 'hits': e.hits, 'sessions': len(e.sessions),
+                     'saved_bytes': e.nbytes * max(len(e.sessions) - 1, 0)} for k, e in self.entries.items()]
+            sessions = set().union(*(e.sessions for e in self.entries.values())) if self.entries else set()
+        # Per session: the shared bytes it would otherwise hold itself
+        used = sum(r['bytes'] * r['sessions'] for r in rows)
+        return {'entries': rows, 'bytes': sum(r['bytes'] for r in rows), 'saved_bytes': sum(r['saved_bytes'] for r in rows),
+                'sessions': len(sessions), 'per_session_bytes': used / len(sessions) if sessions else 0.0, 'evicted': self.evicted}
+
+
+def _label(key):
+    return " / ".join(map(str, key)) if isinstance(key, tuple) else str(key)
+
+
+def deep_size(obj, _seen=None):
+    # Bytes held by obj and what it references; DataFrames report their own
+    if hasattr(obj, 'memory_usage'): return int(obj.memory_usage(index=True, deep=True).sum())
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen: return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (dict, MappingProxyType)):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(v, seen) for v in obj)
+    return size
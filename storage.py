@@ -0,0 +1,639 @@
+import atexit
+import collections
+import datetime
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ==========================================
+# JOURNALED SAVE FILE
+# ==========================================
+# titan.json stays a plain snapshot of the user's state. Every change made
+# after the snapshot is appended as one small JSON line to titan.json.journal,
+# so a save costs the size of the change, not the size of the history.
+# load() replays the journal on top of the snapshot; compact() folds the
+# journal back into a fresh snapshot with an atomic rename.
+#
+# Several sessions (or server processes) may write the same user's files:
+# every read and write holds an flock on titan.json.lock, each append takes
+# its seq from the journal's last line, and compaction folds what is on
+# disk rather than one session's copy, so no writer loses another's rows.
+# A session's list positions can be stale by then, so update / remove
+# records also carry the row they meant ('match'); replay applies them to
+# wherever that row is now and skips them when it is gone.
+
+SEQ_KEY = "_seq"
+
+
+class JournalStore:
+    indexed = False
+
+    def __init__(self, path, compact_every=500):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_every = compact_every
+        self.seq = 0
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.file_lock = FileLock(path + ".lock")
+
+    # ---------- READ ----------
+    def load(self):
+        with self.lock, self.file_lock: return self._load()
+
+    def _load(self):
+        state = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f: state = json.load(f)
+            except (OSError, ValueError): state = {}
+        self.seq = state.pop(SEQ_KEY, 0)
+        self.pending = 0
+        for rec in self._read_journal():
+            # Records at or below the snapshot seq were already folded in
+            # (compaction crashed between the rename and the truncate).
+            if rec['seq'] <= self.seq: continue
+            apply_record(state, rec)
+            self.seq = rec['seq']
+            self.pending += 1
+        return state
+
+    def _read_journal(self):
+        if not os.path.exists(self.journal_path): return
+        good = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try: rec = json.loads(line)
+                except ValueError: break
+                good += len(line)
+                yield rec
+        # Cut off a torn tail left by a crash mid-append, otherwise the next
+        # record would be glued onto the half-written line.
+        if good < os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as f: f.truncate(good)
+
+    def _last_seq(self):
+        # seq of the journal's last complete line, trimming a torn tail
+        try: f = open(self.journal_path, 'r+b')
+        except OSError: return None
+        with f:
+            size = f.seek(0, 2)
+            chunk = 4096
+            while True:
+                start = max(size - chunk, 0)
+                f.seek(start)
+                data = f.read()
+                end = data.rfind(b"\n")
+                if end < 0 and start == 0:
+                    f.truncate(0)
+                    return None
+                if end >= 0:
+                    if start + end + 1 < size: f.truncate(start + end + 1)
+                    head = data.rfind(b"\n", 0, end)
+                    if head >= 0 or start == 0:
+                        try: return json.loads(data[head + 1:end])['seq']
+                        except (ValueError, KeyError): return None
+                chunk *= 4
+
+    # ---------- WRITE ----------
+    def set(self, key, value): self.apply([('set', (key, value))])
+
+    def merge(self, values): self.apply([('merge', (values,))])
+
+    def patch(self, key, values): self.apply([('patch', (key, values))])
+
+    def append(self, key, row): self.apply([('append', (key, row))])
+
+    def extend(self, key, rows): self.apply([('extend', (key, rows))])
+
+    def insert(self, key, index, row): self.apply([('insert', (key, index, row))])
+
+    def update(self, key, index, row, match=None): self.apply([('update', (key, index, row, match))])
+
+    def remove(self, key, index, match=None): self.apply([('remove', (key, index, match))])
+
+    def remove_many(self, key, ids): self.apply([('remove_many', (key, ids))])
+
+    def apply(self, ops):
+        # Any number of (op, args) pairs in one append and one fsync
+        with self.lock, self.file_lock:
+            # Another writer may have appended or compacted since our last write
+            last = self._last_seq()
+            seq = self.seq if last is None else last
+            lines = []
+            for op, args in ops:
+                seq += 1
+                rec = make_record(op, args)
+                rec['seq'] = seq
+                lines.append(json.dumps(rec, separators=(',', ':')) + "\n")
+            with open(self.journal_path, 'a') as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self.seq = seq
+            self.pending += len(lines)
+
+    def needs_compaction(self):
+        return self.pending >= self.compact_every
+
+    def compact(self):
+        with self.lock, self.file_lock:
+            snap = self._load()
+            snap[SEQ_KEY] = self.seq
+            _write_atomic(self.path, json.dumps(snap))
+            # The journal restarts with a marker carrying the snapshot seq,
+            # so the next append still knows where numbering left off.
+            _write_atomic(self.journal_path, json.dumps({'op': 'base', 'key': None, 'seq': self.seq}) + "\n")
+            self.pending = 0
+
+    def clear(self):
+        with self.lock, self.file_lock:
+            for p in (self.path, self.journal_path, self.path + ".tmp", self.journal_path + ".tmp"):
+                if os.path.exists(p): os.remove(p)
+            self.seq = 0
+            self.pending = 0
+
+
+def _write_atomic(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class FileLock:
+    # Exclusive flock on a side file; a no-op where fcntl is missing (Windows)
+    def __init__(self, path):
+        self.path = path
+        self.f = None
+
+    def __enter__(self):
+        if fcntl is None: return self
+        self.f = open(self.path, 'a')
+        fcntl.flock(self.f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.f is not None:
+            fcntl.flock(self.f, fcntl.LOCK_UN)
+            self.f.close()
+            self.f = None
+
+
+def user_path(root, user_id, filename="titan.json"):
+    # data/<2-char shard>/<hashed user id>/titan.json, one directory per user
+    digest = hashlib.sha256(str(user_id).encode()).hexdigest()[:24]
+    folder = os.path.join(root, digest[:2], digest)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, filename)
+
+
+SAVE_PARTS = ("", ".journal", "-wal", "-shm")  # a save and its journal / SQLite WAL
+
+
+def claim_save(src, dest):
+    # Move a save shared by everyone from before per-user files to dest, once.
+    # Under the save's own lock, so two sessions racing for it can't split it
+    if not any(os.path.exists(src + ext) for ext in SAVE_PARTS): return False
+    with FileLock(src + ".lock"):
+        parts = [ext for ext in SAVE_PARTS if os.path.exists(src + ext)]
+        if not parts or any(os.path.exists(dest + ext) for ext in SAVE_PARTS): return False
+        for ext in parts: os.replace(src + ext, dest + ext)
+    # Anyone still waiting on the old lock finds nothing left to move
+    try: os.remove(src + ".lock")
+    except OSError: pass
+    return True
+
+
+def make_record(op, args):
+    if op == 'merge': return {'op': op, 'key': None, 'value': args[0]}
+    if op in ('insert', 'update'): rec = {'op': op, 'key': args[0], 'index': args[1], 'value': args[2]}
+    elif op == 'remove': rec = {'op': op, 'key': args[0], 'index': args[1]}
+    elif op == 'remove_many': return {'op': op, 'key': args[0], 'ids': list(args[1])}
+    else: return {'op': op, 'key': args[0], 'value': args[1]}  # set / patch / append / extend
+    match = args[3] if op == 'update' and len(args) > 3 else args[2] if op == 'remove' and len(args) > 2 else None
+    if match is not None: rec['match'] = match
+    return rec
+
+
+def apply_record(state, rec):
+    op, key = rec['op'], rec['key']
+    if op == 'set':
+        state[key] = rec['value']
+        return
+    if op == 'merge':
+        state.update(rec['value'])
+        return
+    if op == 'base': return
+    if op == 'patch':
+        state.setdefault(key, {}).update(rec['value'])
+        return
+    rows = state.setdefault(key, [])
+    if op == 'append': rows.append(rec['value'])
+    elif op == 'extend': rows.extend(rec['value'])
+    elif op == 'insert': rows.insert(rec['index'], rec['value'])
+    elif op in ('update', 'remove'):
+        i = locate(rows, rec['index'], rec.get('match'))
+        if i is None: return  # stale: the row was already removed or never got here
+        if op == 'update': rows[i] = rec['value']
+        else: del rows[i]
+    elif op == 'remove_many':
+        # Rows keyed by a stable 'id' (the watchlist); ids already gone are no-ops
+        drop = set(rec.get('ids', ()))
+        rows[:] = [r for r in rows if not (isinstance(r, dict) and r.get('id') in drop)]
+
+
+def locate(rows, index, match=None):
+    # Position the record meant: `index` while it still holds `match`, else
+    # wherever another writer moved that row; None when it is gone
+    in_range = 0 <= index < len(rows)
+    if match is None: return index if in_range else None
+    if in_range and same_row(rows[index], match): return index
+    return next((i for i, row in enumerate(rows) if same_row(row, match)), None)
+
+
+def same_row(a, b):
+    # Field-wise: a missing field equals None, 5 equals 5.0, NaN equals NaN
+    if not (isinstance(a, dict) and isinstance(b, dict)): return a == b
+    for k in a.keys() | b.keys():
+        x, y = a.get(k), b.get(k)
+        if x != y and not (isinstance(x, float) and isinstance(y, float) and x != x and y != y): return False
+    return True
+
+
+# ==========================================
+# SQLITE BACKEND (OPTIONAL)
+# ==========================================
+# Same load/save surface as JournalStore, but history / inventory / watchlist
+# live in indexed tables. Profit sums and counts run as SQL aggregates and a
+# session only preloads the newest rows it shows. Pick it by giving the save
+# file a .db / .sqlite extension. WAL mode lets readers and the single
+# writer of a user's database work side by side.
+
+# state key -> (table, columns, list order). History is newest-first.
+TABLES = {
+    'history': ('sales', ['Date', 'Item', 'Profit', 'Source'], 'DESC'),
+    'inventory': ('inventory', ['Date', 'Item', 'Cost', 'Expected', 'Source'], 'ASC'),
+    'watchlist': ('watchlist', ['name', 'link'], 'ASC'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sales (id INTEGER PRIMARY KEY, Date TEXT, Item TEXT, Profit REAL, Source TEXT, extra TEXT);
+CREATE TABLE IF NOT EXISTS inventory (id INTEGER PRIMARY KEY, Date TEXT, Item TEXT, Cost REAL, Expected REAL, Source TEXT, extra TEXT);
+CREATE TABLE IF NOT EXISTS watchlist (id INTEGER PRIMARY KEY, name TEXT, link TEXT, extra TEXT);
+CREATE INDEX IF NOT EXISTS idx_sales_date ON sales (Date, Profit);
+CREATE INDEX IF NOT EXISTS idx_sales_source ON sales (Source);
+CREATE INDEX IF NOT EXISTS idx_inventory_date ON inventory (Date);
+CREATE INDEX IF NOT EXISTS idx_inventory_source ON inventory (Source);
+"""
+
+
+def iso_date(value):
+    # Dates are saved as str(datetime.date.today()); keep them sortable as text
+    try: return datetime.date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError: return value if value is None else str(value)
+
+
+class SQLiteStore:
+    indexed = True
+
+    def __init__(self, path, preload=200):
+        self.path = path
+        self.preload = preload
+        self.lock = threading.Lock()
+        # Other processes may hold the write lock briefly; wait rather than fail
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    # ---------- READ ----------
+    def load(self):
+        with self.lock:
+            state = {k: json.loads(v) for k, v in self.db.execute("SELECT key, value FROM settings")}
+            for key in TABLES:
+                limit = -1 if key == 'watchlist' else self.preload
+                state[key] = self._rows(key, limit, 0)
+        return state
+
+    def rows(self, key, limit=-1, offset=0):
+        with self.lock: return self._rows(key, limit, offset)
+
+    def _rows(self, key, limit, offset):
+        table, cols, order = TABLES[key]
+        if order == 'ASC' and limit >= 0:
+            # Offsets count from the newest row; for an oldest-first list
+            # that window sits at the tail
+            start = self._count(table) - offset - limit
+            limit, offset = limit + min(start, 0), max(start, 0)
+        cur = self.db.execute(
+            f"SELECT {', '.join(cols)}, extra FROM {table} ORDER BY id {order} LIMIT ? OFFSET ?", (limit, offset))
+        return [self._to_row(cols, r) for r in cur]
+
+    def count(self, key):
+        with self.lock: return self._count(TABLES[key][0])
+
+    def _count(self, table):
+        return self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def query(self, key, filters, sort='Date', desc=True, limit=50, offset=0, positions=False):
+        # One page of a filtered, sorted table plus the total match count;
+        # positions=True pairs each row with its index in the list
+        table, cols, order = TABLES[key]
+        where, args = ["1=1"], []
+        if filters.start: where.append("Date >= ?"); args.append(filters.start)
+        if filters.end: where.append("Date <= ?"); args.append(filters.end)
+        if filters.source: where.append("Source = ?"); args.append(filters.source)
+        if filters.text: where.append("Item LIKE ?"); args.append(f"%{filters.text}%")
+        where = " AND ".join(where)
+        sort = sort if sort in cols else 'id'
+        direction = 'DESC' if desc else 'ASC'
+        pos = f"(SELECT COUNT(*) FROM {table} t WHERE t.id {'<' if order == 'ASC' else '>'} {table}.id), " if positions else ""
+        with self.lock:
+            total = self.db.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", args).fetchone()[0]
+            cur = self.db.execute(
+                f"SELECT {pos}{', '.join(cols)}, extra FROM {table} WHERE {where} ORDER BY {sort} {direction}, id {direction} LIMIT ? OFFSET ?",
+                args + [limit, offset])
+            if positions: return [(r[0], self._to_row(cols, r[1:])) for r in cur], total
+            return [self._to_row(cols, r) for r in cur], total
+
+    def profit_between(self, start=None, end=None):
+        # start / end are ISO dates; end is exclusive
+        sql, args = "SELECT COALESCE(SUM(Profit), 0) FROM sales WHERE 1=1", []
+        if start: sql += " AND Date >= ?"; args.append(start)
+        if end: sql += " AND Date < ?"; args.append(end)
+        with self.lock: return self.db.execute(sql, args).fetchone()[0]
+
+    # ---------- WRITE ----------
+    def set(self, key, value):
+        if key not in TABLES: return self.merge({key: value})
+        table, cols, order = TABLES[key]
+        with self.lock, self.db:
+            self.db.execute(f"DELETE FROM {table}")
+            # Oldest row gets the lowest id so ORDER BY id matches the list
+            rows = value if order == 'ASC' else list(reversed(value))
+            self.db.executemany(
+                f"INSERT INTO {table} ({', '.join(cols)}, extra) VALUES ({', '.join('?' * (len(cols) + 1))})",
+                [self._to_params(cols, r) for r in rows])
+
+    def merge(self, values):
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                                [(k, json.dumps(v)) for k, v in values.items()])
+
+    def patch(self, key, values):
+        with self.lock, self.db:
+            cur = self.db.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+            doc = json.loads(cur[0]) if cur else {}
+            doc.update(values)
+            self.db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(doc)))
+
+    def append(self, key, row):
+        table, cols, order = TABLES[key]
+        self._insert_at(table, cols, row, 'MAX' if order == 'ASC' else 'MIN')
+
+    def extend(self, key, rows):
+        table, cols, order = TABLES[key]
+        step = 1 if order == 'ASC' else -1
+        with self.lock, self.db:
+            end = self.db.execute(f"SELECT COALESCE({'MAX' if step > 0 else 'MIN'}(id), 0) FROM {table}").fetchone()[0]
+            self.db.executemany(
+                f"INSERT INTO {table} (id, {', '.join(cols)}, extra) VALUES (?, {', '.join('?' * (len(cols) + 1))})",
+                [(end + step * (i + 1),) + self._to_params(cols, r) for i, r in enumerate(rows)])
+
+    def insert(self, key, index, row):
+        table, cols, order = TABLES[key]
+        if index == 0: return self._insert_at(table, cols, row, 'MIN' if order == 'ASC' else 'MAX')
+        with self.lock:
+            if index < self._count(table): raise ValueError("SQLiteStore only inserts at either end of a list")
+        self.append(key, row)
+
+    def _insert_at(self, table, cols, row, end):
+        step = 1 if end == 'MAX' else -1
+        with self.lock, self.db:
+            self.db.execute(
+                f"INSERT INTO {table} (id, {', '.join(cols)}, extra) "
+                f"VALUES ((SELECT COALESCE({end}(id), 0) + {step} FROM {table}), {', '.join('?' * (len(cols) + 1))})",
+                self._to_params(cols, row))
+
+    def update(self, key, index, row, match=None):
+        table, cols, order = TABLES[key]
+        with self.lock, self.db:
+            rid = self._locate(table, cols, order, index, match)
+            if rid is None: return
+            self.db.execute(f"UPDATE {table} SET {', '.join(c + ' = ?' for c in cols)}, extra = ? WHERE id = ?",
+                            self._to_params(cols, row) + (rid,))
+
+    def remove(self, key, index, match=None):
+        table, cols, order = TABLES[key]
+        with self.lock, self.db:
+            rid = self._locate(table, cols, order, index, match)
+            if rid is not None: self.db.execute(f"DELETE FROM {table} WHERE id = ?", (rid,))
+
+    def _locate(self, table, cols, order, index, match):
+        # Row id at list position `index`, checked against `match` like
+        # locate(): another session may have shifted the list since
+        select = f"SELECT id, {', '.join(cols)}, extra FROM {table} ORDER BY id {order}"
+        rec = self.db.execute(select + " LIMIT 1 OFFSET ?", (index,)).fetchone() if index >= 0 else None
+        if match is None: return rec[0] if rec else None
+        if rec and same_row(self._to_row(cols, rec[1:]), match): return rec[0]
+        return next((r[0] for r in self.db.execute(select) if same_row(self._to_row(cols, r[1:]), match)), None)
+
+    def remove_many(self, key, ids):
+        # Rows whose 'id' (kept in extra) is in ids, in one transaction
+        table, cols, order = TABLES[key]
+        with self.lock, self.db:
+            self.db.executemany(f"DELETE FROM {table} WHERE json_extract(extra, '$.id') = ?", [(i,) for i in ids])
+
+    def apply(self, ops):
+        for op, args in ops: getattr(self, op)(*args)
+
+    def needs_compaction(self): return False
+
+    def compact(self): pass
+
+    def clear(self):
+        with self.lock, self.db:
+            for table in ['settings'] + [t for t, _, _ in TABLES.values()]:
+                self.db.execute(f"DELETE FROM {table}")
+
+    # ---------- ROW MAPPING ----------
+    @staticmethod
+    def _to_params(cols, row):
+        extra = {k: v for k, v in row.items() if k not in cols}
+        vals = [iso_date(row.get(c)) if c == 'Date' else row.get(c) for c in cols]
+        return tuple(vals) + (json.dumps(extra) if extra else None,)
+
+    @staticmethod
+    def _to_row(cols, rec):
+        row = dict(zip(cols, rec[:-1]))
+        if rec[-1]: row.update(json.loads(rec[-1]))
+        return row
+
+
+def open_store(path):
+    if path.endswith(('.db', '.sqlite', '.sqlite3')): return SQLiteStore(path)
+    return JournalStore(path)
+
+
+# ==========================================
+# WRITE-BEHIND
+# ==========================================
+# Button handlers hand their writes to one process-wide writer thread and
+# return straight away, so a repaint never waits on JSON or fsync. The
+# thread drains whatever has piled up (after a short linger), folds runs of
+# settings updates together and writes each store's share in one apply().
+# Reads through WriteBehindStore wait for that store's queued writes first,
+# and everything is flushed at interpreter exit. A failed write is logged
+# and recorded against its store until acknowledged, so the UI can tell
+# the user instead of claiming it saved.
+
+log = logging.getLogger(__name__)
+
+
+class WriteQueue:
+    def __init__(self, maxsize=10000, linger=0.02):
+        self.q = queue.Queue(maxsize)
+        self.linger = linger
+        self.put_lock = threading.Lock()
+        self.cond = threading.Condition()
+        self.issued = 0
+        self.done = 0
+        self.errors = collections.deque(maxlen=20)   # recent failures, newest last
+        self.failed = weakref.WeakKeyDictionary()    # store -> [ops lost, last error] until acknowledged
+        self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def put(self, store, op, args):
+        # Blocks when the queue is full, which is the backpressure we want
+        with self.put_lock:
+            self.issued += 1
+            self.q.put((self.issued, store, op, args))
+            return self.issued
+
+    def flush(self, ticket=None, timeout=None):
+        # Wait until `ticket` (default: everything queued so far) is on disk
+        ticket = self.issued if ticket is None else ticket
+        with self.cond:
+            return self.cond.wait_for(lambda: self.done >= ticket, timeout)
+
+    def _run(self):
+        while True:
+            batch = [self.q.get()]
+            time.sleep(self.linger)
+            while True:
+                try: batch.append(self.q.get_nowait())
+                except queue.Empty: break
+            by_store = {}
+            for _, store, op, args in batch: by_store.setdefault(id(store), (store, []))[1].append((op, args))
+            for store, ops in by_store.values(): self._write(store, ops)
+            with self.cond:
+                self.done = batch[-1][0]
+                self.cond.notify_all()
+
+    def _write(self, store, ops):
+        try:
+            # 'clear' cannot be journaled; split the run around it
+            run = []
+            for op, args in ops + [('clear', None)]:
+                if op != 'clear': run.append((op, args)); continue
+                if run: store.apply(coalesce(run)); run = []
+                if args is not None: store.clear()
+            if store.needs_compaction(): store.compact()
+        except Exception as e:
+            log.exception("write-behind failed for %s", getattr(store, 'path', store))
+            with self.cond:
+                self.errors.append(e)
+                lost = self.failed.setdefault(store, [0, ""])
+                lost[0] += len(ops); lost[1] = f"{type(e).__name__}: {e}"
+
+    def failure(self, store):
+        # (ops lost, last error) since the last acknowledge(), or None
+        with self.cond:
+            lost = self.failed.get(store)
+            return tuple(lost) if lost else None
+
+    def acknowledge(self, store):
+        with self.cond: self.failed.pop(store, None)
+
+
+def coalesce(ops):
+    # Adjacent merges fold into one; adjacent patches of one key too
+    out = []
+    for op, args in ops:
+        if out and op == 'merge' and out[-1][0] == 'merge':
+            out[-1] = ('merge', ({**out[-1][1][0], **args[0]},))
+        elif out and op == 'patch' and out[-1][0] == 'patch' and out[-1][1][0] == args[0]:
+            out[-1] = ('patch', (args[0], {**out[-1][1][1], **args[1]}))
+        elif out and op == 'set' and out[-1][0] == 'set' and out[-1][1][0] == args[0]:
+            out[-1] = (op, args)
+        else:
+            out.append((op, args))
+    return out
+
+
+class WriteBehindStore:
+    def __init__(self, store, writer):
+        self.store = store
+        self.writer = writer
+        self.indexed = store.indexed
+        # Reads wait for anything queued before this wrapper existed too,
+        # e.g. by the one it replaced when get_store's cache evicted it
+        self.ticket = writer.issued
+
+    def _put(self, op, *args): self.ticket = self.writer.put(self.store, op, args)
+
+    def set(self, key, value): self._put('set', key, value)
+
+    def merge(self, values): self._put('merge', values)
+
+    def patch(self, key, values): self._put('patch', key, values)
+
+    def append(self, key, row): self._put('append', key, row)
+
+    def extend(self, key, rows): self._put('extend', key, rows)
+
+    def insert(self, key, index, row): self._put('insert', key, index, row)
+
+    def update(self, key, index, row, match=None): self._put('update', key, index, row, match)
+
+    def remove(self, key, index, match=None): self._put('remove', key, index, match)
+
+    def remove_many(self, key, ids): self._put('remove_many', key, ids)
+
+    def clear(self): self._put('clear', True)
+
+    def flush(self, timeout=None):
+        return self.writer.flush(self.ticket, timeout)
+
+    # ---------- SAVE STATUS ----------
+    def pending(self): return self.writer.done < self.ticket
+
+    def failure(self): return self.writer.failure(self.store)
+
+    def acknowledge(self): self.writer.acknowledge(self.store)
+
+    def __getattr__(self, name):
+        # Everything else is a read: let this store's queued writes land first
+        attr = getattr(self.store, name)
+        if not callable(attr): return attr
+
+        def read(*args, **kwargs):
+            if self.writer.done < self.ticket: self.flush()
+            return attr(*args, **kwargs)
+        return read
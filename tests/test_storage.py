@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+
+import pytest
+
+from storage import JournalStore, SQLiteStore, WriteQueue, WriteBehindStore
+
+
+def sale(n, day=1):
+    return {'Date': f"2024-01-{day:02d}", 'Item': f"Item {n}", 'Profit': float(n), 'Source': "eBay"}
+
+
+def item(n, day=1):
+    return {'Date': f"2024-01-{day:02d}", 'Item': f"Item {n}", 'Cost': float(n), 'Expected': float(n * 2), 'Source': "eBay"}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return JournalStore(str(tmp_path / "titan.json"))
+
+
+@pytest.fixture(params=['json', 'db'])
+def store(request, tmp_path):
+    if request.param == 'json': return JournalStore(str(tmp_path / "titan.json"))
+    return SQLiteStore(str(tmp_path / "titan.db"))
+
+
+# ==========================================
+# JOURNAL REPLAY
+# ==========================================
+def test_replay_drops_torn_tail(journal):
+    journal.append('history', sale(1))
+    journal.append('history', sale(2))
+    # A crash mid-append leaves half a record and no newline
+    with open(journal.journal_path, 'a') as f: f.write('{"op":"append","key":"history","va')
+    fresh = JournalStore(journal.path)
+    assert fresh.load()['history'] == [sale(1), sale(2)]
+    with open(journal.journal_path, 'rb') as f: assert f.read().endswith(b"}\n")
+
+
+def test_append_after_torn_tail_is_not_glued(journal):
+    journal.append('history', sale(1))
+    with open(journal.journal_path, 'a') as f: f.write('{"op":"app')
+    other = JournalStore(journal.path)
+    other.append('history', sale(2))
+    assert JournalStore(journal.path).load()['history'] == [sale(1), sale(2)]
+    seqs = [json.loads(line)['seq'] for line in open(journal.journal_path)]
+    assert seqs == [1, 2]
+
+
+def test_replay_skips_records_folded_into_snapshot(journal):
+    journal.append('history', sale(1))
+    journal.append('history', sale(2))
+    # Compaction crashed after the snapshot rename, before the journal reset
+    with open(journal.path, 'w') as f: json.dump({'history': [sale(1), sale(2)], '_seq': 2}, f)
+    assert JournalStore(journal.path).load()['history'] == [sale(1), sale(2)]
+
+
+# ==========================================
+# COMPACTION
+# ==========================================
+def test_compaction_keeps_another_writers_append(journal):
+    other = JournalStore(journal.path)
+    journal.append('history', sale(1))
+    other.load()
+    other.append('history', sale(2))
+    # journal never saw sale 2, but folds what is on disk
+    journal.compact()
+    other.append('history', sale(3))
+    state = JournalStore(journal.path).load()
+    assert state['history'] == [sale(1), sale(2), sale(3)]
+    assert 'seq' not in state and '_seq' not in state
+    seqs = [json.loads(line)['seq'] for line in open(journal.journal_path)]
+    assert seqs == [2, 3]
+
+
+def test_compaction_racing_appends(journal):
+    writers = [JournalStore(journal.path) for _ in range(4)]
+    start = threading.Barrier(len(writers) + 1)
+
+    def append(store, w):
+        start.wait()
+        for n in range(50): store.append('history', sale(w * 100 + n))
+
+    threads = [threading.Thread(target=append, args=(s, w)) for w, s in enumerate(writers)]
+    for t in threads: t.start()
+    start.wait()
+    for _ in range(20): journal.compact()
+    for t in threads: t.join()
+    rows = JournalStore(journal.path).load()['history']
+    assert len(rows) == 200
+    assert sorted(r['Profit'] for r in rows) == sorted(float(w * 100 + n) for w in range(4) for n in range(50))
+
+
+# ==========================================
+# STALE POSITIONS
+# ==========================================
+def test_remove_by_stale_index_after_insert(store):
+    store.set('inventory', [item(1), item(2)])
+    other = type(store)(store.path)
+    mine = store.load()['inventory']
+    other.insert('inventory', 0, item(9))
+    # Position 0 now holds item 9; the match steers the remove to item 1
+    store.remove('inventory', 0, mine[0])
+    assert type(store)(store.path).load()['inventory'] == [item(9), item(2)]
+
+
+def test_update_by_stale_index_after_insert(store):
+    store.set('inventory', [item(1), item(2)])
+    mine = store.load()['inventory']
+    type(store)(store.path).insert('inventory', 0, item(9))
+    store.update('inventory', 1, dict(mine[1], Cost=5.0), mine[1])
+    assert type(store)(store.path).load()['inventory'] == [item(9), item(1), dict(item(2), Cost=5.0)]
+
+
+def test_remove_of_row_already_gone_is_skipped(store):
+    store.set('inventory', [item(1), item(2)])
+    mine = store.load()['inventory']
+    other = type(store)(store.path)
+    other.remove('inventory', 0, mine[0])
+    store.remove('inventory', 0, mine[0])
+    assert type(store)(store.path).load()['inventory'] == [item(2)]
+
+
+# ==========================================
+# WRITE-BEHIND
+# ==========================================
+@pytest.fixture
+def writer():
+    # A long linger keeps the writes queued while the read comes in
+    w = WriteQueue(linger=0.3)
+    yield w
+    w.flush()
+
+
+def test_write_behind_flushes_before_reads(store, writer):
+    wrapped = WriteBehindStore(store, writer)
+    wrapped.insert('history', 0, sale(1))
+    wrapped.merge({'fee': 0.13})
+    assert wrapped.pending()
+    state = wrapped.load()
+    assert not wrapped.pending()
+    assert state['history'] == [sale(1)] and state['fee'] == 0.13
+
+
+def test_write_behind_waits_for_evicted_wrapper(store, writer):
+    WriteBehindStore(store, writer).append('inventory', item(1))
+    assert WriteBehindStore(store, writer).load()['inventory'] == [item(1)]
+
+
+def test_write_behind_records_failures(tmp_path, writer):
+    store = JournalStore(str(tmp_path / "missing" / "titan.json"))
+    wrapped = WriteBehindStore(store, writer)
+    wrapped.append('history', sale(1))
+    wrapped.flush()
+    lost, error = wrapped.failure()
+    assert lost == 1 and error.startswith("FileNotFoundError")
+    wrapped.acknowledge()
+    assert wrapped.failure() is None
+
+
+# ==========================================
+# BACKEND PARITY
+# ==========================================
+def test_backends_agree(tmp_path):
+    stores = [JournalStore(str(tmp_path / "titan.json")), SQLiteStore(str(tmp_path / "titan.db"))]
+    for s in stores:
+        s.merge({'fee': 0.13, 'region': "US"})
+        s.patch('prefs', {'theme': "dark"})
+        s.patch('prefs', {'page': 50})
+        s.set('history', [sale(3, 3), sale(2, 2)])
+        s.insert('history', 0, sale(4, 4))
+        s.append('history', sale(1, 1))
+        s.extend('inventory', [item(1), item(2), item(3)])
+        s.append('inventory', dict(item(4), Size="10"))
+        s.insert('inventory', 0, item(0))
+        s.update('inventory', 2, dict(item(2), Cost=9.0), item(2))
+        s.remove('inventory', 3, item(3))
+        s.apply([('append', ('watchlist', {'id': "a", 'name': "Dunk", 'link': "x"})),
+                 ('append', ('watchlist', {'id': "b", 'name': "Jordan", 'link': "y"})),
+                 ('remove_many', ('watchlist', ["a"]))])
+    journal, sqlite = (s.load() for s in stores)
+    assert journal == sqlite
+    assert journal['history'] == [sale(4, 4), sale(3, 3), sale(2, 2), sale(1, 1)]
+    assert [r['Item'] for r in journal['inventory']] == ["Item 0", "Item 1", "Item 2", "Item 4"]
+    assert journal['inventory'][3]['Size'] == "10"
+
+
+def test_backends_agree_after_clear(tmp_path):
+    stores = [JournalStore(str(tmp_path / "titan.json")), SQLiteStore(str(tmp_path / "titan.db"))]
+    for s in stores:
+        s.append('history', sale(1))
+        s.clear()
+        s.append('history', sale(2))
+    journal, sqlite = (s.load() for s in stores)
+    assert journal['history'] == sqlite['history'] == [sale(2)]
+    assert not os.path.exists(stores[0].path)
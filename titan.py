@@ -1,14 +1,48 @@
 import streamlit as st
-import pandas as pd
+import concurrent.futures
 import datetime
-import json
 import os
+import hmac
 import random
-import requests
+import re
+import secrets
+import uuid
+from storage import open_store, user_path, claim_save, WriteQueue, WriteBehindStore
+from livedata import ShardedDatabase, CACHE_DIR
+from brands import BrandIndex
+from licensing import LicenseChecker, GumroadVerifier
+from ledger import ProfitLedger
+from paging import Filters, TableView, PAGE_SIZES, SORT_COLUMNS
+from diagnostics import Profiler
+from shared import SharedCache
+from engine import REGIONS, DEFAULT_REGION, SIZE_TABLES, SIZE_DEFAULTS, EBAY_TITLE_LIMIT, TitleSpec, check_license, period_profit
+# pandas / numpy / requests and the modules built on them (records, pricing,
+# vault, bulkio) are imported inside the views and helpers that use them,
+# so Help / Supply Drop / Settings start without paying for them
+
+@st.cache_resource
+def get_profiler():
+    # Section / I/O timings for every rerun; see the hidden diagnostics view
+    return Profiler(track_sizes=bool(os.environ.get("TITAN_PROFILE_SIZES")))
+
+PROF = get_profiler()
+PROF.start()
+
+@st.cache_resource
+def get_shared():
+    # Read-only objects every session can use as-is: theme CSS, prebuilt tables
+    return SharedCache()
+
+SHARED = get_shared()
+SESSION_ID = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+
+def shared(key, build, version=None):
+    return SHARED.get(key, build, version, SESSION_ID)
 
 # ==========================================
 # 1. APP CONFIGURATION
 # ==========================================
+PROF.lap("1. App Configuration")
 st.set_page_config(
     page_title="Thrift Hunter Global",
     page_icon="🦅",
@@ -19,6 +53,7 @@ st.set_page_config(
 # ==========================================
 # 2. USER LINKS & API KEYS
 # ==========================================
+PROF.lap("2. User Links & API Keys")
 PAYMENT_LINKS = {
     "monthly": "https://thrifthunter.gumroad.com/l/entml", 
     "lifetime": "https://thrifthunter.gumroad.com/l/klwkxa"
@@ -42,128 +77,312 @@ AFFILIATE_LINKS = {
 # ==========================================
 # 3. LIVE DATABASE
 # ==========================================
-REGIONS = {
-    "Canada 🇨🇦": {"sym": "$", "ebay": "ebay.ca", "posh": "poshmark.ca", "ship_def": 15.00, "trends": ["Roots", "Arc'teryx", "Lululemon"]},
-    "USA 🇺🇸": {"sym": "$", "ebay": "ebay.com", "posh": "poshmark.com", "ship_def": 8.00, "trends": ["Carhartt", "Patagonia", "Nike"]},
-    "UK 🇬🇧": {"sym": "£", "ebay": "ebay.co.uk", "posh": "poshmark.co.uk", "ship_def": 4.50, "trends": ["Barbour", "Dr. Martens", "Stone Island"]},
-    "Europe 🇪🇺": {"sym": "€", "ebay": "ebay.de", "posh": "vinted.com", "ship_def": 6.00, "trends": ["Adidas", "Puma", "Le Creuset"]},
-    "Australia 🇦🇺": {"sym": "$", "ebay": "ebay.com.au", "posh": "poshmark.com.au", "ship_def": 12.00, "trends": ["R.M. Williams", "Spell & Gypsy", "AFL Gear"]}
-}
+PROF.lap("3. Live Database")
+# Sharded database (livedata.write_shards / `python cli.py shard`): a manifest
+# plus one content-hashed shard for blacklist / fees / keywords and one per region
+DB_URL = os.environ.get("TITAN_DB_URL", "https://raw.githubusercontent.com/FocusOS-dev/Thrift-Hunter/main/db/manifest.json")
 
-DB_URL = "https://raw.githubusercontent.com/FocusOS-dev/Thrift-Hunter/main/database.json"
+@st.cache_resource
+def get_live_db():
+    return ShardedDatabase(DB_URL, ttl=600)
 
-@st.cache_data(ttl=600)
 def get_live_data():
-    try:
-        response = requests.get(DB_URL, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get('blacklist', []), data.get('vault', {})
-        else:
-            return [], {}
-    except:
-        return [], {}
+    # Never waits on the network: serves memory / disk / bundled shards, refreshes in the background
+    live = get_live_db()
+    with PROF.timer('get_live_data'): core = live.core()
+    PROF.size('live.core', core, key=live.shard_version('core'))
+    return core.get('blacklist', []), core.get('fees'), core.get('keywords')
+
+def live_vault(regions):
+    # {region: rows} for just these regions; each shard is parsed once per process
+    live = get_live_db()
+    with PROF.timer('live.vault'): vault = {r: live.vault(r) for r in regions}
+    return vault, tuple((r, live.shard_version(f"vault/{r}")) for r in regions)
+
+@st.cache_resource(max_entries=6)
+def get_brand_index(version, _blacklist, _vault):
+    # Keyed on the blacklist + region shard hashes: rebuilt only when those change
+    PROF.count('brand_index.build')
+    with PROF.timer('brand_index.build'): return BrandIndex(_blacklist, _vault)
+
+@st.cache_resource(max_entries=8)
+def get_vault_index(version, _vault):
+    from vault import VaultIndex
+    PROF.count('vault_index.build')
+    with PROF.timer('vault_index.build'): return VaultIndex(_vault)
+
+@st.cache_resource(max_entries=2)
+def get_fee_rules(version, _fees):
+    # Fee tiers and shipping tables compiled once per database version
+    from pricing import FeeRules
+    PROF.count('fee_rules.build')
+    return FeeRules(_fees)
 
-BLACKLIST_DB, VAULT_DB = get_live_data()
+@st.cache_resource(max_entries=2)
+def get_title_engine(version, _keywords):
+    # Keyword table + memoized token scores / titles, per database version
+    from titles import TitleEngine
+    PROF.count('title_engine.build')
+    return TitleEngine(_keywords)
+
+# Sold comps for Smart Scan (comps.adapters_from_spec); unset: link buttons only
+COMPS_SOURCES = os.environ.get("TITAN_COMPS", "")
+
+@st.cache_resource
+def get_comps():
+    # One event loop, HTTP pool and (region, term) cache for every session
+    from comps import CompsFetcher, adapters_from_spec
+    return CompsFetcher(adapters_from_spec(COMPS_SOURCES), ttl=900, max_entries=512)
+
+def load_live_data():
+    # Called by the views that need the database (Dashboard, Toolkit, Vault);
+    # the others never touch the network or parse database.json
+    # Only the core shard and the user's region are read
+    global BLACKLIST_DB, FEES_DB, BRAND_INDEX, FEE_RULES, TITLE_ENGINE, DB_VERSION
+    BLACKLIST_DB, FEES_DB, keywords = get_live_data()
+    DB_VERSION = core_version = get_live_db().shard_version('core')
+    if SHARED.sync(core_version): PROF.count('shared.invalidated')
+    vault, vault_version = live_vault([st.session_state.region])
+    BRAND_INDEX = get_brand_index((core_version, vault_version), BLACKLIST_DB, vault)
+    FEE_RULES = get_fee_rules(core_version, FEES_DB)
+    TITLE_ENGINE = get_title_engine(core_version, keywords)
 
 # ==========================================
 # 4. SILENT AUTO-SAVE SYSTEM
 # ==========================================
-SAVE_FILE = "titan.json"
+PROF.lap("4. Silent Auto-Save System")
+DATA_DIR = os.environ.get("TITAN_DATA_DIR", "data")
+SAVE_NAME = os.environ.get("TITAN_SAVE_NAME", "titan.json")  # titan.db for the SQLite backend
+SAVE_FILE = os.environ.get("TITAN_SAVE_FILE")  # one shared file instead (single-user installs)
+SETTINGS_KEYS = ['items_scanned', 'theme', 'username', 'store_name', 'region', 'is_pro', 'goals', 'tax_mode', 'tax_rate', 'sources']
+
+LEGACY_SAVE = SAVE_NAME  # where single-file installs kept everything, in the working directory
+
+# Without auth, the ?uid= token in the URL IS the credential: anyone who has
+# the link has the data. Tokens are 256 random bits, and anything shorter
+# than the 128-bit ids handed out before is ignored rather than trusted.
+UID_TOKEN = re.compile(r"[A-Za-z0-9_-]{32,}")
+
+def current_user():
+    # Signed-in user when the deployment has auth, else the token in the URL
+    if st.user.get('is_logged_in') and st.user.get('email'): return st.user.get('email')
+    uid = st.query_params.get('uid')
+    return uid if uid and UID_TOKEN.fullmatch(uid) else None
+
+def save_path():
+    # TITAN_SAVE_FILE > the user's own file > a new token of their own. The
+    # first new token takes over a save from before per-user storage, so it
+    # moves to one owner instead of being shared by every visitor
+    if SAVE_FILE: return SAVE_FILE
+    if st.session_state.user_id: return user_path(DATA_DIR, st.session_state.user_id, SAVE_NAME)
+    st.session_state.user_id = st.query_params['uid'] = secrets.token_urlsafe(32)
+    path = user_path(DATA_DIR, st.session_state.user_id, SAVE_NAME)
+    st.session_state.new_link = 'claimed' if claim_save(LEGACY_SAVE, path) else 'new'
+    return path
+
+@st.cache_resource
+def get_writer():
+    return WriteQueue()
+
+# Kept small: a SQLite store holds its connection and WAL / SHM files open,
+# and the hosted instance has 1024 descriptors. An evicted store is just
+# reopened on its user's next rerun; queued writes still land
+@st.cache_resource(max_entries=64, ttl=3600)
+def get_store(path):
+    return WriteBehindStore(open_store(path), get_writer())
+
+if 'user_id' not in st.session_state: st.session_state.user_id = current_user()
+STORE = get_store(save_path())
+NEW_LINK = st.session_state.pop('new_link', None)
+if NEW_LINK == 'claimed': st.toast("Your saved data moved to this link. Bookmark it: anyone with the link can open your data", icon="🔖")
+elif NEW_LINK: st.toast("Bookmark this page: your data is saved under this link, and anyone with the link can open it", icon="🔖")
+
+VIEWS = ['dashboard', 'supplies', 'tools', 'vault', 'help', 'settings']
+DIAG_TOKEN = os.environ.get("TITAN_DIAGNOSTICS_TOKEN")  # unset: no diagnostics view
+
+def linked_view():
+    # ?view=help opens straight into a view. The Vault still needs Pro; the
+    # hidden diagnostics view needs ?token= matching TITAN_DIAGNOSTICS_TOKEN
+    link = st.query_params.get('view')
+    if link == 'diagnostics':
+        return link if DIAG_TOKEN and hmac.compare_digest(st.query_params.get('token', ''), DIAG_TOKEN) else 'dashboard'
+    if link == 'vault' and not st.session_state.is_pro: return 'dashboard'
+    return link if link in VIEWS else 'dashboard'
 
 def load_data():
-    if os.path.exists(SAVE_FILE):
-        try:
-            with open(SAVE_FILE, 'r') as f: return json.load(f)
-        except: return {}
-    return {}
-
-def save_data():
-    state_data = {
-        'history': st.session_state.history,
-        'inventory': st.session_state.inventory,
-        'watchlist': st.session_state.watchlist,
-        'items_scanned': st.session_state.items_scanned,
-        'theme': st.session_state.theme,
-        'username': st.session_state.username,
-        'store_name': st.session_state.store_name,
-        'region': st.session_state.region,
-        'is_pro': st.session_state.is_pro,
-        'goals': st.session_state.goals,
-        'tax_mode': st.session_state.tax_mode,
-        'tax_rate': st.session_state.tax_rate,
-        'sources': st.session_state.sources
-    }
-    with open(SAVE_FILE, 'w') as f: json.dump(state_data, f)
+    with PROF.timer('load_data'):
+        data = STORE.load()
+        if STORE.needs_compaction(): STORE.compact()
+    return data
+
+def save_data(*keys):
+    # Queue only the named settings (a bare call queues all of them);
+    # the write-behind thread journals them off the UI thread
+    with PROF.timer('save_data'): STORE.merge({k: st.session_state[k] for k in (keys or SETTINGS_KEYS)})
+    warn_unsaved()
+
+def save_row(op, key, *args):
+    # Journal one list mutation: append / insert / update / remove
+    with PROF.timer('save_row'): getattr(STORE, op)(key, *args)
+    warn_unsaved()
+
+def warn_unsaved():
+    # An earlier queued write of this user's failed: say so as they keep editing
+    failure = STORE.failure()
+    if failure: st.toast(f"Changes are not being saved: {failure[1]}", icon="⚠️")
+
+def report_save_failure():
+    # Once per failure, on the next rerun; the writer keeps it until acknowledged
+    failure = STORE.failure()
+    if not failure: return
+    st.error(f"⚠️ {failure[0]} change(s) could not be saved ({failure[1]}). Reloading the page may lose your latest edits.")
+    STORE.acknowledge()
+
+def confirm_saved(message):
+    # Toast once the queued writes are on disk, not before
+    STORE.flush(timeout=1.0)
+    if STORE.failure(): return  # warn_unsaved() / report_save_failure() cover it
+    if STORE.pending(): st.toast("Still saving…", icon="⏳")
+    else: st.toast(message)
+
+def rows(kind):
+    # History / inventory as typed columns, built the first time a view
+    # asks for them rather than on every session start
+    if kind not in st.session_state:
+        from records import SalesColumns, InventoryColumns
+        columns = SalesColumns if kind == 'history' else InventoryColumns
+        with PROF.timer(f'{kind}.columns'): st.session_state[kind] = columns(st.session_state.pop(f"{kind}_raw", None) or [])
+    return st.session_state[kind]
+
+def aging():
+    # Aging / sell-through rollups, parsed from the save the first time a
+    # view or an Add / Sold needs them; rebuilt when they don't cover the rows
+    if 'aging' not in st.session_state:
+        from aging import AgingRollup
+        rollup = AgingRollup(st.session_state.pop('aging_raw', None))
+        if not rollup.matches(all_rows('inventory'), all_rows('history')): rebuild_aging(rollup)
+        st.session_state.aging = rollup
+    return st.session_state.aging
+
+def all_rows(kind):
+    # Every row: the whole SQLite table, else the columns (or the raw list
+    # when no view has built them yet)
+    if STORE.indexed: return STORE.rows(kind)
+    return st.session_state.get(kind) or st.session_state.get(f"{kind}_raw") or []
+
+def rebuild_aging(rollup):
+    inventory = STORE.rows('inventory') if STORE.indexed else rows('inventory')
+    history = STORE.rows('history') if STORE.indexed else rows('history')
+    with PROF.timer('aging.rebuild'): rollup.rebuild(inventory, history)
+    save_row('set', 'aging_totals', rollup.totals)
+
+def add_inventory(row):
+    rollup = aging()
+    rows('inventory').append(row); save_row('append', 'inventory', row)
+    save_row('patch', 'aging_totals', rollup.add(row))
+
+def record_sale(row):
+    rollup = aging()  # settled before the row lands, or it would count twice
+    rows('history').insert(0, row); save_row('insert', 'history', 0, row)
+    # The SQLite store sums sales itself; the running totals cover the journal store
+    if not STORE.indexed: save_row('patch', 'profit_totals', st.session_state.ledger.add(row))
+    save_row('patch', 'aging_totals', rollup.sale(row))
+
+def sell_candidates(text, limit=50):
+    # (list index, row) of inventory items matching `text`, oldest first
+    filters = Filters(text=text)
+    if STORE.indexed: return STORE.query('inventory', filters, 'Date', False, limit, 0, positions=True)[0]
+    # The match order is cached across reruns like the dashboard tables
+    view = st.session_state.setdefault('sell_view', TableView())
+    found, _ = view.page(rows('inventory'), filters, 'Date', False, 0, limit)
+    return list(zip(view.order, found))
+
+def sell_from_inventory(index, row, profit):
+    # The sale keeps the item's Cost and purchase date: that links the two
+    inv = rows('inventory')
+    # The SQLite store only preloads the newest rows, the tail of the list
+    local = index - (STORE.count('inventory') - len(inv)) if STORE.indexed else index
+    if 0 <= local < len(inv): inv.pop(local)
+    save_row('remove', 'inventory', index, row)  # the row, not just the position: another session may have shifted the list
+    record_sale({"Date": str(datetime.date.today()), "Item": row.get('Item'), "Profit": profit, "Source": row.get('Source'),
+                 "Cost": row.get('Cost'), "Acquired": row.get('Date')})
+
+def import_rows(kind, upload):
+    # One save per batch (not per row), one ledger patch per batch of sales
+    from bulkio import ImportStats, import_batches
+    fmt = 'parquet' if upload.name.lower().endswith('.parquet') else 'csv'
+    existing = STORE.rows(kind) if STORE.indexed else rows(kind)
+    rollup = aging()
+    stats = ImportStats()
+    for batch in import_batches(upload, fmt, kind, existing, stats):
+        rows(kind).extend(batch); save_row('extend', kind, batch)
+        if kind == 'history' and not STORE.indexed: save_row('patch', 'profit_totals', st.session_state.ledger.add_many(batch))
+        save_row('patch', 'aging_totals', rollup.add_many(batch) if kind == 'inventory' else rollup.sale_many(batch))
+    return stats
+
+def watchlist():
+    # Keyed by stable id, built the first time Supply Drop shows it; rows
+    # from older saves get their ids written back once
+    if 'watch' not in st.session_state:
+        from watchlist import Watchlist
+        wl = st.session_state.watch = Watchlist(st.session_state.pop('watchlist_raw', None))
+        if wl.migrated: save_row('set', 'watchlist', wl.rows())
+    return st.session_state.watch
+
+def rebuild_totals():
+    if STORE.indexed: return
+    st.session_state.ledger.rebuild(rows('history'))
+    save_row('set', 'profit_totals', st.session_state.ledger.totals)
 
 # INITIALIZE STATE
 if 'init' not in st.session_state:
     data = load_data()
     st.session_state.init = True
-    st.session_state.history = data.get('history', [])
-    st.session_state.inventory = data.get('inventory', [])
-    st.session_state.watchlist = data.get('watchlist', [])
+    st.session_state.history_raw = data.get('history', [])
+    st.session_state.inventory_raw = data.get('inventory', [])
+    st.session_state.aging_raw = data.get('aging_totals')
+    st.session_state.watchlist_raw = data.get('watchlist', [])
     st.session_state.items_scanned = data.get('items_scanned', 0)
     st.session_state.theme = data.get('theme', 'dark')
     st.session_state.username = data.get('username', 'Reseller')
     st.session_state.store_name = data.get('store_name', 'My Store')
-    st.session_state.region = data.get('region', 'Canada 🇨🇦')
+    st.session_state.region = data.get('region', DEFAULT_REGION)
     st.session_state.is_pro = data.get('is_pro', False)
     st.session_state.goals = data.get('goals', {'Weekly': 250.0, 'Monthly': 1000.0, 'Yearly': 12000.0})
     st.session_state.tax_mode = data.get('tax_mode', False)
     st.session_state.tax_rate = data.get('tax_rate', 25.0)
     st.session_state.sources = data.get('sources', ["Goodwill", "Value Village", "Bins", "FB Marketplace", "Other"])
-    st.session_state.view = 'dashboard'
+    st.session_state.view = linked_view()
+    st.session_state.ledger = ProfitLedger(data.get('profit_totals'))
+    if not st.session_state.ledger.matches(st.session_state.history_raw): rebuild_totals()
+
+report_save_failure()
 
-R_DATA = REGIONS.get(st.session_state.region, REGIONS["Canada 🇨🇦"])
+R_DATA = REGIONS.get(st.session_state.region, REGIONS[DEFAULT_REGION])
 CURR = R_DATA["sym"]
 
 # ==========================================
 # 5. SECURITY FUNCTIONS (UPDATED)
 # ==========================================
+PROF.lap("5. Security Functions")
 def verify_gumroad_key(key):
-    # 1. Sanitize Input (Remove spaces, convert to uppercase)
-    clean_key = key.strip().upper()
-    
-    # 2. Check Owner Key (Bypass Gumroad)
-    if clean_key == OWNER_KEY: 
-        return True, "Welcome Founder 🦅"
-        
-    # 3. Check Real Keys via API
-    for permalink in GUMROAD_PERMALINKS:
-        try:
-            r = requests.post(
-                "https://api.gumroad.com/v2/licenses/verify",
-                data={"product_permalink": permalink, "license_key": clean_key},
-                timeout=10
-            )
-            data = r.json()
-            if data.get('success') and not data.get('purchase', {}).get('refunded'):
-                return True, "License Verified ✅"
-        except:
-            continue
-            
-    return False, "Invalid Key or Expired Subscription ❌"
+    # Owner key first, then every permalink at once (cached); see engine.check_license
+    with PROF.timer('license.check'): return check_license(key, get_license_checker(), OWNER_KEY)
+
+@st.cache_resource
+def get_license_checker():
+    return LicenseChecker(GumroadVerifier(), GUMROAD_PERMALINKS, cache_path=os.path.join(CACHE_DIR, "licenses.json"))
 
 # ==========================================
 # 6. HELPER FUNCTIONS
 # ==========================================
+PROF.lap("6. Helper Functions")
 def calculate_period_profit(period):
-    if not st.session_state.history: return 0.0
-    df = pd.DataFrame(st.session_state.history)
-    df['Date'] = pd.to_datetime(df['Date'], format='mixed', errors='coerce')
-    now = datetime.datetime.now()
-    if period == 'Weekly':
-        start = now - datetime.timedelta(days=now.weekday())
-        start = start.replace(hour=0, minute=0, second=0, microsecond=0)
-        mask = df['Date'] >= start
-    elif period == 'Monthly':
-        mask = (df['Date'].dt.month == now.month) & (df['Date'].dt.year == now.year)
-    elif period == 'Yearly':
-        mask = df['Date'].dt.year == now.year
-    else:
-        return df['Profit'].sum()
-    return df.loc[mask, 'Profit'].sum()
+    with PROF.timer('period_profit'): return period_profit(period, STORE, st.session_state.ledger)
+
+def row_count(kind):
+    if STORE.indexed: return STORE.count(kind)
+    return len(st.session_state.get(kind) or st.session_state.get(f"{kind}_raw") or [])
 
 def get_live_news():
     trends = R_DATA["trends"]
@@ -178,8 +397,9 @@ def get_live_news():
 # ==========================================
 # 7. DYNAMIC CSS
 # ==========================================
-def get_theme_css():
-    if st.session_state.theme == 'dark':
+PROF.lap("7. Dynamic CSS")
+def theme_css(theme):
+    if theme == 'dark':
         bg, text, card_bg, border = "#0e1117", "#e0e0e0", "#1a1c24", "#2d2f3a"
         input_bg, input_text = "#262730", "#ffffff"
     else:
@@ -204,7 +424,129 @@ def get_theme_css():
         .pro-lock {{ border: 1px dashed {border}; padding: 20px; border-radius: 10px; text-align: center; opacity: 0.6; background: {card_bg}; }}
     </style>
     """
-st.markdown(get_theme_css(), unsafe_allow_html=True)
+with PROF.timer('theme_css'):
+    theme = st.session_state.theme
+    st.markdown(shared(('css', theme), lambda: theme_css(theme)), unsafe_allow_html=True)
+
+def render_table(key):
+    import pandas as pd
+    table = rows(key)
+    f1, f2, f3, f4 = st.columns([1, 1, 1, 2])
+    d_from = f1.date_input("From", value=None, key=f"{key}_from")
+    d_to = f2.date_input("To", value=None, key=f"{key}_to")
+    src = f3.selectbox("Source", ["All"] + st.session_state.sources, key=f"{key}_src")
+    text = f4.text_input("Search Item", key=f"{key}_text")
+    filters = Filters(str(d_from) if d_from else None, str(d_to) if d_to else None, None if src == "All" else src, text)
+
+    s1, s2, s3, s4 = st.columns([1, 1, 1, 2])
+    sort = s1.selectbox("Sort", SORT_COLUMNS[key], key=f"{key}_sort")
+    desc = s2.toggle("Newest / Highest first", True, key=f"{key}_desc")
+    size = s3.selectbox("Rows", PAGE_SIZES, index=1, key=f"{key}_size")
+    view = st.session_state.setdefault(f"{key}_view", TableView())
+
+    def fetch(page):
+        # SQLite hands back the page's rows; the typed columns, the page's
+        # positions, which to_frame() reads straight out of the columns
+        with PROF.timer(f'{key}.page'):
+            if STORE.indexed: return STORE.query(key, filters, sort, desc, size, page * size)
+            return view.positions(table, filters, sort, desc, page, size)
+
+    page = st.session_state.get(f"{key}_page", 1)
+    on_page, total = fetch(page - 1)
+    pages = max((total - 1) // size + 1, 1)
+    if page > pages:
+        # The filter shrank the result; jump back to its last page
+        page = st.session_state[f"{key}_page"] = pages
+        on_page, total = fetch(page - 1)
+    s4.number_input(f"Page (of {pages})", 1, pages, key=f"{key}_page")
+    with PROF.timer('render.dataframe'):
+        if STORE.indexed: frame, config = pd.DataFrame(on_page), None
+        else: frame, config = table.to_frame(on_page), {'Date': st.column_config.DateColumn(format="YYYY-MM-DD")}
+        st.dataframe(frame, use_container_width=True, hide_index=True, column_config=config)
+    PROF.size(f'{key}.page_frame', frame)
+    PROF.size(f'{key}.columns', table, key=len(table))
+    st.caption(f"{total} rows")
+
+def render_aging():
+    import pandas as pd
+    rollup = aging()
+    total = rollup.overall()
+    a1, a2, a3, a4 = st.columns(4)
+    a1.metric("Capital Tied Up", f"{CURR}{total['Tied Up']:,.2f}")
+    a2.metric("Sell-Through", f"{total['Sell-Through %']:.0f}%" if total['Sell-Through %'] is not None else "—")
+    a3.metric("Median Days to Sell", total['Median Days'] if total['Median Days'] is not None else "—")
+    a4.metric("Stale (90d+)", total['91-180d'] + total['180d+'])
+    by = st.radio("Group by", ["Source", "Month Bought"], horizontal=True, key="aging_by")
+    with PROF.timer('aging.summary'): report = rollup.summary('s' if by == "Source" else 'm')
+    if report: st.dataframe(pd.DataFrame(report).rename(columns={'Scope': by}), use_container_width=True, hide_index=True)
+    else: st.caption("Add items to your inventory and sell them from there to see how fast each source turns over.")
+
+def render_comps(term, sold_only):
+    # Every marketplace adapter in one concurrent round-trip; the first result
+    # for a term pre-fills the Profit Engine's Sell, later edits are kept
+    fetcher = get_comps()
+    if not fetcher: return
+    try:
+        with PROF.timer('comps.fetch'): comps = fetcher.fetch(st.session_state.region, term, sold_only)
+    except concurrent.futures.TimeoutError:
+        # The fetch keeps running and lands in the cache for the next rerun
+        return st.caption("📊 Comps unavailable (timed out)")
+    if comps.median is None:
+        st.caption("📊 No sold comps found" + (f" ({', '.join(comps.errors)} unavailable)" if comps.errors else ""))
+        return
+    key = fetcher.key(st.session_state.region, term, sold_only)
+    if st.session_state.get('comps_for') != key:
+        st.session_state.comps_for = key
+        st.session_state.calc_sold = round(min(max(comps.median, 0.0), 5000.0), 2)
+    spread = f" · middle half {CURR}{comps.spread[0]:.2f}–{CURR}{comps.spread[1]:.2f}" if comps.spread else ""
+    st.info(f"📊 **Median sold {CURR}{comps.median:.2f}**{spread} · {comps.n} sales from {', '.join(comps.sources)}")
+    if comps.errors: st.caption(f"Unavailable: {', '.join(f'{k} ({v})' for k, v in comps.errors.items())}")
+
+def render_watchlist():
+    wl = watchlist()
+    c1, c2, c3, c4 = st.columns([2, 2, 1.5, 1])
+    name = c1.text_input("Item", key="watch_name")
+    link = c2.text_input("Link", key="watch_link")
+    tags = c3.text_input("Tags", key="watch_tags", placeholder="cameras, film")
+    target = c4.number_input("Target Price", 0.0, 100000.0, 0.0, key="watch_target")
+    if st.button("➕ Add", key="watch_add"):
+        if not (name.strip() or link.strip()): st.toast("Enter an item name or a link", icon="⚠️")
+        else:
+            row, added = wl.add(name, link, tags, target)
+            if added: save_row('append', 'watchlist', row); st.toast(f"Watching {row['name']}")
+            else: st.toast(f"Already watching {row['name']}", icon="👀")
+    if not len(wl): return st.caption("Nothing on your watchlist yet.")
+
+    f1, f2, f3 = st.columns([2, 1, 1])
+    text = f1.text_input("Find", key="watch_find")
+    tag = f2.selectbox("Tag", ["All"] + wl.tags(), key="watch_tag")
+    size = f3.selectbox("Rows", PAGE_SIZES, key="watch_size")
+    tag = None if tag == "All" else tag
+    page = st.session_state.get("watch_page", 1)
+    with PROF.timer('watchlist.page'): page_rows, total = wl.page(text, tag, page - 1, size)
+    pages = max((total - 1) // size + 1, 1)
+    if page > pages:
+        page = st.session_state.watch_page = pages
+        page_rows, total = wl.page(text, tag, page - 1, size)
+    # One markdown table per page instead of a row of widgets per item
+    lines = ["| Item | Tags | Target | Added |", "|---|---|---|---|"]
+    for row in page_rows:
+        label = row['name'].replace("|", "\\|")
+        item = f"[{label}](<{row['link']}>)" if row.get('link') else label
+        target = f"{CURR}{row['target']:.2f}" if row.get('target') else ""
+        lines.append(f"| {item} | {', '.join(row.get('tags') or [])} | {target} | {row.get('added', '')} |")
+    st.markdown("\n".join(lines))
+    p1, p2 = st.columns([1, 3])
+    p1.number_input(f"Page (of {pages})", 1, pages, key="watch_page")
+    p2.caption(f"{total} of {len(wl)} items")
+
+    # Batched removal: one write for the whole selection
+    r1, r2 = st.columns([4, 1])
+    pick = r1.multiselect("Remove", [row['id'] for row in page_rows], key="watch_pick", format_func=wl.label)
+    if r2.button("🗑️ Remove", key="watch_remove", disabled=not pick):
+        removed = wl.remove_many(pick)
+        if removed: save_row('remove_many', 'watchlist', removed)
+        st.session_state.pop("watch_pick", None); st.rerun()
 
 def render_pro_lock(feature):
     st.markdown(f"""<div class="pro-lock"><h3>🔒 {feature}</h3><p>Pro Feature</p></div>""", unsafe_allow_html=True)
@@ -212,6 +554,7 @@ def render_pro_lock(feature):
 # ==========================================
 # 8. SIDEBAR
 # ==========================================
+PROF.lap("8. Sidebar")
 with st.sidebar:
     st.title("🦅 Thrift Hunter")
     
@@ -224,7 +567,7 @@ with st.sidebar:
     
     st.write("🌍 **Region**")
     sel_reg = st.selectbox("Marketplace", list(REGIONS.keys()), index=list(REGIONS.keys()).index(st.session_state.region))
-    if sel_reg != st.session_state.region: st.session_state.region = sel_reg; save_data(); st.rerun()
+    if sel_reg != st.session_state.region: st.session_state.region = sel_reg; save_data('region'); st.rerun()
         
     st.markdown("---")
     if st.button("📊 Dashboard", use_container_width=True): st.session_state.view = 'dashboard'; st.rerun()
@@ -250,6 +593,10 @@ with st.sidebar:
 # 9. DASHBOARD
 # ==========================================
 if st.session_state.view == 'dashboard':
+    PROF.lap("9. Dashboard")
+    import pandas as pd
+    from pricing import DEFAULT_WEIGHT, net_profit
+    load_live_data()
     
     st.info("🚧 **PUBLIC BETA:** You are currently using an Early Access version of Thrift Hunter. New features are added daily. If you encounter any issues, please report them via the Help tab.")
     
@@ -277,11 +624,11 @@ if st.session_state.view == 'dashboard':
         c1.metric("Gross", f"{CURR}{life_prof:.2f}")
         c2.metric("Net", f"{CURR}{net_life:.2f}")
         c3.metric("Tax", f"{CURR}{tax_held:.2f}")
-        c4.metric("Inv", len(st.session_state.inventory))
+        c4.metric("Inv", row_count('inventory'))
     else:
         c1, c2, c3 = st.columns(3)
         c1.metric("Total Profit", f"{CURR}{life_prof:.2f}")
-        c2.metric("Active Inventory", len(st.session_state.inventory))
+        c2.metric("Active Inventory", row_count('inventory'))
         c3.metric("Scanned Today", st.session_state.items_scanned)
 
     st.divider()
@@ -303,42 +650,76 @@ if st.session_state.view == 'dashboard':
             st.link_button(f"🔎 Check {domain}", url, type="primary", use_container_width=True)
             st.link_button(f"🛍️ Check {R_DATA.get('posh', 'Poshmark')}", f"https://{R_DATA.get('posh', 'poshmark.com')}/search?query={clean}", use_container_width=True)
             st.link_button("📸 Google Lens", f"https://www.google.com/search?tbm=isch&q={clean}", use_container_width=True)
+            if COMPS_SOURCES: render_comps(term, f_sold)
+
+            for hit in BRAND_INDEX.lookup(term, region=st.session_state.region):
+                rec, qual = hit.entry.record, f" ({hit.entry.qualifier})" if hit.entry.qualifier else ""
+                if hit.entry.kind == 'blacklist':
+                    st.error(f"⛔ **{rec.get('Brand')}** · {rec.get('Risk')} risk{qual}: {rec.get('Reason')}")
+                elif st.session_state.is_pro:
+                    st.success(f"💎 **Vault:** {rec.get('Brand')} {rec.get('Model', '')} · Buy {rec.get('Buy')} → Sell {rec.get('Sell')} {rec.get('Vel', '')}")
 
         st.write("")
         with st.expander("⛔ Brand Blacklist"):
-            st.dataframe(pd.DataFrame(BLACKLIST_DB), use_container_width=True)
+            st.dataframe(shared('blacklist.frame', lambda: pd.DataFrame(BLACKLIST_DB), DB_VERSION), use_container_width=True)
 
     # CALCULATOR
     with col_calc:
         st.subheader("2. Profit Engine")
         c_in1, c_in2 = st.columns(2)
         cost = c_in1.number_input("Cost", 0.0, 5000.0, 5.0)
-        sold = c_in2.number_input("Sell", 0.0, 5000.0, 45.0)
-        ship = st.number_input("Ship", 0.0, 200.0, R_DATA['ship_def'])
+        st.session_state.setdefault('calc_sold', 45.0)
+        sold = c_in2.number_input("Sell", 0.0, 5000.0, key="calc_sold")
+        c_in3, c_in4, c_in5 = st.columns(3)
+        market = c_in3.selectbox("Selling On", FEE_RULES.marketplaces(st.session_state.region), key="calc_market")
+        category = c_in4.selectbox("Category", FEE_RULES.categories(market, st.session_state.region), key="calc_category")
+        weight = c_in5.number_input("Weight (kg)", 0.0, 50.0, DEFAULT_WEIGHT, 0.1)
+        ship = st.number_input("Ship", 0.0, 200.0, FEE_RULES.shipping(st.session_state.region, weight))
         
         src = st.selectbox("Source", st.session_state.sources)
         if src == "Other": src = st.text_input("Enter Source Name")
         
-        profit = sold - cost - ship - (sold * 0.13)
+        profit, _ = net_profit(sold, cost, ship, market, st.session_state.region, FEE_RULES, category)
         st.markdown(f"""<div class="profit-card"><h1 style="margin:0;">{CURR}{profit:.2f}</h1><p style="margin:0;">NET PROFIT</p></div>""", unsafe_allow_html=True)
         
         b1, b2 = st.columns(2)
         if b1.button("📦 Add to Inventory"):
-            st.session_state.inventory.append({"Date": str(datetime.date.today()), "Item": term if term else "Item", "Cost": cost, "Expected": sold, "Source": src})
-            st.session_state.items_scanned += 1; save_data(); st.toast("Saved!")
+            row = {"Date": str(datetime.date.today()), "Item": term if term else "Item", "Cost": cost, "Expected": sold, "Source": src}
+            add_inventory(row)
+            st.session_state.items_scanned += 1; save_data('items_scanned'); confirm_saved("Saved!")
         if b2.button("💰 Mark Sold", type="primary"):
-            st.session_state.history.insert(0, {"Date": str(datetime.date.today()), "Item": term if term else "Item", "Profit": profit, "Source": src})
-            st.session_state.items_scanned += 1; save_data(); st.rerun()
+            row = {"Date": str(datetime.date.today()), "Item": term if term else "Item", "Profit": profit, "Source": src}
+            record_sale(row)
+            st.session_state.items_scanned += 1; save_data('items_scanned'); st.rerun()
 
     st.divider()
-    tab1, tab2 = st.tabs(["📜 History", "📦 Inventory"])
-    with tab1: st.dataframe(pd.DataFrame(st.session_state.history), use_container_width=True)
-    with tab2: st.dataframe(pd.DataFrame(st.session_state.inventory), use_container_width=True)
+    tab1, tab2, tab3 = st.tabs(["📜 History", "📦 Inventory", "⏳ Aging"])
+    with tab1: render_table('history')
+    with tab2:
+        with st.expander("💰 Sell from Inventory"):
+            st.caption("Moves the item to your history with its cost and purchase date. Fees use the Profit Engine's marketplace, category and shipping.")
+            s1, s2 = st.columns([2, 1])
+            find = s1.text_input("Find Item", key="sell_find")
+            price = s2.number_input("Sold For", 0.0, 5000.0, 0.0, key="sell_price")
+            matches = sell_candidates(find)
+            if matches:
+                pick = st.selectbox("Item (oldest first)", range(len(matches)), key="sell_pick",
+                                    format_func=lambda k: f"{matches[k][1].get('Item')} · bought {matches[k][1].get('Date')} · {CURR}{matches[k][1].get('Cost') or 0:.2f}")
+                index, item_row = matches[pick]
+                item_cost = item_row.get('Cost') or 0.0
+                sale_profit, _ = net_profit(price, item_cost, ship, market, st.session_state.region, FEE_RULES, category)
+                st.caption(f"Net profit: {CURR}{sale_profit:.2f}")
+                if st.button("💰 Mark Sold", key="sell_inventory", disabled=price <= 0):
+                    sell_from_inventory(index, item_row, sale_profit); confirm_saved("Sold!"); st.rerun()
+            else: st.caption("No matching items in your inventory.")
+        render_table('inventory')
+    with tab3: render_aging()
 
 # ==========================================
 # 10. SUPPLY DROP
 # ==========================================
 elif st.session_state.view == 'supplies':
+    PROF.lap("10. Supply Drop")
     st.title("🛒 Supply Drop")
     st.caption("The official reseller starter kit. Verified quality.")
     
@@ -380,20 +761,16 @@ elif st.session_state.view == 'supplies':
     
     # WATCHLIST
     with st.expander("👀 My Personal Watchlist"):
-        c1, c2, c3 = st.columns([2, 2, 1])
-        name = c1.text_input("Item")
-        link = c2.text_input("Link")
-        if c3.button("Add"): 
-            st.session_state.watchlist.append({"name": name, "link": link}); save_data(); st.rerun()
-        for item in st.session_state.watchlist:
-            c_w1, c_w2 = st.columns([4,1])
-            c_w1.link_button(f"Check {item['name']}", item['link'])
-            if c_w2.button("❌", key=item['name']): st.session_state.watchlist.remove(item); save_data(); st.rerun()
+        render_watchlist()
 
 # ==========================================
 # 11. TOOLKIT (SMART VERSION)
 # ==========================================
 elif st.session_state.view == 'tools':
+    PROF.lap("11. Toolkit")
+    import pandas as pd
+    from pricing import MARGIN_TARGETS, net_profit, revalue, lot_summary, offer_sweep
+    load_live_data()
     st.title("🧰 Toolkit")
     t1, t2, t3, t4, t5 = st.tabs(["📝 Titles", "📄 Desc", "🎒 Bulk", "⚖️ Offer", "📏 Size"])
     
@@ -417,10 +794,30 @@ elif st.session_state.view == 'tools':
         features = st.multiselect("Features", ["Rare", "Logo", "Zip Up", "Spellout", "Distressed"])
         
         if brand and item:
-            final_title = f"{brand} {item} {gender} {size} {color} {era} {material} {' '.join(features)}".strip()
+            final_title = TITLE_ENGINE.build(TitleSpec(brand, item, gender, size, color, era, material, features))
             st.markdown("### Result:")
             st.code(final_title, language="text")
-            st.caption(f"Chars: {len(final_title)}/80 (eBay Limit)")
+            st.caption(f"Chars: {len(final_title)}/{EBAY_TITLE_LIMIT} (eBay Limit) · strongest keywords kept, repeats and filler dropped")
+
+        with st.expander("⚡ Batch Titles"):
+            st.caption("One title per row. CSV columns: Brand, Item, Gender, Size, Color, Era, Material, Features (separated by ;).")
+            batch_src = st.radio("Source", ["My Inventory", "Upload CSV"], horizontal=True, key="title_batch_src")
+            if batch_src == "My Inventory":
+                # Every item, not just the SQLite store's preloaded window; the
+                # brand is picked out of the item text so the packer keeps it
+                if STORE.indexed: names = [str(r.get('Item') or "") for r in STORE.rows('inventory')]
+                else: names = [str(n or "") for n in rows('inventory').items]
+                batch = [TitleSpec(BRAND_INDEX.brand_in(n), n) for n in names]
+            else:
+                up = st.file_uploader("Listings CSV", type="csv", key="title_batch_csv")
+                batch = pd.read_csv(up, dtype=str).fillna("").to_dict('records') if up else []
+                names = [str(r.get('Item', '')) for r in batch]
+            if batch:
+                with PROF.timer('titles.batch'): titled = TITLE_ENGINE.batch(batch)
+                out = pd.DataFrame({'Item': names, 'Title': titled, 'Chars': [len(t) for t in titled]})
+                st.dataframe(out.head(200), use_container_width=True, hide_index=True)
+                st.download_button("📥 Download Titles", out.to_csv(index=False).encode('utf-8'), "titles.csv", "text/csv")
+            else: st.caption("Nothing to title yet.")
         
     with t2:
         if st.session_state.is_pro:
@@ -463,73 +860,79 @@ Genuine {d_item}. Great addition to any wardrobe. Please see photos for exact co
             cost = c1.number_input("Total Lot Cost", 0.0, 5000.0, 100.0)
             items = c2.number_input("Number of Items", 1, 500, 10)
             avg_sale = st.number_input("Avg Sale Price per Item (Est)", 0.0, 500.0, 25.0)
-            
-            cost_per = cost / items
-            total_rev = items * avg_sale
-            fees = total_rev * 0.20 # Est 20% fees/ship
-            net = total_rev - cost - fees
-            break_even = cost / (avg_sale * 0.8)
-            
+            c6, c7 = st.columns(2)
+            market = c6.selectbox("Selling On", FEE_RULES.marketplaces(st.session_state.region), key="bulk_market")
+            ship_per = c7.number_input("Ship per Item (you pay)", 0.0, 200.0, 0.0)
+
+            lot = lot_summary(cost, items, avg_sale, ship_per, market, st.session_state.region, FEE_RULES)
+
             st.markdown("---")
             c3, c4, c5 = st.columns(3)
-            c3.metric("Cost Per Item", f"{CURR}{cost_per:.2f}")
-            c4.metric("Est Net Profit", f"{CURR}{net:.2f}")
-            c5.metric("ROI", f"{((net/cost)*100):.0f}%")
-            
-            st.info(f"💡 **Break Even:** You need to sell **{int(break_even) + 1} items** to get your money back. The remaining **{items - (int(break_even) + 1)} items** are pure profit.")
+            c3.metric("Cost Per Item", f"{CURR}{lot['cost_per']:.2f}")
+            c4.metric("Est Net Profit", f"{CURR}{lot['net']:.2f}")
+            c5.metric("ROI", f"{lot['roi']:.0f}%" if cost > 0 else "—")
+
+            need = lot['break_even_items']
+            if need is None: st.error("❌ Fees and shipping eat the whole sale price. This lot never breaks even.")
+            elif need > items: st.warning(f"⚠️ **Break Even:** You would need to sell **{need} items** but the lot only has {items}.")
+            else: st.info(f"💡 **Break Even:** You need to sell **{need} items** to get your money back. The remaining **{items - need} items** are pure profit.")
+
+            with st.expander("📦 Revalue My Inventory"):
+                # The SQLite store only preloads the newest rows; revalue them all
+                inv = STORE.rows('inventory') if STORE.indexed else rows('inventory')
+                if len(inv):
+                    val = revalue(inv, ship_per, market, st.session_state.region, FEE_RULES)
+                    v1, v2, v3 = st.columns(3)
+                    v1.metric("Money In", f"{CURR}{val['Cost'].sum():,.2f}")
+                    v2.metric(f"Est Net on {market}", f"{CURR}{val['Net'].sum():,.2f}")
+                    v3.metric("Underwater", f"{int((val['Net'] < 0).sum())} items")
+                    worst = val.nsmallest(25, 'Net')
+                    worst.insert(0, 'Item', [inv[i].get('Item') for i in worst.index])
+                    st.dataframe(worst[['Item', 'Cost', 'Price', 'Fees', 'Net', 'ROI', 'BreakEven']], use_container_width=True, hide_index=True)
+                else: st.caption("Add items to your inventory to see them revalued here.")
         else: render_pro_lock("Bulk Calculator")
     
     with t4:
         st.subheader("Offer Shield (Decision Maker)")
         c1, c2 = st.columns(2)
         buy_cost = c1.number_input("Your Buy Cost", 0.0, 1000.0, 10.0)
-        ship_cost = c2.number_input("Shipping Cost", 0.0, 100.0, 10.0)
-        offer_amt = st.number_input("Offer Received", 0.0, 1000.0, 25.0)
+        ship_cost = c2.number_input("Shipping Cost", 0.0, 100.0, FEE_RULES.shipping(st.session_state.region))
+        c3, c4 = st.columns(2)
+        offer_amt = c3.number_input("Offer Received", 0.0, 1000.0, 25.0)
+        offer_market = c4.selectbox("Selling On", FEE_RULES.marketplaces(st.session_state.region), key="offer_market")
         
-        fees = offer_amt * 0.13
-        net = offer_amt - buy_cost - ship_cost - fees
+        net, fees = net_profit(offer_amt, buy_cost, ship_cost, offer_market, st.session_state.region, FEE_RULES)
         margin = (net / offer_amt) * 100 if offer_amt > 0 else 0
         
         st.markdown(f"**Net Profit: {CURR}{net:.2f} ({margin:.0f}% Margin)**")
         
         if net < 0:
             st.error(f"❌ **DECLINE:** You will lose {CURR}{abs(net):.2f}.")
-            rec_price = buy_cost + ship_cost + fees + 5
+            rec_price = float(FEE_RULES.break_even(buy_cost + ship_cost + 5, st.session_state.region, offer_market))
             st.caption(f"💡 Counter at **{CURR}{rec_price:.2f}** to make $5 profit.")
         elif margin < 15:
             st.warning("⚠️ **RISKY:** Profit is very low. Counter offer recommended.")
         else:
             st.success("✅ **ACCEPT:** Good profit margin.")
+
+        if st.toggle("🎯 Optimizer", key="offer_optimizer"):
+            curve, floors = offer_sweep(buy_cost, ship_cost, offer_market, st.session_state.region, FEE_RULES,
+                                        top=max(50.0, (buy_cost + ship_cost) * 6, offer_amt * 1.5))
+            cols = st.columns(len(MARGIN_TARGETS))
+            for col, t in zip(cols, MARGIN_TARGETS):
+                floor = floors[t]
+                col.metric(f"Min Offer @ {t}%", f"{CURR}{floor:.2f}" if floor is not None else "—",
+                           f"{offer_amt - floor:+.2f} vs offer" if floor is not None else None)
+            st.line_chart(curve[curve['Price'] > 0], x='Price', y='Net', height=250)
+            st.caption("Net profit at every price you could accept. Each metric is the lowest offer that still clears that margin.")
             
     with t5:
         st.subheader("Global Size Converter")
-        type_s = st.selectbox("Category", ["Men's Shoes", "Women's Shoes", "Men's Tops"])
-        
-        if type_s == "Men's Shoes":
-            size_data = {
-                "7": {"UK": "6", "EU": "40", "CM": "25"},
-                "8": {"UK": "7", "EU": "41", "CM": "26"},
-                "9": {"UK": "8", "EU": "42.5", "CM": "27"},
-                "10": {"UK": "9", "EU": "44", "CM": "28"},
-                "11": {"UK": "10", "EU": "45", "CM": "29"},
-                "12": {"UK": "11", "EU": "46", "CM": "30"}
-            }
-            us_size = st.select_slider("US Size", options=list(size_data.keys()), value="9")
-            res = size_data[us_size]
-            c1, c2, c3 = st.columns(3)
-            c1.metric("UK", res["UK"])
-            c2.metric("EU", res["EU"])
-            c3.metric("CM", res["CM"])
-            
-        elif type_s == "Women's Shoes":
-            size_data = {
-                "6": {"UK": "3.5", "EU": "36.5", "CM": "23"},
-                "7": {"UK": "4.5", "EU": "37.5", "CM": "24"},
-                "8": {"UK": "5.5", "EU": "38.5", "CM": "25"},
-                "9": {"UK": "6.5", "EU": "40", "CM": "26"},
-                "10": {"UK": "7.5", "EU": "41", "CM": "27"}
-            }
-            us_size = st.select_slider("US Size", options=list(size_data.keys()), value="7")
+        type_s = st.selectbox("Category", list(SIZE_TABLES))
+        size_data = SIZE_TABLES[type_s]
+
+        if type_s.endswith("Shoes"):
+            us_size = st.select_slider("US Size", options=list(size_data.keys()), value=SIZE_DEFAULTS[type_s])
             res = size_data[us_size]
             c1, c2, c3 = st.columns(3)
             c1.metric("UK", res["UK"])
@@ -538,16 +941,13 @@ Genuine {d_item}. Great addition to any wardrobe. Please see photos for exact co
 
         else:
             st.info("Clothing conversion is general estimate.")
-            st.table(pd.DataFrame({
-                "US Size": ["S", "M", "L", "XL", "XXL"],
-                "UK/AU": ["36", "38", "40", "42", "44"],
-                "EU": ["46", "48", "50", "52", "54"]
-            }))
+            st.table(shared(('size.frame', type_s), lambda: pd.DataFrame([{"US Size": us, **other} for us, other in size_data.items()])))
 
 # ==========================================
 # 12. HELP & CONTACT
 # ==========================================
 elif st.session_state.view == 'help':
+    PROF.lap("12. Help & Contact")
     st.title("❓ Help & Support")
     
     st.info("👋 Welcome to Thrift Hunter. Here is how to get started.")
@@ -567,7 +967,7 @@ elif st.session_state.view == 'help':
     with st.expander("🛒 How to use the Profit Engine"):
         st.write("1. Enter your Buy Cost.")
         st.write("2. Enter the Selling Price.")
-        st.write("3. The app automatically deducts fees (13%) and Shipping.")
+        st.write("3. The app automatically deducts the marketplace's fees for your region and category, plus Shipping (estimated from the weight).")
         st.write("4. Click 'Add to Inventory' to save it.")
         
     st.divider()
@@ -583,17 +983,37 @@ elif st.session_state.view == 'help':
 # 13. VAULT & SETTINGS
 # ==========================================
 elif st.session_state.view == 'vault':
+    PROF.lap("13. Vault")
+    from vault import SORTS as VAULT_SORTS
+    load_live_data()
     st.title("🔐 The Vault")
-    region_key = st.session_state.region if st.session_state.region in VAULT_DB else "Canada 🇨🇦"
-    st.dataframe(pd.DataFrame(VAULT_DB.get(region_key, [])), use_container_width=True)
+    all_regions = get_live_db().regions()
+    region_key = st.session_state.region if st.session_state.region in all_regions else DEFAULT_REGION
+
+    c1, c2 = st.columns([2, 1])
+    query = c1.text_input("Search", placeholder="Brand, model or keyword", key="vault_q")
+    sort = c2.selectbox("Sort by", list(VAULT_SORTS), key="vault_sort")
+    c3, c4, c5 = st.columns(3)
+    regions = c3.multiselect("Regions", all_regions, default=[r for r in [region_key] if r in all_regions], key="vault_regions")
+    # Region shards load on demand: no selection means every region
+    vault, vault_version = live_vault(regions or all_regions)
+    vi = get_vault_index(vault_version, vault)
+    tiers = c4.multiselect("Velocity", vi.frame.sort_values('VelRank', ascending=False)['Tier'].unique().tolist(), key="vault_tiers")
+    min_margin = c5.number_input(f"Min Margin ({CURR})", 0.0, 10000.0, 0.0, 10.0, key="vault_margin")
+
+    res, total = vi.search(query, regions, tiers, min_margin or None, sort)
+    st.dataframe(res[['Region', 'Brand', 'Model', 'Buy', 'Sell', 'Vel', 'Margin', 'MarginPct']], use_container_width=True, hide_index=True,
+                 column_config={'Margin': st.column_config.NumberColumn(format="%.0f"), 'MarginPct': st.column_config.NumberColumn("Margin %", format="%.0f%%")})
+    st.caption(f"{total} matches")
 
 elif st.session_state.view == 'settings':
+    PROF.lap("13. Settings")
     st.header("⚙️ Settings")
     c1, c2 = st.columns(2)
     with c1:
         st.subheader("Profile")
         name = st.text_input("Username", st.session_state.username)
-        if st.button("Save Name"): st.session_state.username = name; save_data(); st.rerun()
+        if st.button("Save Name"): st.session_state.username = name; save_data('username'); st.rerun()
         
         st.subheader("License")
         key_input = st.text_input("Pro Key")
@@ -602,7 +1022,7 @@ elif st.session_state.view == 'settings':
             is_valid, message = verify_gumroad_key(key_input)
             if is_valid:
                 st.session_state.is_pro = True
-                save_data()
+                save_data('is_pro')
                 st.balloons()
                 st.success(f"Success: {message}")
                 st.rerun()
@@ -613,7 +1033,7 @@ elif st.session_state.view == 'settings':
         if st.session_state.is_pro:
             st.session_state.tax_mode = st.checkbox("Enable Tax Buffer", st.session_state.tax_mode)
             if st.session_state.tax_mode: st.session_state.tax_rate = st.slider("Rate %", 0, 50, 25)
-            if st.button("Save Tax Settings"): save_data(); st.success("Saved")
+            if st.button("Save Tax Settings"): save_data('tax_mode', 'tax_rate'); st.success("Saved")
         else: st.caption("Locked")
 
     with c2:
@@ -621,15 +1041,103 @@ elif st.session_state.view == 'settings':
         gw = st.number_input("Weekly", value=st.session_state.goals['Weekly'])
         gm = st.number_input("Monthly", value=st.session_state.goals['Monthly'])
         gy = st.number_input("Yearly", value=st.session_state.goals['Yearly'])
-        if st.button("Save Goals"): st.session_state.goals = {'Weekly': gw, 'Monthly': gm, 'Yearly': gy}; save_data(); st.rerun()
+        if st.button("Save Goals"): st.session_state.goals = {'Weekly': gw, 'Monthly': gm, 'Yearly': gy}; save_data('goals'); st.rerun()
         
         st.subheader("Theme")
         mode = st.radio("Mode", ["Dark", "Light"])
-        if mode == "Light" and st.session_state.theme != 'light': st.session_state.theme = 'light'; save_data(); st.rerun()
-        if mode == "Dark" and st.session_state.theme != 'dark': st.session_state.theme = 'dark'; save_data(); st.rerun()
+        if mode == "Light" and st.session_state.theme != 'light': st.session_state.theme = 'light'; save_data('theme'); st.rerun()
+        if mode == "Dark" and st.session_state.theme != 'dark': st.session_state.theme = 'dark'; save_data('theme'); st.rerun()
         
         st.subheader("Data")
+        if st.button("Rebuild Profit Totals"): rebuild_totals(); rebuild_aging(aging()); st.success("Totals rebuilt from history and inventory")
+
+        with st.expander("📥 Import / 📤 Export"):
+            io_kind = st.radio("Table", ["History", "Inventory"], horizontal=True).lower()
+            upload = st.file_uploader("CSV or Parquet", type=["csv", "parquet"])
+            if upload and st.button("Import"):
+                stats = import_rows(io_kind, upload)
+                st.success(f"Imported {stats.added} rows in {stats.batches} batches · {stats.duplicates} already saved, skipped · {stats.invalid} rejected (unreadable date or amount)")
+            fmt = st.radio("Export as", ["CSV", "Parquet"], horizontal=True).lower()
+            if st.button("Prepare Export"):
+                from bulkio import export_bytes
+                out = STORE.rows(io_kind) if STORE.indexed else rows(io_kind)
+                st.session_state.export = (f"{io_kind}.{fmt}", export_bytes(out, io_kind, fmt))
+            if st.session_state.get('export'):
+                st.download_button("Download", st.session_state.export[1], file_name=st.session_state.export[0])
         if st.button("Reset App"): 
             st.session_state.clear()
-            if os.path.exists(SAVE_FILE): os.remove(SAVE_FILE)
+            STORE.clear()
             st.rerun()
+
+# ==========================================
+# 14. DIAGNOSTICS (hidden: ?view=diagnostics&token=...)
+# ==========================================
+elif st.session_state.view == 'diagnostics':
+    PROF.lap("14. Diagnostics")
+    import pandas as pd
+    st.header("🩺 Diagnostics")
+    snap = PROF.snapshot()
+    reruns = snap['reruns']
+    d1, d2, d3, d4 = st.columns(4)
+    d1.metric("Reruns", reruns['calls'])
+    d2.metric("Mean Rerun", f"{reruns['mean_s'] * 1000:.0f} ms")
+    d3.metric("Slowest Rerun", f"{reruns['worst_s'] * 1000:.0f} ms")
+    d4.metric("Aborted (st.rerun)", snap['counts'].get('rerun.aborted', 0))
+
+    PROF.track_sizes = st.toggle("Track pandas / JSON sizes", PROF.track_sizes, help="Measures DataFrames and the database on each rerun. Costs time; leave off unless hunting memory.")
+
+    def stat_table(stats, label):
+        if not stats: return st.caption("Nothing recorded yet.")
+        df = pd.DataFrame.from_dict(stats, orient='index').rename_axis(label).reset_index()
+        for c in ('total_s', 'mean_s', 'worst_s', 'last_s'): df[c.replace('_s', ' ms')] = df.pop(c) * 1000
+        st.dataframe(df.sort_values('total ms', ascending=False), use_container_width=True, hide_index=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.2f") for c in ('total ms', 'mean ms', 'worst ms', 'last ms')})
+
+    st.subheader("Sections")
+    stat_table(snap['sections'], 'Section')
+    st.subheader("I/O & Heavy Calls")
+    stat_table(snap['io'], 'Call')
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.subheader("Cache & Events")
+        live = get_live_db()
+        events = {**snap['counts'], **{f"live_db.{k}": v for k, v in live.stats.items()}, 'write_behind.recent_errors': len(get_writer().errors)}
+        if COMPS_SOURCES:
+            comps = get_comps()
+            events.update({f"comps.{k}": v for k, v in {**comps.stats, **comps.cache.stats, 'cached_terms': len(comps.cache)}.items()})
+        st.dataframe(pd.DataFrame(sorted(events.items()), columns=['Event', 'Count']), use_container_width=True, hide_index=True)
+        st.caption(f"Database version {live.version[:12]} · {len(live.parsed)} shards parsed · {len(st.session_state)} session keys")
+    with c2:
+        st.subheader("Sizes")
+        if snap['sizes']:
+            st.dataframe(pd.DataFrame([(k, v / 1024) for k, v in sorted(snap['sizes'].items())], columns=['Object', 'KiB']),
+                         use_container_width=True, hide_index=True, column_config={'KiB': st.column_config.NumberColumn(format="%.1f")})
+        else: st.caption("Turn on size tracking, then use the app in another tab.")
+
+    st.subheader("Shared Cache")
+    shared_stats = SHARED.stats()
+    s1, s2, s3, s4 = st.columns(4)
+    s1.metric("Shared Objects", len(shared_stats['entries']), f"{shared_stats['bytes'] / 1024:.1f} KiB")
+    s2.metric("Active Sessions", shared_stats['sessions'])
+    s3.metric("Saved per Session", f"{shared_stats['per_session_bytes'] / 1024:.1f} KiB")
+    s4.metric("Saved in Total", f"{shared_stats['saved_bytes'] / 1024:.1f} KiB", f"{shared_stats['evicted']} invalidated", delta_color="off")
+    if shared_stats['entries']:
+        st.dataframe(pd.DataFrame(shared_stats['entries']), use_container_width=True, hide_index=True)
+
+    st.subheader("Slowest Recent Reruns")
+    slow = sorted(snap['recent'], key=lambda r: r['seconds'] or 0, reverse=True)[:20]
+    if slow:
+        st.dataframe(pd.DataFrame([{
+            'When': datetime.datetime.fromtimestamp(r['at']).strftime("%H:%M:%S"), 'View': r['view'], 'ms': r['seconds'] * 1000,
+            'Slowest Section': max(r['sections'], key=r['sections'].get) if r['sections'] else "",
+            'I/O ms': sum(r['io'].values()) * 1000,
+        } for r in slow]), use_container_width=True, hide_index=True,
+            column_config={'ms': st.column_config.NumberColumn(format="%.1f"), 'I/O ms': st.column_config.NumberColumn(format="%.1f")})
+
+    e1, e2, e3 = st.columns(3)
+    e1.download_button("⬇️ JSON", PROF.to_json(), file_name="titan-diagnostics.json", mime="application/json")
+    e2.download_button("⬇️ Prometheus", PROF.to_prometheus(), file_name="titan.prom", mime="text/plain")
+    if e3.button("Reset Counters"): PROF.reset(); st.rerun()
+
+PROF.finish(st.session_state.get('view'))
@@ -0,0 +1,122 @@
+import functools
+import re
+
+from engine import EBAY_TITLE_LIMIT, TitleSpec, spec_from_row
+
+# ==========================================
+# BATCH TITLE ENGINE
+# ==========================================
+# Turns item specs (or whole inventories) into eBay titles that fit the
+# 80-character limit. Each field value becomes one unit ("Vintage 90s",
+# "Zip Up"); the item name is split into words so a long name can lose its
+# weakest words instead of the size. Units are scored from the `keywords`
+# table in database.json (field weight x (1 + best term value)); filler
+# ("Modern", "N/A") is dropped, and a unit whose words are all already
+# in the title is redundant. When everything fits it is all kept; when it
+# doesn't, a small knapsack over the optional units drops the lowest-
+# scoring set that makes it fit. Brand and the first item word are always
+# kept. Output keeps the field order: brand, item, gender, size, color, ...
+
+FIELDS = ('brand', 'item', 'gender', 'size', 'color', 'era', 'material', 'features')
+TOKEN = re.compile(r"[a-z0-9]+")
+
+DEFAULT_KEYWORDS = {
+    'fields': {'brand': 10, 'item': 8, 'size': 6, 'era': 5, 'gender': 4, 'color': 3, 'material': 3, 'features': 2},
+    'terms': {}, 'drop': ['modern', 'n a', 'none', 'other'], 'aliases': {},
+}
+
+
+class TitleEngine:
+    def __init__(self, keywords=None, limit=EBAY_TITLE_LIMIT):
+        kw = {**DEFAULT_KEYWORDS, **(keywords or {})}
+        self.weights = {**DEFAULT_KEYWORDS['fields'], **kw.get('fields', {})}
+        self.aliases = {k.lower(): v.lower() for k, v in kw.get('aliases', {}).items()}
+        self.terms = {self.norm(k): float(v) for k, v in kw.get('terms', {}).items()}
+        self.drop = {self.norm(d) for d in kw.get('drop', [])}
+        self.limit = limit
+        # per-engine memos; the engine is rebuilt when the database changes
+        self.score = functools.lru_cache(maxsize=65536)(self._score)
+        self.title = functools.lru_cache(maxsize=16384)(self._title)
+
+    def norm(self, text):
+        # "Men's" / "MENS" / "mens" -> "mens"; aliases map spellings together
+        words = TOKEN.findall(text.lower().replace("'", ""))
+        return " ".join(self.aliases.get(w, w) for w in words)
+
+    def _score(self, field, text):
+        # (score, normalized words) or None for filler
+        key = self.norm(text)
+        if not key or key in self.drop: return None
+        words = key.split()
+        # A phrase in the table ("vintage 90s") beats its words' best value
+        best = self.terms.get(key, max(self.terms.get(w, 0.0) for w in words))
+        return self.weights.get(field, 1) * (1 + best), frozenset(words)
+
+    def units(self, spec):
+        # (order, text, words, score, required) for every non-empty unit
+        out = []
+        for fi, field in enumerate(FIELDS):
+            value = getattr(spec, field)
+            if field == 'features': parts = list(value)
+            elif field == 'item': parts = str(value).split()
+            else: parts = [value]
+            for pi, text in enumerate(parts):
+                text = str(text).strip()
+                if not text: continue
+                scored = self.score(field, text)
+                if scored is None: continue
+                required = field == 'brand' or (field == 'item' and pi == 0)
+                out.append(((fi, pi), text, scored[1], scored[0], required))
+        return out
+
+    def _title(self, spec_key):
+        spec = TitleSpec(*spec_key[:-1], list(spec_key[-1]))
+        kept, seen = [], set()
+        # Dedupe in field order: later units that add no new word are dropped
+        for unit in self.units(spec):
+            if unit[2] <= seen: continue
+            seen |= unit[2]
+            kept.append(unit)
+        chosen = self._pack(kept)
+        return " ".join(u[1] for u in sorted(chosen, key=lambda u: u[0]))
+
+    def _pack(self, units):
+        over = sum(len(u[1]) + 1 for u in units) - 1 - self.limit
+        if over <= 0: return units
+        required = [u for u in units if u[4]]
+        optional = [u for u in units if not u[4]]
+        if sum(len(u[1]) + 1 for u in required) - 1 > self.limit: return _truncate(required, self.limit)
+        # 0/1 knapsack, framed as the cheapest set of optional units to drop:
+        # chars dropped (capped at the overflow) -> (score lost, bitmask).
+        # Titles run over by a few words, so there are few states.
+        best = {0: (0.0, 0)}
+        for i, u in enumerate(optional):
+            cost = len(u[1]) + 1
+            for dropped, (lost, mask) in list(best.items()):
+                if dropped >= over: continue
+                nxt, cand = min(dropped + cost, over), lost + u[3]
+                if nxt not in best or cand < best[nxt][0]: best[nxt] = (cand, mask | 1 << i)
+        mask = best[over][1]
+        return required + [u for i, u in enumerate(optional) if not mask >> i & 1]
+
+    # ---------- BATCH ----------
+    def build(self, spec):
+        return self.title(spec_key(spec))
+
+    def batch(self, rows):
+        # rows: dicts (CSV / inventory rows) or TitleSpecs -> list of titles
+        return [self.build(r if isinstance(r, TitleSpec) else spec_from_row(r)) for r in rows]
+
+
+def spec_key(spec):
+    # Hashable form of a TitleSpec for the memo
+    return (spec.brand, spec.item, spec.gender, spec.size, spec.color, spec.era, spec.material, tuple(spec.features))
+
+
+def _truncate(units, limit):
+    # Brand + first item word alone overflow: keep whole words that fit
+    out, used = [], -1
+    for u in units:
+        if used + len(u[1]) + 1 > limit: break
+        out.append(u); used += len(u[1]) + 1
+    return out
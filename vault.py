@@ -0,0 +1,99 @@
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# VAULT INDEX
+# ==========================================
+# Vault rows carry prices as free text ("$40-$80", "£100+") and velocity as
+# emoji labels ("⚡ Instant", "🐢 Slow/High"). The index parses those once per
+# database version into numbers and tiers, flattens every region into one
+# frame and keeps a word index over Brand + Model, so search, filter and
+# sort never re-parse or re-scan text on a rerun.
+
+NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+WORD = re.compile(r"[a-z0-9]+")
+
+# word in the Vel label -> (tier, rank); higher rank sells faster
+VELOCITY = {
+    'instant': ('Instant', 5), 'fast': ('Fast', 4), 'steady': ('Steady', 3),
+    'winter': ('Seasonal', 2), 'summer': ('Seasonal', 2), 'seasonal': ('Seasonal', 2),
+    'slow': ('Slow', 1), 'rare': ('Rare', 1),
+}
+
+SORTS = {
+    'Margin': ('Margin', False), 'Margin %': ('MarginPct', False), 'Velocity': ('VelRank', False),
+    'Sell Price': ('SellMin', False), 'Buy Price': ('BuyMin', True), 'Brand': ('Brand', True),
+}
+
+
+def parse_price(text):
+    # "$40-$80" -> (40, 80); "$300+" -> (300, None); "£25" -> (25, 25)
+    nums = [float(n.replace(",", "")) for n in NUMBER.findall(str(text))]
+    if not nums: return None, None
+    if str(text).strip().endswith("+"): return nums[0], None
+    return nums[0], nums[-1]
+
+
+def parse_velocity(text):
+    for w in WORD.findall(str(text).lower()):
+        if w in VELOCITY: return VELOCITY[w]
+    return 'Unknown', 0
+
+
+class VaultIndex:
+    def __init__(self, vault=None):
+        rows = []
+        for region, entries in (vault or {}).items():
+            for rec in entries:
+                buy_lo, buy_hi = parse_price(rec.get('Buy'))
+                sell_lo, sell_hi = parse_price(rec.get('Sell'))
+                tier, rank = parse_velocity(rec.get('Vel'))
+                rows.append({
+                    'Region': region, 'Brand': rec.get('Brand', ''), 'Model': rec.get('Model', ''),
+                    'Buy': rec.get('Buy'), 'Sell': rec.get('Sell'), 'Vel': rec.get('Vel'),
+                    'BuyMin': buy_lo, 'BuyMax': buy_hi, 'SellMin': sell_lo, 'SellMax': sell_hi,
+                    'Tier': tier, 'VelRank': rank,
+                })
+        df = pd.DataFrame(rows, columns=['Region', 'Brand', 'Model', 'Buy', 'Sell', 'Vel', 'BuyMin', 'BuyMax',
+                                         'SellMin', 'SellMax', 'Tier', 'VelRank'])
+        # Open-ended "$300+" counts at its floor; ranges at their midpoint
+        buy = df[['BuyMin', 'BuyMax']].astype(float).mean(axis=1)
+        sell = df[['SellMin', 'SellMax']].astype(float).mean(axis=1)
+        df['Margin'] = sell - buy
+        df['MarginPct'] = np.where(sell > 0, (sell - buy) / sell * 100, np.nan)
+        self.frame = df
+        self.regions = list((vault or {}).keys())
+
+        # word -> row positions, plus the sorted word list for prefix search
+        self.postings = {}
+        for pos, text in enumerate((df['Brand'] + " " + df['Model']).str.lower()):
+            for w in set(WORD.findall(text)): self.postings.setdefault(w, []).append(pos)
+        self.words = sorted(self.postings)
+
+    def _match(self, query):
+        # Every query word must prefix-match some word of Brand / Model
+        hits = None
+        for w in WORD.findall(query.lower()):
+            i = bisect.bisect_left(self.words, w)
+            rows = set()
+            while i < len(self.words) and self.words[i].startswith(w):
+                rows.update(self.postings[self.words[i]]); i += 1
+            hits = rows if hits is None else hits & rows
+        return hits
+
+    def search(self, query="", regions=None, tiers=None, min_margin=None, sort='Margin', limit=500):
+        df = self.frame
+        mask = np.ones(len(df), dtype=bool)
+        hits = self._match(query)
+        if hits is not None:
+            mask[:] = False
+            mask[list(hits)] = True
+        if regions: mask &= df['Region'].isin(regions).to_numpy()
+        if tiers: mask &= df['Tier'].isin(tiers).to_numpy()
+        if min_margin is not None: mask &= (df['Margin'] >= min_margin).to_numpy()
+        col, ascending = SORTS.get(sort, SORTS['Margin'])
+        out = df[mask].sort_values(col, ascending=ascending, kind='stable', na_position='last')
+        return out.head(limit), int(mask.sum())
@@ -0,0 +1,117 @@
+import datetime
+import re
+import uuid
+
+# ==========================================
+# WATCHLIST
+# ==========================================
+# The saved watchlist stays a list of rows, so both stores (and old save
+# files) keep working. Each row gets a stable 'id', optional 'tags' and a
+# 'target' price. In memory, Watchlist indexes the rows two ways:
+#   items  id -> row, in list order (O(1) lookup / remove)
+#   keys   dedupe key -> id: the normalized link, else the name
+# Removals are saved by id, so another session's edits to the same list
+# cannot make them hit the wrong row.
+#
+# Mutations return what to persist and leave the saving to the caller:
+#   add()          -> (row, added)   one 'append' when added
+#   remove_many()  -> removed ids    one 'remove_many' for the batch
+# Rows from older saves have no id; ids are handed out on load and
+# `migrated` tells the caller to write the list back once.
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class Watchlist:
+    def __init__(self, rows=()):
+        self.items = {}
+        self.keys = {}
+        self.migrated = False
+        for row in rows or ():
+            row = dict(row)
+            if not row.get('id'): row['id'] = new_id(); self.migrated = True
+            if row['id'] in self.items: row['id'] = new_id(); self.migrated = True
+            self.items[row['id']] = row
+            self.keys.setdefault(dedupe_key(row), row['id'])
+
+    def __len__(self): return len(self.items)
+
+    def __contains__(self, wid): return wid in self.items
+
+    def get(self, wid): return self.items.get(wid)
+
+    def rows(self): return list(self.items.values())
+
+    # ---------- MUTATIONS ----------
+    def add(self, name, link="", tags=(), target=None, today=None):
+        # (row, added); an item already on the list is returned as it is
+        name, link = str(name or "").strip(), str(link or "").strip()
+        if not name and not link: raise ValueError("A watchlist item needs a name or a link")
+        key = dedupe_key({'name': name, 'link': link})
+        if key in self.keys: return self.items[self.keys[key]], False
+        row = {'id': new_id(), 'name': name or link, 'link': link, 'tags': clean_tags(tags),
+               'target': _price(target), 'added': str(today or datetime.date.today())}
+        self.items[row['id']] = row
+        self.keys[key] = row['id']
+        return row, True
+
+    def remove_many(self, ids):
+        # Ids actually removed, for one batched write
+        ids = [w for w in dict.fromkeys(ids) if w in self.items]
+        for w in ids:
+            row = self.items.pop(w)
+            key = dedupe_key(row)
+            if self.keys.get(key) == w: del self.keys[key]
+        return ids
+
+    # ---------- VIEWS ----------
+    def label(self, wid):
+        # Tells same-named items apart: tags, target and the end of the id
+        row = self.items.get(wid)
+        if row is None: return wid
+        extra = [", ".join(row.get('tags') or [])]
+        if row.get('target'): extra.append(f"target {row['target']:.2f}")
+        extra.append(f"#{wid[-4:]}")
+        return " · ".join([row['name']] + [e for e in extra if e])
+
+    def tags(self):
+        return sorted({t for row in self.items.values() for t in row.get('tags') or ()})
+
+    def page(self, text="", tag=None, page=0, size=25):
+        # (rows on the page, matching rows); newest first
+        text = (text or "").strip().lower()
+        match = [row for row in reversed(self.items.values())
+                 if (not tag or tag in (row.get('tags') or ()))
+                 and (not text or text in row.get('name', '').lower() or text in row.get('link', '').lower())]
+        lo = page * size
+        return match[lo:lo + size], len(match)
+
+
+def new_id():
+    return uuid.uuid4().hex[:12]
+
+
+def dedupe_key(row):
+    link = str(row.get('link') or "").strip().lower()
+    if link:
+        # Scheme, "www." and a trailing slash don't make a different page
+        link = re.sub(r"^[a-z]+://", "", link)
+        link = link[4:] if link.startswith("www.") else link
+        return "l:" + link.rstrip("/")
+    return "n:" + " ".join(TOKEN.findall(str(row.get('name') or "").lower()))
+
+
+def clean_tags(tags):
+    if isinstance(tags, str): tags = tags.split(",")
+    out = []
+    for t in tags or ():
+        t = str(t).strip().lower()
+        if t and t not in out: out.append(t)
+    return out
+
+
+def _price(value):
+    if value in (None, ""): return None
+    try: v = float(value)
+    except (TypeError, ValueError): return None
+    return v if v > 0 else None